@@ -0,0 +1,299 @@
+"""
+Warm-started batch equilibrium for `SolutionArray` sweeps.
+
+The adiabatic flame temperature curve in `02_thermo_kinetics_intro` calls
+`gas.equilibrate("HP")` once per equivalence ratio (or `states.equilibrate`,
+which does the same), and every call starts from scratch. For large mechanisms
+this is expensive: with `n-hexane-NUIG-2015.yaml`, the element potential solver
+fails on the unused elements of the mechanism and Cantera falls back to the much
+slower VCS solver for every point.
+
+`equilibrate_batch` orders the states along the sweep and solves each one with
+a Newton iteration on the element potentials, the total number of moles and the
+temperature, starting from the converged values of the previous state. Only the
+first state of each chain is solved with `ThermoPhase.equilibrate`. Elements
+that are absent from a mixture are removed from the problem, together with the
+species that contain them. Species thermo is evaluated with `ThermoTable`.
+
+    states.TP = 300, ct.one_atm
+    states.set_equivalence_ratio(phis, "C2H6:1.0", "O2:1.0, N2:3.76")
+    equilibrate_batch(states, "HP")
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python batch_equilibrium.py
+"""
+import multiprocessing
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+from thermo_table import ThermoTable
+
+
+class ElementPotentialSolver:
+    """Ideal gas equilibrium at fixed (T, P) or (h, P) by the element potential method.
+
+    At equilibrium, the mole fractions are ``x_k = exp(sum_m lambda_m a_mk -
+    g_k / RT - ln(P / P_ref))``. The unknowns ``lambda_m``, ``ln(N)`` (total
+    moles per unit mass) and ``ln(T)`` are found by Newton's method from the
+    element balances, ``sum_k x_k = 1`` and, for ``'HP'``, the enthalpy.
+
+    :param gas:
+        `Solution` using the ``ideal-gas`` thermo model.
+    """
+    def __init__(self, gas):
+        if gas.thermo_model != 'ideal-gas':
+            raise ValueError("Element potential solver requires an ideal gas, "
+                             f"not '{gas.thermo_model}'")
+        self.gas = gas
+        self.table = ThermoTable(gas)
+        self.atoms = np.array([[gas.n_atoms(k, m) for k in range(gas.n_species)]
+                               for m in range(gas.n_elements)])
+        self.molecular_weights = gas.molecular_weights
+        self.iterations = 0
+
+    def element_moles(self, Y):
+        """Element amounts per unit mass [kmol/kg] of a mixture."""
+        return self.atoms @ (Y / self.molecular_weights)
+
+    def estimate(self, X, T, P):
+        """Element potentials and ``ln(N)`` of an equilibrium state, e.g. from Cantera.
+        """
+        b = self.element_moles(X * self.molecular_weights)
+        active = b > 0
+        species = (self.atoms[~active].sum(axis=0) == 0) & (X > 1e-30)
+        _, h, s = self.table.reduced(T)
+        rhs = (np.log(X[species] * P / self.table.reference_pressure[species])
+               + h[0, species] - s[0, species])
+        lam = np.zeros(len(b))
+        lam[active] = np.linalg.lstsq(self.atoms[active][:, species].T, rhs,
+                                      rcond=None)[0]
+        lnN = -np.log(X @ self.molecular_weights)
+        return lam, lnN
+
+    def solve(self, b, P, T, lam, lnN, h=None, rtol=1e-10, max_iter=50):
+        """Solve for the equilibrium state.
+
+        :param b:
+            Element amounts per unit mass [kmol/kg], see `element_moles`.
+        :param P:
+            Pressure [Pa].
+        :param T:
+            Temperature [K]; fixed unless ``h`` is given, otherwise the
+            initial guess.
+        :param lam, lnN:
+            Initial guess for the element potentials and ``ln(N)``.
+        :param h:
+            Specific enthalpy [J/kg] for ``'HP'`` problems, or `None` for
+            ``'TP'``.
+        :return:
+            Tuple of temperature, mole fractions, element potentials, ``ln(N)``
+            and the number of Newton iterations.
+        """
+        active = b > 0
+        species = self.atoms[~active].sum(axis=0) == 0
+        A = self.atoms[active][:, species]
+        bA = b[active]
+        n_el = len(bA)
+        energy = h is not None
+        logP = np.log(P / self.table.reference_pressure[species])
+
+        z = np.hstack([lam[active], lnN, np.log(T)])
+        n = n_el + 1 + energy
+        for iteration in range(1, max_iter + 1):
+            T = np.exp(z[-1])
+            cp, ht, st = (v[0, species] for v in self.table.reduced(T))
+            x = np.exp(np.minimum(A.T @ z[:n_el] - ht + st - logP, 600.0))
+            N = np.exp(z[n_el])
+            Ax = A * x
+            F = np.empty(n)
+            J = np.zeros((n, n))
+            F[:n_el] = N * Ax.sum(axis=1) / bA - 1
+            J[:n_el, :n_el] = N * (Ax @ A.T) / bA[:, np.newaxis]
+            J[:n_el, n_el] = N * Ax.sum(axis=1) / bA
+            F[n_el] = x.sum() - 1
+            J[n_el, :n_el] = Ax.sum(axis=1)
+            if energy:
+                RT = ct.gas_constant * T
+                F[-1] = N * (x @ ht) - h / RT
+                J[:n_el, -1] = N * (Ax @ ht) / bA
+                J[n_el, -1] = x @ ht
+                J[-1, :n_el] = N * (Ax @ ht)
+                J[-1, n_el] = N * (x @ ht)
+                J[-1, -1] = N * (x @ (ht**2 + cp - ht)) + h / RT
+            dz = np.linalg.solve(J, -F)
+            # limit steps in ln(T) and in the element potentials
+            scale = max(1.0, np.abs(dz[:-1]).max() / 5.0,
+                        abs(dz[-1]) / 0.2 if energy else 0.0)
+            z[:n] += dz / scale
+            if scale == 1.0 and np.abs(dz).max() < rtol:
+                break
+        else:
+            raise ct.CanteraError("Element potential solver did not converge")
+
+        self.iterations += iteration
+        X = np.zeros(len(species))
+        X[species] = x / x.sum()
+        lam = np.zeros(len(b))
+        lam[active] = z[:n_el]
+        return np.exp(z[-1]), X, lam, z[n_el], iteration
+
+
+def _order(b, h, P):
+    """Order states along the leading principal direction of their properties."""
+    features = np.column_stack([b / b.sum(axis=1, keepdims=True), h, np.log(P)])
+    features -= features.mean(axis=0)
+    std = features.std(axis=0)
+    features = features[:, std > 0] / std[std > 0]
+    if not features.size:
+        return np.arange(len(h))
+    _, _, vt = np.linalg.svd(features, full_matrices=False)
+    return np.argsort(features @ vt[0], kind='stable')
+
+
+def _solve_chain(job, solver=None):
+    """Worker function: equilibrate consecutive states, warm-starting each one."""
+    source, name, XY, T, P, Y, rtol = job
+    if solver is None:
+        solver = ElementPotentialSolver(ct.Solution(source, name))
+    gas = solver.gas
+    n = len(T)
+    T_eq = np.empty(n)
+    X_eq = np.empty((n, gas.n_species))
+    iterations = np.zeros(n, dtype=int)
+    cold = np.zeros(n, dtype=bool)
+    guess = None
+    for i in range(n):
+        gas.TPY = T[i], P[i], Y[i]
+        b = solver.element_moles(gas.Y)
+        h = gas.enthalpy_mass if XY == 'HP' else None
+        if guess is not None:
+            try:
+                T_guess = guess[0] if XY == 'HP' else T[i]
+                T_eq[i], X_eq[i], lam, lnN, iterations[i] = solver.solve(
+                    b, P[i], T_guess, guess[1], guess[2], h=h, rtol=rtol)
+                guess = T_eq[i], lam, lnN
+                continue
+            except (ct.CanteraError, np.linalg.LinAlgError, FloatingPointError):
+                pass
+        # first point of the chain, or failed warm start
+        gas.equilibrate(XY)
+        cold[i] = True
+        T_eq[i], X_eq[i] = gas.T, gas.X
+        guess = (gas.T, *solver.estimate(gas.X, gas.T, gas.P))
+    return T_eq, X_eq, iterations, cold
+
+
+def equilibrate_batch(states, XY='HP', rtol=1e-10, order=True, processes=1,
+                      min_chunk=50):
+    """Equilibrate all states of a `SolutionArray`, warm-starting along the sweep.
+
+    :param states:
+        `SolutionArray` of an ideal gas; modified in place, like
+        `SolutionArray.equilibrate`.
+    :param XY:
+        ``'HP'`` or ``'TP'``.
+    :param rtol:
+        Convergence tolerance of the Newton iteration.
+    :param order:
+        If `True`, solve states in the order of their element composition,
+        enthalpy and pressure, so that each state is close to its predecessor.
+        If `False`, use the order of the array.
+    :param processes:
+        Number of worker processes; `None` uses all available cores but one.
+        The ordered states are split into contiguous chains of at least
+        ``min_chunk`` states, each started with one `ThermoPhase.equilibrate`
+        call.
+    :return:
+        Dictionary with the number of Newton ``iterations`` per state and a
+        ``cold`` flag for states that were solved by `ThermoPhase.equilibrate`.
+    """
+    if XY not in ('HP', 'TP'):
+        raise ValueError(f"Unsupported property pair '{XY}'")
+    gas = states._phase
+    shape = states.shape
+    T = np.ravel(states.T)
+    P = np.ravel(states.P)
+    Y = states.Y.reshape(-1, gas.n_species)
+    h = np.ravel(states.enthalpy_mass)
+    n = len(T)
+
+    if order:
+        b = Y / gas.molecular_weights @ np.array(
+            [[gas.n_atoms(k, m) for m in range(gas.n_elements)]
+             for k in range(gas.n_species)])
+        index = _order(b, h, P)
+    else:
+        index = np.arange(n)
+
+    if processes is None:
+        processes = max(multiprocessing.cpu_count() - 1, 1)
+    processes = max(min(processes, n // min_chunk), 1)
+    chains = np.array_split(index, processes)
+    jobs = [(gas.source, gas.name, XY, T[i], P[i], Y[i], rtol) for i in chains]
+    if processes > 1:
+        with multiprocessing.Pool(processes=processes) as pool:
+            results = pool.map(_solve_chain, jobs)
+    else:
+        # solve in this process, using a copy of the phase that does not
+        # disturb the state of `states`
+        solver = ElementPotentialSolver(ct.Solution(
+            thermo='ideal-gas', species=gas.species()))
+        results = [_solve_chain(job, solver) for job in jobs]
+
+    T_eq = np.empty(n)
+    X_eq = np.empty((n, gas.n_species))
+    iterations = np.empty(n, dtype=int)
+    cold = np.empty(n, dtype=bool)
+    for i, (T_i, X_i, iterations_i, cold_i) in zip(chains, results):
+        T_eq[i], X_eq[i], iterations[i], cold[i] = T_i, X_i, iterations_i, cold_i
+    states.TPX = T_eq.reshape(shape), P.reshape(shape), \
+        X_eq.reshape(shape + (gas.n_species,))
+    return {'iterations': iterations.reshape(shape), 'cold': cold.reshape(shape)}
+
+
+if __name__ == '__main__':
+    ct.suppress_thermo_warnings()
+    T0 = 300
+    P0 = ct.one_atm
+
+    for mech, fuel, n_ref in [('gri30.yaml', 'C2H6:1.0', 100),
+                              ('../inputs/n-hexane-NUIG-2015.yaml', 'NC6H14:1.0', 10)]:
+        gas = ct.Solution(mech)
+        phis = np.linspace(0.4, 3.0, 100)
+        print(f"{mech}: HP equilibrium for {len(phis)} equivalence ratios")
+
+        # reference from 02_thermo_kinetics_intro; only every few points are
+        # computed for the large mechanism
+        t0 = default_timer()
+        phi_ref = phis[::len(phis) // n_ref]
+        Tad = []
+        for phi in phi_ref:
+            gas.TP = T0, P0
+            gas.set_equivalence_ratio(phi, fuel, "O2:1.0, N2:3.76")
+            gas.equilibrate("HP")
+            Tad.append(gas.T)
+        t_ref = (default_timer() - t0) * len(phis) / len(phi_ref)
+
+        states = ct.SolutionArray(gas, len(phis))
+        states.TP = T0, P0
+        states.set_equivalence_ratio(phis, fuel, "O2:1.0, N2:3.76")
+        # shuffled input: the sweep order is recovered by `equilibrate_batch`
+        perm = np.random.default_rng(1).permutation(len(phis))
+        states = states[perm]
+        t0 = default_timer()
+        stats = equilibrate_batch(states, "HP")
+        t_batch = default_timer() - t0
+
+        warm = ~stats['cold']
+        T_batch = np.empty(len(phis))
+        T_batch[perm] = states.T
+        T_batch = T_batch[::len(phis) // n_ref]
+        print(f"  equilibrate loop: {t_ref:7.2f} s"
+              + (" (extrapolated)" if len(phi_ref) < len(phis) else ""))
+        print(f"  warm-started:     {t_batch:7.2f} s ({t_ref / t_batch:.0f}x), "
+              f"{stats['cold'].sum()} cold start(s), "
+              f"{stats['iterations'][warm].mean():.1f} Newton iterations per state")
+        print(f"  max. |dT| = {np.abs(T_batch - Tad).max():.1e} K")
@@ -0,0 +1,683 @@
+"""
+Single-pass linter for Chemkin input, thermo and transport files.
+
+`06_chemkin_conversion` repairs `mech.txt`, `thermo.txt` and `tran.txt` by
+running `ck2yaml`, fixing the first problem it reports, and running it again.
+`lint_chemkin` reads each file once, line by line, and keeps going after
+problems, so all of them are reported in one run, each with its line number and
+a suggested fix:
+
+    issues = lint_chemkin('mech.txt', 'thermo.txt', 'tran.txt')
+    print(report(issues))
+
+The checks cover problems that stop `ck2yaml`:
+
+* unknown tokens on section lines, such as `REACTIONS BASE M=N2`, and text
+  outside of sections,
+* repeated species declarations, undeclared species and elements,
+* thermo entries that do not follow the fixed-column format, for example
+  because of tab characters, and species without thermo data,
+* reactions without three Arrhenius parameters, falloff reactions without
+  `LOW` parameters, unknown auxiliary keywords, and duplicate reactions that
+  are not marked as `DUPLICATE`,
+* malformed, conflicting or missing transport data.
+
+They also cover problems that `ck2yaml` only reports as warnings, such as
+identical duplicate entries or NASA polynomials that are discontinuous at the
+midpoint temperature. A clean report means that the common problems are fixed,
+but it does not guarantee that the conversion succeeds.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python chemkin_lint.py
+"""
+import difflib
+from pathlib import Path
+import re
+from typing import NamedTuple
+from timeit import default_timer
+
+import cantera as ct
+from cantera.ck2yaml import ENERGY_UNITS, QUANTITY_UNITS, fortFloat
+import numpy as np
+
+
+class LintIssue(NamedTuple):
+    """A problem found by `lint_chemkin`.
+
+    ``severity`` is ``'error'`` for problems that stop `ck2yaml`, and
+    ``'warning'`` for problems it accepts, possibly with the `permissive`
+    option.
+    """
+    file: str
+    line: int
+    severity: str
+    message: str
+    suggestion: str
+
+    def __str__(self):
+        return (f"{self.file}:{self.line}: {self.severity}: {self.message}\n"
+                f"    fix: {self.suggestion}")
+
+
+#: Section keywords, as in `ck2yaml`
+_section = re.compile(r"\s*(ELEM(?:ENTS)?|SPEC(?:IES)?|SITE|THER(?:M|MO)|"
+                      r"REAC(?:TION|TIONS)?|TRAN(?:SPORT)?)\b(.*)", re.I)
+_end = re.compile(r"(.*?)\s*\bEND\b", re.I)
+
+#: Allowed numbers of parameters of auxiliary keywords in REACTIONS sections;
+#: `None` for any number
+_keywords = {
+    'DUP': (0,), 'DUPLICATE': (0,), 'LOW': (3,), 'HIGH': (3,), 'TROE': (3, 4),
+    'SRI': (3, 5), 'REV': (3,), 'PLOG': (4,), 'TCHEB': (2,), 'PCHEB': (2,),
+    'CHEB': None, 'FORD': (2,), 'RORD': (2,), 'UNITS': (1,), 'MOME': (0,),
+    'XSMI': (0,), 'LT': (2,), 'RLT': (2,), 'TDEP': (1,), 'EXCI': (1,),
+    'JAN': None, 'FIT1': None,
+}
+_falloff_keywords = {'LOW', 'HIGH'}
+_auxiliary = re.compile(r"([^\s/]+)\s*(?:/([^/]*)/)?")
+_reaction = re.compile(r"(.*?=.*?)\s+(\S+)\s+(\S+)\s+(\S+)\s*$")
+_arrow = re.compile(r"<=>|=>|=")
+_falloff = re.compile(r"\(\s*\+\s*([^)\s]+)\s*\)")
+_coefficient = re.compile(r"(\d+(?:\.\d*)?)(.+)")
+
+
+def _number(text):
+    try:
+        return fortFloat(text)
+    except ValueError:
+        return None
+
+
+def _did_you_mean(name, candidates):
+    matches = difflib.get_close_matches(name, candidates, n=1)
+    return f"did you mean '{matches[0]}'?" if matches else ""
+
+
+def _nasa7(a, T):
+    """cp/R, h/RT and s/R of the NASA-7 coefficients ``a`` at ``T``."""
+    cp = a[0] + T * (a[1] + T * (a[2] + T * (a[3] + T * a[4])))
+    h = (a[0] + T * (a[1] / 2 + T * (a[2] / 3 + T * (a[3] / 4 + T * a[4] / 5)))
+         + a[5] / T)
+    s = (a[0] * np.log(T) + T * (a[1] + T * (a[2] / 2 + T * (a[3] / 3 + T * a[4] / 4)))
+         + a[6])
+    return np.array([cp, h, s])
+
+
+class _Reaction:
+    """State of the reaction whose auxiliary lines are being read."""
+    def __init__(self, line, equation, key, falloff, third_body, reversible):
+        self.line = line
+        self.equation = equation
+        self.key = key
+        self.falloff = falloff
+        self.third_body = third_body
+        self.reversible = reversible
+        self.keywords = set()
+
+
+class _Linter:
+    def __init__(self, jump_tol):
+        self.jump_tol = jump_tol
+        self.issues = []
+        self.file = None
+        self.elements = set()
+        self.species = {}  # name -> line of declaration
+        self.plus_names = set()
+        self.thermo = {}  # name -> (file, line)
+        self.transport = {}  # name -> (line, values)
+        self.reactions = {}  # key -> [(line, duplicate)]
+        self.reaction = None
+        self.thermo_read = False
+        self.transport_read = False
+
+    def issue(self, line, severity, message, suggestion):
+        self.issues.append(LintIssue(self.file, line, severity, message, suggestion))
+
+    # files
+
+    def lint_file(self, path, kind):
+        """Read one file; ``kind`` is ``'input'``, ``'thermo'`` or ``'transport'``."""
+        self.file = Path(path).name
+        section = 'TRANSPORT' if kind == 'transport' else None
+        thermo_state = None
+        with open(path, errors='replace') as stream:
+            for number, raw in enumerate(stream, 1):
+                raw = raw.rstrip('\n\r')
+                line = raw.split('!', 1)[0]
+                if section == 'THERMO' and not line.strip().upper().startswith('END'):
+                    thermo_state = self.thermo_line(number, raw, line, thermo_state)
+                    continue
+
+                match = _section.match(line) if kind != 'transport' else None
+                if match:
+                    keyword = match.group(1).upper()[:4]
+                    new = {'ELEM': 'ELEMENTS', 'SPEC': 'SPECIES', 'SITE': 'SITE',
+                           'THER': 'THERMO', 'REAC': 'REACTIONS',
+                           'TRAN': 'TRANSPORT'}[keyword]
+                    if section is not None:
+                        self.issue(number, 'warning', f"{section} section is not "
+                                   f"closed before the {new} section",
+                                   f"add a line with 'END' before line {number}")
+                    self.end_section(section)
+                    section = new
+                    line = match.group(2)
+                    if section == 'THERMO':
+                        self.thermo_read = True
+                        thermo_state = {'expect': 'ranges', 'header': number}
+                        continue
+                    if section == 'REACTIONS':
+                        self.reactions_line(number, line)
+                        continue
+                    if section == 'SITE':
+                        self.issue(number, 'error', "SITE sections are not supported "
+                                   "by this linter", "lint the surface file separately "
+                                   "with ck2yaml --surface")
+
+                end = _end.match(line)
+                if end and section not in ('TRANSPORT',) or (
+                        section == 'TRANSPORT' and line.strip().upper() == 'END'):
+                    if end:
+                        self.section_line(section, number, end.group(1))
+                    self.end_section(section)
+                    section = None if kind != 'transport' else 'TRANSPORT'
+                    continue
+                if section is None:
+                    if line.strip():
+                        self.issue(number, 'error', f"Text outside of a section: "
+                                   f"'{line.strip()}'", "comment the line out with "
+                                   "'!', or add the missing section keyword")
+                    continue
+                self.section_line(section, number, line)
+
+        if section == 'THERMO' and thermo_state and thermo_state.get('entry'):
+            self.issue(thermo_state['entry'][0][0], 'error', "Incomplete thermo entry "
+                       "at the end of the file", "complete or remove the entry")
+        self.end_section(section)
+
+    def section_line(self, section, number, line):
+        if section == 'ELEMENTS':
+            self.elements_line(number, line)
+        elif section == 'SPECIES':
+            self.species_line(number, line)
+        elif section == 'REACTIONS':
+            self.reaction_line(number, line)
+        elif section == 'TRANSPORT':
+            self.transport_line(number, line)
+
+    def end_section(self, section):
+        if section == 'REACTIONS':
+            self.finish_reaction()
+
+    # ELEMENTS and SPECIES
+
+    def elements_line(self, number, line):
+        line = re.sub(r'\s*/\s*([0-9.EeDd+-]+)\s*/', r'/\1/', line)
+        for token in line.split():
+            symbol, _, weight = token.partition('/')
+            if not weight:
+                try:
+                    ct.Element(symbol.capitalize())
+                except Exception:
+                    self.issue(number, 'error', f"Unknown element '{symbol}'",
+                               f"give its atomic weight as '{symbol}/weight/'")
+            self.elements.add(symbol.upper())
+
+    def species_line(self, number, line):
+        for name in line.split():
+            if name in self.species:
+                self.issue(number, 'error', f"Species '{name}' is declared again "
+                           f"(first on line {self.species[name]})",
+                           "remove the repeated declaration, or convert with "
+                           "--permissive")
+                continue
+            self.species[name] = number
+            if '+' in name:
+                self.plus_names.add(name)
+
+    # THERMO
+
+    def thermo_line(self, number, raw, line, state):
+        """Process one line of a THERMO section and return the new state."""
+        if state['expect'] == 'ranges':
+            if not line.strip():
+                return state
+            values = [_number(v) for v in line.split()]
+            if len(values) < 3 or None in values[:3]:
+                self.issue(number, 'error', "Expected the default temperature ranges "
+                           "after THERMO", "add a line such as "
+                           "'   300.000  1000.000  5000.000'")
+                state = {'expect': '1', 'T_mid': 1000.0}
+                return self.thermo_line(number, raw, line, state)
+            return {'expect': '1', 'T_mid': values[1]}
+
+        marker = raw[79] if len(raw) >= 80 else None
+        if state['expect'] == 'skip':
+            if marker != '1' or '\t' in raw:
+                return state
+            state['expect'] = '1'
+
+        if state['expect'] == '1':
+            if not line.strip():
+                return state
+            if marker == '1' and '\t' not in raw:
+                state.update(expect='2', entry=[(number, raw)])
+                return state
+            name = line.split()[0]
+            if '\t' in raw:
+                self.issue(number, 'error', f"Tab characters in the thermo entry "
+                           f"for '{name}'", "replace the tabs with spaces, so that "
+                           "every field is in its fixed columns and the line number "
+                           "is in column 80")
+            elif raw.rstrip()[-1:] == '1':
+                self.issue(number, 'error', f"First line of the thermo entry for "
+                           f"'{name}' has {len(raw.rstrip())} columns instead of 80",
+                           "align the fields to the fixed columns, with '1' in "
+                           "column 80")
+            else:
+                self.issue(number, 'error', "Line cannot be parsed as part of a "
+                           "NASA7 thermo entry", "remove the line or comment it out "
+                           "with '!', or convert with --permissive")
+                return state
+            state['expect'] = 'skip'
+            return state
+
+        # lines 2 to 4 of an entry
+        name = state['entry'][0][1][:18].split()[0]
+        if marker != state['expect'] or '\t' in raw:
+            problem = "tab characters" if '\t' in raw else (
+                f"'{state['expect']}' missing in column 80")
+            self.issue(number, 'error', f"Line {state['expect']} of the thermo entry "
+                       f"for '{name}' is malformed ({problem})",
+                       "write 15-character coefficient fields and the line number "
+                       "in column 80")
+            state['expect'] = 'skip'
+            return state
+        state['entry'].append((number, raw))
+        if marker == '4':
+            self.thermo_entry(state['entry'], state['T_mid'])
+            state['expect'] = '1'
+        else:
+            state['expect'] = chr(ord(marker) + 1)
+        return state
+
+    def thermo_entry(self, entry, default_T_mid):
+        (number, header), *lines = entry
+        name = header[:18].split()[0]
+        ok = True
+        for start in (24, 29, 34, 39, 73):
+            field = header[start:start + 5]
+            symbol, count = field[:2].strip(), field[2:].strip()
+            if not symbol or start == 73 and not count:
+                continue
+            if _number(count) is None:
+                self.issue(number, 'error', f"Element count '{count}' of '{name}' in "
+                           f"columns {start + 3}-{start + 5} is not a number",
+                           "write the element symbol in two columns followed by the "
+                           "count in three columns")
+                ok = False
+            elif self.elements and symbol.upper() not in self.elements and float(
+                    _number(count)) != 0:
+                if name in self.species:
+                    self.issue(number, 'error', f"Element '{symbol}' of '{name}' is "
+                               "not declared", f"add '{symbol}' to the ELEMENTS section")
+
+        T = [_number(header[a:b]) if header[a:b].strip() else None
+             for a, b in ((45, 55), (55, 65), (65, 73))]
+        if T[2] is None and not header[65:73].strip():
+            T[2] = default_T_mid
+        if None in T:
+            self.issue(number, 'error', f"Temperature limits of '{name}' in columns "
+                       "46-73 cannot be read", "write T_min, T_max and T_mid in "
+                       "columns 46-55, 56-65 and 66-73")
+            ok = False
+        elif not T[0] < T[2] < T[1]:
+            self.issue(number, 'error', f"Temperature limits of '{name}' are not "
+                       f"ordered: T_min = {T[0]}, T_mid = {T[2]}, T_max = {T[1]}",
+                       "check columns 46-73; T_mid lies between T_min and T_max")
+            ok = False
+
+        coeffs = []
+        for line_number, line in lines:
+            for k in range(5 if len(coeffs) < 10 else 4):
+                field = line[15 * k:15 * (k + 1)]
+                value = _number(field)
+                if value is None:
+                    self.issue(line_number, 'error', f"Coefficient {len(coeffs) + 1} "
+                               f"of '{name}' ('{field.strip()}') is not a number",
+                               f"check columns {15 * k + 1}-{15 * (k + 1)}")
+                    ok = False
+                coeffs.append(value)
+
+        if name in self.thermo:
+            self.issue(number, 'warning', f"Additional thermo entry for '{name}' "
+                       f"(first in {self.thermo[name][0]} on line "
+                       f"{self.thermo[name][1]}); the first entry is used",
+                       "remove one of the entries, or convert with --permissive")
+            return
+        self.thermo[name] = (self.file, number)
+        if not ok or name not in self.species and self.species:
+            return
+
+        high, low = np.array(coeffs[:7]), np.array(coeffs[7:14])
+        T_min, T_max, T_mid = T
+        jump = np.abs(_nasa7(high, T_mid) - _nasa7(low, T_mid))
+        jump[0] /= max(abs(_nasa7(low, T_mid)[0]), 1.0)
+        if (jump > self.jump_tol).any():
+            grid = np.linspace(T_min, T_max, 200)[1:-1]
+            best = grid[np.abs(_nasa7(high, grid) - _nasa7(low, grid)).sum(axis=0)
+                        .argmin()]
+            self.issue(number, 'warning', f"NASA polynomials of '{name}' are "
+                       f"discontinuous at T_mid = {T_mid:g} K (jumps of cp/R, h/RT, "
+                       f"s/R: {jump[0]:.2g}, {jump[1]:.2g}, {jump[2]:.2g})",
+                       f"the polynomials agree best near {best:.0f} K; check T_mid "
+                       "in columns 66-73, or refit with nasa_refit.py")
+
+    # REACTIONS
+
+    def reactions_line(self, number, line):
+        bad = [token for token in line.split()
+               if token.upper() not in ENERGY_UNITS
+               and token.upper() not in QUANTITY_UNITS
+               and token.upper() not in ('MWON', 'MWOFF')]
+        if bad:
+            good = [t for t in line.split() if t not in bad]
+            self.issue(number, 'error', "Unrecognized token(s) on the REACTIONS line: "
+                       + ", ".join(f"'{t}'" for t in bad),
+                       f"remove them or move them to a comment: "
+                       f"'{' '.join(['REACTIONS'] + good)}  ! {' '.join(bad)}'")
+
+    def split_side(self, number, side):
+        """Species names and coefficients on one side of an equation."""
+        terms = []
+        current = None
+        for piece in side.split('+'):
+            current = piece if current is None else current + '+' + piece
+            if any(name.startswith(current + '+') for name in self.plus_names):
+                continue
+            terms.append(current)
+            current = None
+        if current is not None:
+            terms.append(current)
+
+        result = []
+        for term in terms:
+            parsed = self.species_term(term)
+            if parsed is None and '+' in term:
+                parts = [self.species_term(part) for part in term.split('+')]
+                if None not in parts:
+                    result.extend(parts)
+                    continue
+            if parsed is None:
+                name = _coefficient.match(term)
+                name = name.group(2) if name and name.group(2) not in self.species \
+                    and not term in self.species else term
+                hint = _did_you_mean(name, self.species)
+                self.issue(number, 'error', f"Undeclared species '{name}' in reaction",
+                           hint or f"declare '{name}' in the SPECIES section")
+                parsed = (name, 1.0)
+            result.append(parsed)
+        return result
+
+    def species_term(self, term):
+        if term in self.species or term.upper() in ('M', 'HV'):
+            return (term, 1.0)
+        match = _coefficient.match(term)
+        if match and (match.group(2) in self.species
+                      or match.group(2).upper() in ('M', 'HV')):
+            return (match.group(2), float(match.group(1)))
+        return None
+
+    def reaction_line(self, number, line):
+        if not line.strip():
+            return
+        if '=' not in line:
+            self.auxiliary_line(number, line)
+            return
+
+        self.finish_reaction()
+        match = _reaction.match(line.strip())
+        if not match or None in [_number(v) for v in match.groups()[1:]]:
+            self.issue(number, 'error', "Reaction line does not end with three "
+                       "Arrhenius parameters", "write 'equation  A  b  Ea' with "
+                       "numbers for A, b and Ea")
+            self.reaction = None
+            return
+        equation = match.group(1).strip()
+        arrows = _arrow.findall(equation)
+        if len(arrows) != 1:
+            self.issue(number, 'error', f"Reaction '{equation}' has {len(arrows)} "
+                       "arrows", "write the equation with exactly one of '=', '<=>' "
+                       "or '=>'")
+            self.reaction = None
+            return
+        left, right = (side.replace(' ', '') for side in _arrow.split(equation))
+
+        falloff = [_falloff.search(side) for side in (left, right)]
+        third_body = None
+        if any(falloff):
+            bodies = [m.group(1) if m else None for m in falloff]
+            if bodies[0] != bodies[1]:
+                self.issue(number, 'error', f"Falloff third body differs between "
+                           f"reactants and products of '{equation}'",
+                           "write the same '(+M)' or '(+species)' on both sides")
+            third_body = f"(+{bodies[0] or bodies[1]})"
+            if third_body[2:-1] not in self.species and third_body != '(+M)' and \
+                    third_body.upper() != '(+M)':
+                self.issue(number, 'error', f"Undeclared third body {third_body} in "
+                           f"'{equation}'", _did_you_mean(third_body[2:-1], self.species)
+                           or "declare the species, or use '(+M)'")
+            left, right = (_falloff.sub('', side) for side in (left, right))
+
+        reactants = self.split_side(number, left)
+        products = self.split_side(number, right)
+        if any(name.upper() == 'M' for name, _ in reactants + products):
+            third_body = third_body or 'M'
+        sides = [tuple(sorted((n, c) for n, c in side if n.upper() != 'M'))
+                 for side in (reactants, products)]
+        reversible = arrows[0] != '=>'
+        if reversible:
+            key = (min(sides), max(sides), third_body, '<=>')
+        else:
+            key = (sides[0], sides[1], third_body, '=>')
+        self.reaction = _Reaction(number, equation, key, third_body not in (None, 'M'),
+                                  third_body, reversible)
+
+    def auxiliary_line(self, number, line):
+        R = self.reaction
+        if R is None:
+            return
+        for name, params in _auxiliary.findall(line):
+            keyword = name.upper()
+            if keyword in _keywords:
+                values = params.split() if params else []
+                counts = _keywords[keyword]
+                if keyword in ('FORD', 'RORD'):
+                    values = values[1:]
+                    counts = (1,)
+                if counts is not None and len(values) not in counts:
+                    self.issue(number, 'error', f"{keyword} needs "
+                               f"{' or '.join(map(str, counts))} parameter(s), "
+                               f"found {len(values)}", f"check the {keyword} line of "
+                               f"'{R.equation}'")
+                elif any(_number(v) is None for v in values):
+                    self.issue(number, 'error', f"Parameters of {keyword} are not "
+                               "numbers", f"check the {keyword} line of '{R.equation}'")
+                R.keywords.add('DUPLICATE' if keyword == 'DUP' else keyword)
+            elif params:
+                if R.third_body is None:
+                    self.issue(number, 'error', f"Third-body efficiency for '{name}' "
+                               f"in '{R.equation}', which has no third body",
+                               "remove the efficiencies, or add '+M' or '(+M)' to the "
+                               "equation")
+                elif name not in self.species:
+                    self.issue(number, 'error', f"Undeclared species '{name}' in "
+                               "third-body efficiencies", _did_you_mean(
+                                   name, self.species) or "remove the efficiency or "
+                               f"declare '{name}'")
+                elif _number(params) is None:
+                    self.issue(number, 'error', f"Efficiency of '{name}' is not a "
+                               "number", f"write '{name}/value/'")
+            else:
+                self.issue(number, 'error', f"Unrecognized keyword '{name}' after "
+                           f"reaction '{R.equation}'", _did_you_mean(
+                               keyword, _keywords) or "remove it or comment it out "
+                           "with '!'")
+
+    def finish_reaction(self):
+        R = self.reaction
+        if R is None:
+            return
+        self.reaction = None
+        has_falloff = bool(R.keywords & _falloff_keywords)
+        if R.falloff and not has_falloff and 'PLOG' not in R.keywords:
+            self.issue(R.line, 'error', f"Falloff reaction '{R.equation}' has no LOW "
+                       "parameters", "add a 'LOW / A b Ea /' line after the reaction")
+        if not R.falloff and has_falloff:
+            self.issue(R.line, 'error', f"LOW or HIGH parameters for '{R.equation}', "
+                       "which is not a falloff reaction", "write '(+M)' on both sides "
+                       "of the equation, or remove the parameters")
+        if (R.keywords & {'TROE', 'SRI'}) and not has_falloff:
+            self.issue(R.line, 'error', f"TROE or SRI parameters without LOW for "
+                       f"'{R.equation}'", "add a 'LOW / A b Ea /' line")
+        if 'REV' in R.keywords and not R.reversible:
+            self.issue(R.line, 'error', f"REV parameters for irreversible reaction "
+                       f"'{R.equation}'", "write the equation with '=' or '<=>'")
+        self.reactions.setdefault(R.key, []).append(
+            (R.line, 'DUPLICATE' in R.keywords, R.equation))
+
+    # TRANSPORT
+
+    def transport_line(self, number, line):
+        tokens = line.split()
+        if not tokens:
+            return
+        self.transport_read = True
+        name = tokens[0]
+        if len(tokens) != 7:
+            self.issue(number, 'error', f"Transport data for '{name}' has "
+                       f"{len(tokens) - 1} parameters instead of 6",
+                       "write the geometry flag, well depth, diameter, dipole "
+                       "moment, polarizability and rotational relaxation number")
+            return
+        values = [_number(v) for v in tokens[2:]]
+        if None in values:
+            self.issue(number, 'error', f"Transport data for '{name}' contains a value "
+                       "that is not a number", "check the last five columns")
+            return
+        geometry = tokens[1]
+        if geometry not in ('0', '1', '2'):
+            flag = _number(geometry)
+            if flag in (0, 1, 2):
+                self.issue(number, 'warning', f"Geometry flag '{geometry}' of '{name}'"
+                           " is not an integer", f"write '{int(flag)}'")
+            else:
+                self.issue(number, 'error', f"Invalid geometry flag '{geometry}' for "
+                           f"'{name}'", "use 0 (atom), 1 (linear) or 2 (nonlinear)")
+                return
+        values = [float(_number(geometry))] + values
+        if name in self.transport:
+            first, previous = self.transport[name]
+            if previous == values:
+                self.issue(number, 'warning', f"Duplicate transport data for '{name}'"
+                           f", identical to line {first}", "remove one of the lines, "
+                           "or convert with --permissive")
+            else:
+                self.issue(number, 'error', f"Conflicting transport data for '{name}'"
+                           f" (first on line {first})", "decide which data is "
+                           "correct and remove or comment out the other line")
+            return
+        self.transport[name] = (number, values)
+
+    # checks that need all files
+
+    def finish(self, input_name):
+        self.file = input_name
+        for key, entries in self.reactions.items():
+            marked = [dup for _, dup, _ in entries]
+            if len(entries) > 1 and not all(marked):
+                lines = ", ".join(str(line) for line, _, _ in entries)
+                self.issue(entries[0][0], 'error', f"Reaction '{entries[0][2]}' is "
+                           f"duplicated (lines {lines}) without being marked",
+                           "add 'DUPLICATE' after each of these reactions, or remove "
+                           "the extra ones")
+            elif len(entries) == 1 and marked[0]:
+                self.issue(entries[0][0], 'error', f"Reaction '{entries[0][2]}' is "
+                           "marked DUPLICATE, but no duplicate exists",
+                           "remove the DUPLICATE keyword")
+        if self.thermo_read:
+            for name, line in self.species.items():
+                if name not in self.thermo:
+                    self.issue(line, 'error', f"No thermo data for species '{name}'",
+                               "add a thermo entry, or remove the species")
+        if self.transport_read:
+            for name, line in self.species.items():
+                if name not in self.transport:
+                    self.issue(line, 'error', f"No transport data for species "
+                               f"'{name}'", "add a line to the transport file")
+
+
+def lint_chemkin(input_file=None, thermo_file=None, transport_file=None,
+                 jump_tol=0.01):
+    """Check Chemkin-format files for problems, reading each file once.
+
+    :param input_file:
+        Mechanism file with ELEMENTS, SPECIES and REACTIONS sections.
+    :param thermo_file:
+        File with a THERMO section; without an input file, all entries are
+        checked.
+    :param transport_file:
+        File with transport data.
+    :param jump_tol:
+        Tolerated jump of cp/R (relative), h/RT and s/R at the midpoint
+        temperature of NASA polynomials.
+    :return:
+        List of `LintIssue`, ordered by file and line.
+    """
+    linter = _Linter(jump_tol)
+    files = [(f, kind) for f, kind in ((input_file, 'input'), (thermo_file, 'thermo'),
+                                       (transport_file, 'transport')) if f]
+    for path, kind in files:
+        linter.lint_file(path, kind)
+    linter.finish(Path(input_file).name if input_file else None)
+    order = {Path(path).name: i for i, (path, _) in enumerate(files)}
+    return sorted(linter.issues, key=lambda issue: (order.get(issue.file, -1),
+                                                    issue.line))
+
+
+def report(issues, n=None):
+    """Text summary of the issues found by `lint_chemkin`."""
+    errors = sum(issue.severity == 'error' for issue in issues)
+    lines = [f"{errors} error(s), {len(issues) - errors} warning(s)"]
+    lines.extend(str(issue) for issue in issues[:n])
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    ct.suppress_thermo_warnings()
+
+    # the files from 06_chemkin_conversion
+    inputs = Path('../inputs/mech_debug')
+    t0 = default_timer()
+    issues = lint_chemkin(inputs / 'mech.txt', inputs / 'thermo.txt',
+                          inputs / 'tran.txt')
+    t_lint = default_timer() - t0
+    print(f"mech_debug ({1e3 * t_lint:.0f} ms): {report(issues)}\n")
+    fixed = lint_chemkin(inputs / 'mech_fixed.txt', inputs / 'thermo_fixed.txt',
+                         inputs / 'tran.txt')
+    print(f"mech_debug, fixed files: {report(fixed, 0)}\n")
+
+    # NUIG, written in Chemkin format
+    gas = ct.Solution('../inputs/n-hexane-NUIG-2015.yaml')
+    with tempfile.TemporaryDirectory() as tmp:
+        files = [Path(tmp) / 'nuig.inp', Path(tmp) / 'nuig.therm']
+        gas.write_chemkin(*files, quiet=True)
+        size = sum(f.stat().st_size for f in files) / 2**20
+        t0 = default_timer()
+        issues = lint_chemkin(*files)
+        t_lint = default_timer() - t0
+    print(f"n-hexane-NUIG-2015 in Chemkin format ({size:.1f} MB, {gas.n_species} "
+          f"species, {gas.n_reactions} reactions), {1e3 * t_lint:.0f} ms: "
+          f"{report(issues, 5)}")
@@ -0,0 +1,162 @@
+"""
+Electron-impact rate constants as a single matrix-vector product.
+
+In `plasma_reaction`, the rate constant of an electron collision reaction is
+the integral
+
+    k_f = γ N_A ∫ ε σ(ε) F_0(ε) dε
+
+of its cross section ``reaction.rate.cross_sections`` against the electron
+energy distribution. Cantera interpolates each cross section onto the energy
+grid of the plasma, and integrates it with Simpson's rule for every reaction
+and every new distribution; in Python, this is one `scipy.integrate.simpson`
+call per reaction. Since the integral is linear in ``F_0``, the interpolated
+cross sections, the factor ``γ N_A ε`` and the quadrature weights can be
+combined once into a (reactions × energy levels) matrix.
+`CollisionRateMatrix` does this, so that the rate constants of all electron
+collision reactions follow from one product with the distribution, or with a
+matrix of distributions:
+
+    matrix = CollisionRateMatrix(plasma)
+    k = matrix.rate_constants(plasma.electron_energy_distribution)
+    # equal to plasma.forward_rate_constants[matrix.reactions]
+
+Cross sections are interpolated linearly, and continued with their first and
+last values outside of their energy range, as in Cantera. The matrix depends
+on the energy grid and has to be created again when the grid changes.
+Reverse, super-elastic rates are not included.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python collision_rate_matrix.py
+"""
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+
+def quadrature_weights(x):
+    """Weights ``w`` of Simpson's rule on the grid ``x``: ``∫ y dx = w @ y``.
+
+    As in Cantera, pairs of intervals of a non-uniform grid are integrated with
+    Simpson's rule, and the last interval of an odd number of intervals with
+    the trapezoidal rule.
+    """
+    x = np.asarray(x, dtype=float)
+    w = np.zeros(len(x))
+    m = len(x) if len(x) % 2 else len(x) - 1  # points covered by Simpson's rule
+    h = np.diff(x[:m])
+    h0, h1 = h[0::2], h[1::2]
+    w[0:m - 1:2] += (h0 + h1) / 6 * (2 - h1 / h0)
+    w[1:m:2] += (h0 + h1)**3 / (6 * h0 * h1)
+    w[2:m:2] += (h0 + h1) / 6 * (2 - h0 / h1)
+    if m < len(x):
+        w[-2:] += (x[-1] - x[-2]) / 2
+    return w
+
+
+class CollisionRateMatrix:
+    """Rate constants of electron collision reactions from EEDFs.
+
+    :param plasma:
+        `Solution` with a plasma phase.
+    :param levels:
+        Energy grid [eV]; by default, the energy grid of ``plasma``.
+    """
+    def __init__(self, plasma, levels=None):
+        self.levels = np.array(plasma.electron_energy_levels if levels is None
+                               else levels, dtype=float)
+        #: indices of the electron collision reactions
+        self.reactions = [i for i, R in enumerate(plasma.reactions())
+                          if R.rate.type == 'electron-collision-plasma']
+        cross_sections = np.zeros((len(self.reactions), len(self.levels)))
+        for row, i in zip(cross_sections, self.reactions):
+            rate = plasma.reaction(i).rate
+            row[:] = np.interp(self.levels, rate.energy_levels, rate.cross_sections)
+        gamma = np.sqrt(2 * ct.electron_charge / ct.electron_mass)
+        #: (reactions × energy levels) weights
+        self.weights = (gamma * ct.avogadro * cross_sections * self.levels
+                        * quadrature_weights(self.levels))
+
+    @property
+    def shape(self):
+        return self.weights.shape
+
+    def rate_constants(self, distribution):
+        """Forward rate constants [m³/kmol/s].
+
+        :param distribution:
+            EEDF on the energy grid, or array with one EEDF per column.
+        :return:
+            Rate constants of `reactions`, with one column per EEDF for a 2D
+            ``distribution``.
+        """
+        return self.weights @ distribution
+
+
+if __name__ == '__main__':
+    import scipy.integrate
+
+    plasma = ct.Solution('../inputs/oxygen-plasma.yaml', 'isotropic-electron-energy-plasma',
+                         transport_model=None)
+    plasma.TPX = 300, ct.one_atm, 'O2:1, e:1e-6'
+    plasma.isotropic_shape_factor = 2.0
+    # grid of the notebook, and finer grids up to 30 eV
+    notebook_grid = [0.0, 0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0,
+                     1.2, 1.4, 1.6, 1.8, 2.0, 3.0, 4.0, 5.0, 6.0, 7.0, 8.0, 9.0,
+                     10.0, 11.0, 12.0, 13.0, 14.0, 15.0, 16.0, 17.0,
+                     18.0, 19.0, 20.0, 21.0, 22.0, 23.0, 24.0]
+    grids = [notebook_grid] + [np.linspace(0, 30, n) for n in (101, 301, 1001, 3001)]
+    mean_energies = np.linspace(1, 10, 200)
+
+    print(f"{'levels':>6s} {'setup':>8s} {'Cantera':>9s} {'per reaction':>12s} "
+          f"{'matrix':>9s} {'batch':>9s} {'max error':>9s}   [μs per EEDF]")
+    for grid in grids:
+        plasma.electron_energy_levels = grid
+        t0 = default_timer()
+        matrix = CollisionRateMatrix(plasma)
+        t_setup = default_timer() - t0
+
+        # EEDFs and reference rate constants from Cantera
+        distributions = []
+        reference = []
+        t0 = default_timer()
+        for energy in mean_energies:
+            plasma.mean_electron_energy = energy
+            reference.append(plasma.forward_rate_constants[matrix.reactions])
+        t_cantera = default_timer() - t0
+        for energy in mean_energies:
+            plasma.mean_electron_energy = energy
+            distributions.append(plasma.electron_energy_distribution)
+        distributions = np.array(distributions)
+        reference = np.array(reference)
+
+        # one quadrature per reaction, as written in the notebook
+        levels = matrix.levels
+        reactions = [plasma.reaction(i) for i in matrix.reactions]
+        gamma = np.sqrt(2 * ct.electron_charge / ct.electron_mass) * ct.avogadro
+        t0 = default_timer()
+        for F in distributions:
+            [gamma * scipy.integrate.simpson(
+                levels * np.interp(levels, R.rate.energy_levels, R.rate.cross_sections) * F,
+                x=levels) for R in reactions]
+        t_loop = default_timer() - t0
+
+        t0 = default_timer()
+        k = np.array([matrix.rate_constants(F) for F in distributions])
+        t_matrix = default_timer() - t0
+        t0 = default_timer()
+        k_batch = matrix.rate_constants(distributions.T).T
+        t_batch = default_timer() - t0
+
+        # deviations relative to the largest rate constant of each reaction
+        scale = np.abs(reference).max(axis=0)
+        error = max((np.abs(k - reference).max(axis=0) / scale).max(),
+                    (np.abs(k_batch - reference).max(axis=0) / scale).max())
+        n = len(mean_energies)
+        print(f"{len(levels):6d} {1e6 * t_setup:6.0f} μs {1e6 * t_cantera / n:9.2f} "
+              f"{1e6 * t_loop / n:12.2f} {1e6 * t_matrix / n:9.2f} {1e6 * t_batch / n:9.2f} "
+              f"{error:9.1e}")
+    print(f"\n{len(matrix.reactions)} electron collision reactions; Cantera times include "
+          f"the evaluation of the EEDF")
@@ -0,0 +1,236 @@
+"""
+Cache of electron energy distributions and electron-impact rate constants.
+
+In `plasma_reaction`, changing `mean_electron_energy` makes Cantera evaluate a
+new isotropic electron energy distribution function (EEDF), and the rate
+constants of the electron collision reactions are integrals over it. With the
+``Boltzmann-two-term`` distribution type, Cantera solves the two-term Boltzmann
+equation for every new reduced electric field, which takes tens of
+milliseconds. A time-dependent plasma simulation repeats this at nearly
+identical states. `EEDFCache` sets the EEDF of a plasma phase for a given
+reduced field, or mean electron energy for isotropic distributions, and keeps
+the results:
+
+    cache = EEDFCache(plasma, maxsize=256)
+    result = cache.update(100e-21)   # E/N [V·m²]
+    result.rate_constants            # of the electron collision reactions
+    plasma.net_production_rates      # use the EEDF of the cache
+
+Entries are keyed by the field or mean energy, quantized in steps of
+``rtol``, the mole fractions, quantized in steps of ``X_atol``, and the energy
+grid. On a miss, a value between two cached neighbors with the same
+composition and energy grid that are at most ``interpolation_rtol`` apart is
+interpolated linearly in the logarithm of the field; otherwise Cantera computes
+the EEDF, which is then stored, and the least recently used entry is evicted
+once the cache holds ``maxsize`` entries. Interpolated values are not stored.
+
+Cached and interpolated EEDFs are set as discretized distributions, without
+normalization, so that the kinetics of the phase reproduces the stored rate
+constants; the distribution type is restored before the next computation. The
+gas temperature is not part of the key.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python eedf_cache.py
+"""
+from collections import OrderedDict
+from typing import NamedTuple
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+
+class EEDFEntry(NamedTuple):
+    """Stored EEDF."""
+    value: float  #: reduced field [V·m²] or mean electron energy [eV]
+    distribution: np.ndarray
+    mean_energy: float  #: [eV]
+    rate_constants: np.ndarray  #: forward rate constants of the electron collision reactions
+
+
+class EEDFResult(NamedTuple):
+    """EEDF of the phase after `EEDFCache.update`."""
+    distribution: np.ndarray
+    mean_energy: float  #: [eV]
+    rate_constants: np.ndarray  #: forward rate constants of the electron collision reactions
+    source: str  #: ``'hit'``, ``'interpolated'`` or ``'computed'``
+
+
+class EEDFCache:
+    """LRU cache of the EEDFs of a plasma phase.
+
+    :param plasma:
+        `Solution` with a plasma phase; its distribution type when the cache is
+        created determines whether the cache is keyed by the reduced electric
+        field (``Boltzmann-two-term``) or the mean electron energy.
+    :param maxsize:
+        Largest number of stored EEDFs.
+    :param rtol:
+        Relative width of the bins of the field or mean energy.
+    :param X_atol:
+        Width of the bins of the mole fractions.
+    :param interpolation_rtol:
+        Largest relative distance between cached neighbors that are
+        interpolated; 0 to disable interpolation.
+    """
+    def __init__(self, plasma, maxsize=128, rtol=1e-3, X_atol=1e-4,
+                 interpolation_rtol=0.02):
+        self.plasma = plasma
+        self.maxsize = maxsize
+        self.rtol = rtol
+        self.X_atol = X_atol
+        self.interpolation_rtol = interpolation_rtol
+        self.distribution_type = plasma.electron_energy_distribution_type
+        if self.distribution_type == 'discretized':
+            raise ValueError("Discretized distributions do not depend on the state")
+        self.by_field = self.distribution_type != 'isotropic'
+        #: indices of the electron collision reactions
+        self.reactions = [i for i, R in enumerate(plasma.reactions())
+                          if R.rate.type == 'electron-collision-plasma']
+        self._entries = OrderedDict()
+        self._neighbors = {}  #: keys of the entries by composition and grid
+        self.stats = dict.fromkeys(('hit', 'interpolated', 'computed', 'evicted'), 0)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _bin(self, value):
+        return int(round(np.log(value) / np.log1p(self.rtol))) if value > 0 else None
+
+    def _family(self):
+        """Key of the composition, the energy grid and the shape factor."""
+        X = tuple(np.round(self.plasma.X / self.X_atol).astype(int))
+        grid = hash(self.plasma.electron_energy_levels.tobytes())
+        shape = None if self.by_field else self.plasma.isotropic_shape_factor
+        return X, grid, shape
+
+    def _apply(self, distribution):
+        """Set ``distribution`` as the EEDF of the phase."""
+        plasma = self.plasma
+        normalize = plasma.normalize_electron_energy_distribution_enabled
+        plasma.normalize_electron_energy_distribution_enabled = False
+        plasma.set_discretized_electron_energy_distribution(
+            plasma.electron_energy_levels, distribution)
+        plasma.normalize_electron_energy_distribution_enabled = normalize
+
+    def _compute(self, value):
+        plasma = self.plasma
+        if plasma.electron_energy_distribution_type != self.distribution_type:
+            plasma.electron_energy_distribution_type = self.distribution_type
+        if self.by_field:
+            plasma.reduced_electric_field = value
+            plasma.update_electron_energy_distribution()
+        else:
+            plasma.mean_electron_energy = value
+        return EEDFEntry(value, plasma.electron_energy_distribution.copy(),
+                         plasma.mean_electron_energy,
+                         plasma.forward_rate_constants[self.reactions])
+
+    def _interpolate(self, value, family):
+        """EEDF interpolated between the nearest cached neighbors, or `None`."""
+        lower = upper = None
+        for key in self._neighbors.get(family, ()):
+            entry = self._entries[key]
+            if entry.value <= value and (lower is None or entry.value > lower.value):
+                lower = entry
+            if entry.value >= value and (upper is None or entry.value < upper.value):
+                upper = entry
+        if lower is None or upper is None or lower.value <= 0:
+            return None
+        if upper.value / lower.value - 1 > self.interpolation_rtol:
+            return None
+        if upper is lower:
+            return lower.distribution
+        w = np.log(value / lower.value) / np.log(upper.value / lower.value)
+        return (1 - w) * lower.distribution + w * upper.distribution
+
+    def update(self, value):
+        """Set the EEDF of the phase for its current composition.
+
+        :param value:
+            Reduced electric field [V·m²], or mean electron energy [eV] for
+            isotropic distributions.
+        :return:
+            `EEDFResult`.
+        """
+        family = self._family()
+        key = (self._bin(value), family)
+        entry = self._entries.get(key)
+        if entry is not None:
+            self._entries.move_to_end(key)
+            self._apply(entry.distribution)
+            self.stats['hit'] += 1
+            return EEDFResult(entry.distribution, entry.mean_energy,
+                              entry.rate_constants, 'hit')
+
+        if self.interpolation_rtol:
+            distribution = self._interpolate(value, family)
+            if distribution is not None:
+                self._apply(distribution)
+                self.stats['interpolated'] += 1
+                return EEDFResult(distribution, self.plasma.mean_electron_energy,
+                                  self.plasma.forward_rate_constants[self.reactions],
+                                  'interpolated')
+
+        entry = self._compute(value)
+        self.stats['computed'] += 1
+        self._entries[key] = entry
+        self._neighbors.setdefault(family, set()).add(key)
+        if len(self._entries) > self.maxsize:
+            old, _ = self._entries.popitem(last=False)
+            self._neighbors[old[1]].discard(old)
+            if not self._neighbors[old[1]]:
+                del self._neighbors[old[1]]
+            self.stats['evicted'] += 1
+        return EEDFResult(entry.distribution, entry.mean_energy, entry.rate_constants,
+                          'computed')
+
+    def clear(self):
+        """Remove all entries."""
+        self._entries.clear()
+        self._neighbors.clear()
+
+
+if __name__ == '__main__':
+    plasma = ct.Solution('../inputs/oxygen-plasma.yaml', 'isotropic-electron-energy-plasma',
+                         transport_model=None)
+    plasma.TPX = 300, ct.one_atm, 'O2:1, e:1e-6'
+    plasma.electron_energy_distribution_type = 'Boltzmann-two-term'
+    plasma.electron_energy_levels = np.linspace(0, 30, 200)
+
+    # repetitive pulses: a reduced field of 50 to 150 Td with a period of 50 ns,
+    # sampled at steps of 0.5 ns, with 0.05% jitter
+    rng = np.random.default_rng(1)
+    times = np.arange(2000) * 0.5e-9
+    fields = 1e-19 * (1 + 0.5 * np.sin(2 * np.pi * times / 50e-9))
+    fields *= 1 + 5e-4 * rng.standard_normal(len(times))
+
+    reference = []
+    t0 = default_timer()
+    for E in fields:
+        plasma.reduced_electric_field = E
+        plasma.update_electron_energy_distribution()
+        reference.append(plasma.forward_rate_constants.copy())
+    t_reference = default_timer() - t0
+    reference = np.array(reference)
+    print(f"Two-term Boltzmann solver: {1e3 * t_reference / len(fields):.2f} ms per state "
+          f"({t_reference:.1f} s)")
+
+    for rtol, interpolation_rtol in ((1e-3, 0), (1e-3, 0.02), (1e-2, 0.05)):
+        plasma.electron_energy_distribution_type = 'Boltzmann-two-term'
+        cache = EEDFCache(plasma, maxsize=256, rtol=rtol,
+                          interpolation_rtol=interpolation_rtol)
+        k = []
+        t0 = default_timer()
+        for E in fields:
+            cache.update(E)
+            # rate constants that the kinetics of the phase uses
+            k.append(plasma.forward_rate_constants.copy())
+        elapsed = default_timer() - t0
+        k = np.array(k)[:, cache.reactions]
+        error = np.abs(k / reference[:, cache.reactions] - 1).max()
+        print(f"rtol={rtol:g}, interpolation_rtol={interpolation_rtol:g}: "
+              f"{1e3 * elapsed / len(fields):.3f} ms per state "
+              f"({t_reference / elapsed:.1f}x), {cache.stats}, "
+              f"max. rate constant error {error:.1e}")
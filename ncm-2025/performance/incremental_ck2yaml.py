@@ -0,0 +1,410 @@
+"""
+Incremental Chemkin to YAML conversion with cached sections.
+
+`06_chemkin_conversion` fixes `mech.txt`, `thermo.txt` and `tran.txt` one
+problem at a time, and converts all files again with `ck2yaml` after every
+fix. For large mechanisms, most of the conversion time is spent writing the
+YAML file, and most of the rest parsing the THERMO and REACTIONS sections.
+`convert` does the same conversion as `ck2yaml.convert`, but keeps two caches:
+
+* Parsed sections: the results of parsing each THERMO, REACTIONS and TRANSPORT
+  section are stored under a hash of the section text and of the parser state
+  the section depends on, such as the declared species and the units of earlier
+  sections. ELEMENTS and SPECIES sections are cheap to parse, and enter the
+  keys of the other sections through the species they declare.
+* Written entries: the YAML text of each species and reaction is stored under
+  a hash of its parsed data.
+
+After a one-line fix, only the section containing the fix is parsed again, and
+only the entries that changed are written:
+
+    convert('mech_fixed.txt', 'thermo_fixed.txt', 'tran.txt',
+            out_name='mech.yaml', permissive=True)
+
+The output is identical to that of `ck2yaml`, except that the conversion date
+is left out, so that unchanged inputs give identical outputs. Cache files are
+kept in a `.ck2yaml-cache` directory next to the output file, in files named
+after the input files. Surface mechanisms are not supported. Warnings are only
+shown when a section is parsed, and sections with errors are not cached.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python incremental_ck2yaml.py
+"""
+import glob
+import hashlib
+import io
+import logging
+from pathlib import Path
+import pickle
+import re
+import sys
+from timeit import default_timer
+
+import cantera as ct
+from cantera import ck2yaml
+
+#: Version of the cache file layout
+cache_version = 1
+
+#: Prefix of the placeholders for cached entries in the YAML output
+_marker = 'cached-entry-'
+
+#: Parser attributes that REACTIONS sections read and modify
+_unit_attributes = ('energy_units', 'quantity_units', 'output_energy_units',
+                    'output_quantity_units', 'processed_units', 'motz_wise')
+
+
+class _Pickler(pickle.Pickler):
+    """Pickler that stores references to the parser and its species by name."""
+    def __init__(self, stream, parser):
+        super().__init__(stream, protocol=pickle.HIGHEST_PROTOCOL)
+        self.parser = parser
+
+    def persistent_id(self, obj):
+        if obj is self.parser:
+            return ('parser',)
+        if isinstance(obj, ck2yaml.Species):
+            return ('species', obj.label)
+        return None
+
+
+class _Unpickler(pickle.Unpickler):
+    """Unpickler that resolves references to the parser and its species."""
+    def __init__(self, stream, parser):
+        super().__init__(stream)
+        self.parser = parser
+
+    def persistent_load(self, pid):
+        if pid[0] == 'parser':
+            return self.parser
+        return self.parser.species_dict[pid[1]]
+
+
+def _digest(parser, *data):
+    stream = io.BytesIO()
+    pickler = _Pickler(stream, parser)
+    # without the memo, equal data gives the same bytes regardless of which
+    # objects are shared
+    pickler.fast = True
+    pickler.dump((cache_version, ct.__version__) + data)
+    return hashlib.sha256(stream.getvalue()).hexdigest()
+
+
+class IncrementalParser(ck2yaml.Parser):
+    """`ck2yaml.Parser` that reuses parsed sections and written entries.
+
+    :param cache_dir:
+        Directory for the cache files.
+    """
+    def __init__(self, cache_dir):
+        super().__init__()
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        #: ``(file, section, reused)`` for each section that was read
+        self.sections = []
+        #: Number of species and reaction entries that were written again
+        self.written_entries = 0
+
+    def _section_path(self, section, key):
+        return self.cache_dir / f"{self.files[-1]}.{section}.{key[:20]}.pkl"
+
+    def _load_section(self, section, lines, state):
+        """Cache key of a section, and the cached result if there is one."""
+        text = [(line, comment) for _, _, line, comment in lines]
+        key = _digest(self, section, state, text)
+        path = self._section_path(section, key)
+        if not path.exists():
+            return key, None
+        with open(path, 'rb') as stream:
+            payload = _Unpickler(stream, self).load()
+        self.sections.append((self.files[-1], section, True))
+        return key, payload
+
+    def _parse_section(self, section, key, parse, *args):
+        """Parse a section, and return `True` if it can be cached."""
+        self.sections.append((self.files[-1], section, False))
+        max_loglevel = self.max_loglevel
+        self.max_loglevel = logging.NOTSET
+        parse(*args)
+        success = self.max_loglevel < logging.ERROR
+        self.max_loglevel = max(max_loglevel, self.max_loglevel)
+        return success
+
+    def _store_section(self, section, key, payload):
+        # only the latest version of each section is kept
+        pattern = f"{glob.escape(self.files[-1])}.{glob.escape(section)}.*.pkl"
+        for old in self.cache_dir.glob(pattern):
+            old.unlink()
+        with open(self._section_path(section, key), 'wb') as stream:
+            _Pickler(stream, self).dump(payload)
+
+    def _thermo_section(self, section, parse, lines):
+        state = (self.skip_undeclared_species, self.permissive,
+                 self.single_intermediate_temperature,
+                 [(sp.label, sp.thermo is None) for sp in self.species_list])
+        key, payload = self._load_section(section, lines, state)
+        if payload is None:
+            known = set(self.species_dict)
+            missing = {label for label, sp in self.species_dict.items()
+                       if sp.thermo is None}
+            if self._parse_section(section, key, parse, lines):
+                self._store_section(section, key, [
+                    (label, label not in known, sp.thermo, sp.composition)
+                    for label, sp in self.species_dict.items()
+                    if label not in known or (label in missing and sp.thermo)])
+            return
+
+        for label, new, thermo, composition in payload:
+            if new:
+                self.species_dict[label] = ck2yaml.Species(label=label)
+                self.species_list.append(self.species_dict[label])
+            self.species_dict[label].thermo = thermo
+            self.species_dict[label].composition = composition
+
+    def parse_nasa7_section(self, lines):
+        self._thermo_section('THERMO', super().parse_nasa7_section, lines)
+
+    def parse_nasa9_section(self, lines):
+        self._thermo_section('THERMO-NASA9', super().parse_nasa9_section, lines)
+
+    def parse_reactions_section(self, lines, surface):
+        if surface:
+            raise ck2yaml.InputError("Surface mechanisms are not supported")
+        state = (list(self.species_dict), self.permissive, len(self.reactions),
+                 [getattr(self, name) for name in _unit_attributes])
+        key, payload = self._load_section('REACTIONS', lines, state)
+        if payload is None:
+            n = len(self.reactions)
+            if self._parse_section('REACTIONS', key, super().parse_reactions_section,
+                                   lines, surface):
+                self._store_section('REACTIONS', key, {
+                    'start': lines[0, 0], 'reactions': self.reactions[n:],
+                    'units': {name: getattr(self, name) for name in _unit_attributes}})
+            return
+
+        # line numbers are used in messages about duplicate reactions
+        offset = lines[0, 0] - payload['start']
+        for reaction in payload['reactions']:
+            reaction.line_number += offset
+            self.reactions.append(reaction)
+        for name, value in payload['units'].items():
+            setattr(self, name, value)
+        for index, reaction in enumerate(self.reactions):
+            reaction.index = index + 1
+
+    def parse_transport_section(self, lines):
+        state = (self.permissive,
+                 [(sp.label, sp.transport is None) for sp in self.species_dict.values()])
+        key, payload = self._load_section('TRANSPORT', lines, state)
+        if payload is None:
+            missing = [label for label, sp in self.species_dict.items()
+                       if sp.transport is None]
+            if self._parse_section('TRANSPORT', key, super().parse_transport_section,
+                                   lines):
+                self._store_section('TRANSPORT', key, {
+                    label: self.species_dict[label].transport for label in missing
+                    if self.species_dict[label].transport is not None})
+            return
+
+        for label, transport in payload.items():
+            self.species_dict[label].transport = transport
+
+    def _entries(self, kind, items, data):
+        """YAML text of species or reaction entries, reusing cached text.
+
+        :param data:
+            Function returning the data that determines the text of an item.
+        """
+        # keyed by the input file, like the section caches, so that conversions
+        # of different mechanisms can share a cache directory
+        path = self.cache_dir / f"{self.files[0]}.{kind}.pkl"
+        cache = {}
+        if path.exists():
+            with open(path, 'rb') as stream:
+                cache = pickle.load(stream)
+        context = (self.output_energy_units, self.output_quantity_units)
+        keys = [_digest(self, context, data(item)) for item in items]
+        missing = [i for i, key in enumerate(keys) if key not in cache]
+        if missing:
+            emitter = ck2yaml.yaml.YAML()
+            emitter.width = 70
+            for cls in (ck2yaml.Species, ck2yaml.Nasa7, ck2yaml.Nasa9,
+                        ck2yaml.TransportData, ck2yaml.Reaction):
+                emitter.register_class(cls)
+            stream = io.StringIO()
+            emitter.dump([items[i] for i in missing], stream)
+            texts = re.split(r'^(?=- )', stream.getvalue(), flags=re.M)[1:]
+            cache.update(zip((keys[i] for i in missing), texts))
+        self.written_entries += len(missing)
+        # only entries of the latest conversion of this input file are kept
+        cache = {key: cache[key] for key in keys}
+        with open(path, 'wb') as stream:
+            pickle.dump(cache, stream, protocol=pickle.HIGHEST_PROTOCOL)
+        return [cache[key] for key in keys]
+
+    def write_yaml(self, name='gas', out_name='mech.yaml'):
+        """Write the YAML file, using cached text for unchanged entries."""
+        species = self._entries('species', self.all_species, vars)
+        reactions = [
+            re.sub(r'# Reaction \d+', f'# Reaction {R.index}', text, count=1)
+            for R, text in zip(self.reactions, self._entries(
+                'reactions', self.reactions,
+                lambda R: {k: v for k, v in vars(R).items()
+                           if k not in ('index', 'line_number')}))]
+
+        # write everything else with placeholders for the entries
+        all_species, all_reactions = self.all_species, self.reactions
+        self.all_species = [f'{_marker}s{i}' for i in range(len(species))]
+        self.reactions = [f'{_marker}r{i}' for i in range(len(reactions))]
+        try:
+            surface_names = super().write_yaml(name, out_name)
+        finally:
+            self.all_species, self.reactions = all_species, all_reactions
+
+        entries = {'s': species, 'r': reactions}
+        text = Path(out_name).read_text()
+        text = re.sub(r'^date: .*\n', '', text, count=1, flags=re.M)
+        text = re.sub(rf'^- {_marker}([sr])(\d+)\n',
+                      lambda m: entries[m[1]][int(m[2])], text, flags=re.M)
+        Path(out_name).write_text(text)
+        return surface_names
+
+
+def convert(input_file, thermo_file=None, transport_file=None, surface_file=None, *,
+            phase_name='gas', extra_file=None, out_name=None,
+            single_intermediate_temperature=False, quiet=True, permissive=None,
+            verbose=False, cache_dir=None):
+    """Convert Chemkin input files to YAML, reusing results of earlier conversions.
+
+    Arguments are the same as for `ck2yaml.convert`, except that ``quiet``
+    defaults to `True`, and that ``input_file`` is required and
+    ``surface_file`` is not supported. The handlers and level of the
+    `ck2yaml` logger are restored before returning.
+
+    :param cache_dir:
+        Directory for cache files; defaults to `.ck2yaml-cache` in the
+        directory of the output file.
+    :return:
+        The `IncrementalParser`, where ``sections`` lists which sections were
+        reused.
+    """
+    if surface_file:
+        raise ck2yaml.InputError("Surface mechanisms are not supported")
+    out_name = Path(out_name) if out_name else Path(input_file).with_suffix('.yaml')
+    if cache_dir is None:
+        cache_dir = out_name.parent / '.ck2yaml-cache'
+
+    logger = ck2yaml.logger
+    handlers, level, propagate = logger.handlers[:], logger.level, logger.propagate
+    handler = logging.StreamHandler(sys.stdout)
+    handler.setFormatter(ck2yaml.ErrorFormatter())
+    logger.handlers.clear()
+    logger.addHandler(handler)
+    logger.propagate = False
+    if quiet:
+        logger.setLevel(logging.ERROR if permissive else logging.WARNING)
+    elif verbose:
+        logger.setLevel(logging.DEBUG)
+    else:
+        logger.setLevel(logging.INFO)
+
+    try:
+        parser = IncrementalParser(cache_dir)
+        parser.verbose = verbose
+        parser.single_intermediate_temperature = single_intermediate_temperature
+        if permissive is not None:
+            parser.permissive = permissive
+        parser.load_data_file(str(input_file), parser.load_chemkin_file, "input")
+        parser.skip_undeclared_species = True
+        parser.load_data_file(thermo_file and str(thermo_file), parser.load_chemkin_file,
+                              "thermo")
+        parser.all_species = list(parser.species_list)
+        for species in parser.all_species:
+            if species.composition is None:
+                logger.error(f'No thermo data found for species {species.label!r}')
+        parser.load_data_file(transport_file and str(transport_file),
+                              parser.load_transport_file, "transport")
+        if transport_file:
+            for species in parser.species_list:
+                if species.transport is None:
+                    logger.error(f"No transport data for species '{species}'.")
+        parser.load_data_file(extra_file and str(extra_file), parser.load_extra_file,
+                              "input")
+        if parser.max_loglevel >= logging.ERROR:
+            raise ck2yaml.InputError('\n'.join(parser.handler.errors))
+
+        parser.write_yaml(name=phase_name, out_name=out_name)
+        if not quiet:
+            logger.info(f'Wrote YAML mechanism file to {str(out_name)!r}.')
+            logger.info(f'Mechanism contains {len(parser.species_list)} species and '
+                        f'{len(parser.reactions)} reactions.')
+    finally:
+        logger.handlers[:] = handlers
+        logger.setLevel(level)
+        logger.propagate = propagate
+    return parser
+
+
+if __name__ == '__main__':
+    import shutil
+    import tempfile
+
+    ct.suppress_thermo_warnings()
+
+    def edit(path, old, new):
+        text = path.read_text()
+        assert old in text
+        path.write_text(text.replace(old, new, 1))
+
+    def run(label, files, reference):
+        t0 = default_timer()
+        parser = convert(*files, out_name=out, permissive=True)
+        elapsed = default_timer() - t0
+        reused = [section for _, section, hit in parser.sections if hit]
+        print(f"  {label:24s} {elapsed:7.2f} s, sections reused: "
+              f"{', '.join(reused) or '-':28s} entries written: "
+              f"{parser.written_entries}")
+        if reference:
+            # same output as ck2yaml, apart from the conversion date
+            ck2yaml.convert(*files, out_name=reference, quiet=True, permissive=True)
+            expected = re.sub(r'^date: .*\n', '', Path(reference).read_text(),
+                              count=1, flags=re.M)
+            assert out.read_text() == expected, label
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        out = tmp / 'mech.yaml'
+        reference = tmp / 'reference.yaml'
+
+        # the files from 06_chemkin_conversion
+        for name in ('mech_fixed.txt', 'thermo_fixed.txt', 'tran.txt'):
+            shutil.copy(Path('../inputs/mech_debug') / name, tmp)
+        files = debug_files = [tmp / 'mech_fixed.txt', tmp / 'thermo_fixed.txt',
+                               tmp / 'tran.txt']
+        t0 = default_timer()
+        ck2yaml.convert(*files, out_name=reference, quiet=True, permissive=True)
+        print(f"mech_debug (ck2yaml: {default_timer() - t0:.2f} s)")
+        run('first conversion', files, reference)
+        run('unchanged', files, None)
+        edit(files[0], 'H+O2=OH+O                      9.750E+13',
+             'H+O2=OH+O                      9.760E+13')
+        run('reaction edited', files, reference)
+        edit(files[2], 'C2H2               1   209.000', 'C2H2               1   210.000')
+        run('transport edited', files, reference)
+
+        # NUIG, written in Chemkin format
+        gas = ct.Solution('../inputs/n-hexane-NUIG-2015.yaml', transport_model=None)
+        files = [tmp / 'nuig.inp', tmp / 'nuig.therm']
+        gas.write_chemkin(*files, overwrite=True, quiet=True)
+        t0 = default_timer()
+        ck2yaml.convert(*files, out_name=reference, quiet=True, permissive=True)
+        print(f"n-hexane-NUIG-2015 (ck2yaml: {default_timer() - t0:.2f} s)")
+        run('first conversion', files, None)
+        run('unchanged', files, None)
+        edit(files[0], '50800.000000000015', '50900.0')
+        run('reaction edited', files, reference)
+
+        # both mechanisms keep their caches in the same directory
+        print("mech_debug")
+        run('unchanged', debug_files, None)
@@ -0,0 +1,275 @@
+"""
+Automatic selection of the integrator configuration of a reactor network.
+
+`preconditioned_integration` integrates the NUIG n-hexane ignition problem
+twice, once with the default direct linear solver and once with an
+`AdaptivePreconditioner` and approximate derivatives, to find out which is
+faster. `tune` does this automatically: it integrates the current state of a
+`Solution` for a short probe time with each candidate configuration, and picks
+the fastest one whose trajectory agrees with that of the default configuration:
+
+    gas.TPX = 1000, ct.one_atm, 'NC6H14:1, O2:9.5, N2:35.7'
+    result = tune(gas, 'IdealGasConstPressureMoleReactor', probe_time=0.01)
+    reactor, net = make_network(gas, result.config)
+
+The choice is stored in a JSON file, keyed by a fingerprint of the mechanism,
+the reactor type and the Cantera version, so that later calls with the same
+mechanism and reactor type return it without probing. The fingerprint is the
+hash of the input file of the mechanism, or of its species and reactions if it
+was not created from a file.
+
+Candidates with the `AdaptivePreconditioner` need a mole-based reactor. For
+other reactor types, they use the corresponding mole-based reactor, which
+solves the same equations with different state variables. Probes are stopped
+early once they take longer than ``abort_factor`` times the fastest accurate
+probe.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python integrator_tuning.py
+"""
+import hashlib
+import json
+from pathlib import Path
+from typing import NamedTuple
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+from mechanism_cache import file_hash
+
+
+class IntegratorConfig(NamedTuple):
+    """Reactor type and linear solver settings of a reactor network."""
+    name: str
+    reactor: str  #: name of the reactor class
+    preconditioned: bool
+    derivative_settings: dict
+
+
+class ProbeResult(NamedTuple):
+    """Outcome of a probe integration, from `probe`."""
+    config: IntegratorConfig
+    time: float  #: wall time [s]
+    steps: int
+    error: float  #: deviation from the reference, see `trajectory_error`
+    accurate: bool
+    aborted: bool
+
+
+class TuningResult(NamedTuple):
+    """Selected configuration, from `tune`."""
+    config: IntegratorConfig
+    probes: list  #: `ProbeResult` of each candidate; empty if read from the cache
+    cached: bool
+
+
+#: Mole-based reactor types, which support preconditioning
+_mole_reactors = {
+    'IdealGasReactor': 'IdealGasMoleReactor',
+    'IdealGasConstPressureReactor': 'IdealGasConstPressureMoleReactor',
+    'IdealGasMoleReactor': 'IdealGasMoleReactor',
+    'IdealGasConstPressureMoleReactor': 'IdealGasConstPressureMoleReactor',
+}
+
+#: Approximations of the preconditioner used in `preconditioned_integration`
+skip_settings = {'skip-third-bodies': True, 'skip-falloff': True}
+
+#: Default file for selected configurations
+default_cache_file = '.integrator-tuning.json'
+
+
+def candidates(reactor_type):
+    """Configurations that are compared by `tune`; the first is the reference."""
+    mole = _mole_reactors[reactor_type]
+    return [
+        IntegratorConfig('default', reactor_type, False, {}),
+        IntegratorConfig('preconditioned', mole, True, {}),
+        IntegratorConfig('preconditioned, skip third bodies and falloff', mole, True,
+                         skip_settings),
+    ]
+
+
+def make_network(gas, config):
+    """Reactor and `ReactorNet` for the state of ``gas``, set up for ``config``."""
+    reactor = getattr(ct, config.reactor)(gas)
+    net = ct.ReactorNet([reactor])
+    if config.derivative_settings:
+        net.derivative_settings = config.derivative_settings
+    if config.preconditioned:
+        net.preconditioner = ct.AdaptivePreconditioner()
+    net.initialize()
+    return reactor, net
+
+
+def fingerprint(gas):
+    """Hash of the input file of ``gas``, or of its species and reactions."""
+    source = Path(gas.source)
+    if source.is_file():
+        return file_hash(source)
+    text = "\n".join(gas.species_names + [f"{R.equation} {R.rate.input_data}"
+                                          for R in gas.reactions()])
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def trajectory_error(T, Y, T_ref, Y_ref, Y_floor=1e-6):
+    """Largest deviation of a trajectory from the reference trajectory.
+
+    :param T, Y:
+        Temperatures and mass fractions at the sample times.
+    :return:
+        Largest of the relative temperature error, and of the mass fraction
+        errors relative to the largest mass fraction of each species, for
+        species that reach at least ``Y_floor``.
+    """
+    error_T = np.abs(T - T_ref) / T_ref
+    scale = Y_ref.max(axis=0)
+    major = scale >= Y_floor
+    error_Y = np.abs(Y - Y_ref)[:, major] / scale[major]
+    return max(error_T.max(), error_Y.max(initial=0))
+
+
+def probe(gas, config, sample_times, reference=None, rtol=1e-3, time_limit=None):
+    """Integrate the state of ``gas`` with ``config`` to the sample times.
+
+    :param reference:
+        Temperatures and mass fractions of the reference trajectory.
+    :param rtol:
+        Tolerated deviation from the reference, see `trajectory_error`.
+    :param time_limit:
+        Wall time [s] after which the integration is stopped.
+    :return:
+        `ProbeResult`, and the temperatures and mass fractions at the sample
+        times.
+    """
+    state = gas.state
+    try:
+        reactor, net = make_network(gas, config)
+        T = np.empty(len(sample_times))
+        Y = np.empty((len(sample_times), gas.n_species))
+        aborted = False
+        t0 = default_timer()
+        for i, t in enumerate(sample_times):
+            net.advance(t)
+            T[i] = reactor.T
+            Y[i] = reactor.thermo.Y
+            if time_limit is not None and default_timer() - t0 > time_limit:
+                aborted = True
+                break
+        elapsed = default_timer() - t0
+        steps = net.solver_stats['steps']
+    finally:
+        gas.state = state
+    if aborted or reference is None:
+        error = np.nan if aborted else 0.0
+    else:
+        error = trajectory_error(T, Y, *reference)
+    result = ProbeResult(config, elapsed, steps, error, not aborted and error <= rtol,
+                         aborted)
+    return result, (T, Y)
+
+
+def _read_cache(cache_file):
+    try:
+        return json.loads(Path(cache_file).read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def tune(gas, reactor_type='IdealGasConstPressureMoleReactor', probe_time=1e-3,
+         n_samples=20, rtol=1e-3, abort_factor=2.0, cache_file=default_cache_file,
+         refresh=False):
+    """Select the fastest accurate integrator configuration for ``gas``.
+
+    :param gas:
+        `Solution` in the initial state of the probe integration.
+    :param reactor_type:
+        Name of the reactor class used in production runs.
+    :param probe_time:
+        Simulated time of the probe integrations [s].
+    :param n_samples:
+        Number of sample times at which trajectories are compared.
+    :param rtol:
+        Tolerated deviation from the default configuration, see
+        `trajectory_error`.
+    :param abort_factor:
+        Probes are stopped when they take longer than this factor times the
+        fastest accurate probe so far.
+    :param cache_file:
+        JSON file with selected configurations; `None` to always probe.
+    :param refresh:
+        Probe even if the cache file contains a configuration.
+    :return:
+        `TuningResult`.
+    """
+    key = f"{fingerprint(gas)}:{reactor_type}:{ct.__version__}"
+    cache = _read_cache(cache_file) if cache_file is not None else {}
+    if key in cache and not refresh:
+        return TuningResult(IntegratorConfig(**cache[key]), [], True)
+
+    sample_times = np.linspace(0, probe_time, n_samples + 1)[1:]
+    configs = candidates(reactor_type)
+    result, reference = probe(gas, configs[0], sample_times)
+    probes = [result]
+    best = result
+    for config in configs[1:]:
+        result, _ = probe(gas, config, sample_times, reference, rtol,
+                          abort_factor * best.time)
+        probes.append(result)
+        if result.accurate and result.time < best.time:
+            best = result
+
+    if cache_file is not None:
+        cache = _read_cache(cache_file)
+        cache[key] = best.config._asdict()
+        Path(cache_file).write_text(json.dumps(cache, indent=2) + "\n")
+    return TuningResult(best.config, probes, False)
+
+
+def report(result):
+    """Text summary of a `TuningResult`."""
+    if result.cached:
+        return f"selected (cached): {result.config.name}, {result.config.reactor}"
+    lines = [f"{'configuration':48s} {'time':>9s} {'steps':>6s} {'error':>9s}"]
+    for p in result.probes:
+        status = "aborted" if p.aborted else ("" if p.accurate else "inaccurate")
+        lines.append(f"{p.config.name:48s} {1e3 * p.time:6.0f} ms {p.steps:6d} "
+                     f"{p.error:9.1e} {status}")
+    lines.append(f"selected: {result.config.name}, {result.config.reactor}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    import tempfile
+
+    ct.suppress_thermo_warnings()
+
+    #: mechanism, fuel, T [K], P [atm], probe time [s], production end time [s]
+    problems = [
+        ('h2o2.yaml', 'H2', 1000, 5, 1e-3, 0.5),
+        ('gri30.yaml', 'CH4', 1200, 5, 1e-2, 0.5),
+        ('../inputs/n-hexane-NUIG-2015.yaml', 'NC6H14', 1000, 1, 1e-2, 0.1),
+    ]
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_file = Path(tmp) / 'tuning.json'
+        for mech, fuel, T, P, probe_time, end_time in problems:
+            gas = ct.Solution(mech, transport_model=None)
+            gas.TP = T, P * ct.one_atm
+            gas.set_equivalence_ratio(1.0, fuel, 'O2:1.0, N2:3.76')
+            print(f"{mech}, probe to {1e3 * probe_time:g} ms:")
+            t0 = default_timer()
+            result = tune(gas, probe_time=probe_time, cache_file=cache_file)
+            print(report(result))
+            print(f"tuning time: {default_timer() - t0:.2f} s")
+            t0 = default_timer()
+            result = tune(gas, probe_time=probe_time, cache_file=cache_file)
+            print(f"second call: {report(result)} "
+                  f"({1e3 * (default_timer() - t0):.0f} ms)")
+
+            # production run with the selected configuration
+            reactor, net = make_network(gas, result.config)
+            t0 = default_timer()
+            net.advance(end_time)
+            print(f"integration to {end_time} s: {default_timer() - t0:.2f} s "
+                  f"(T_final={reactor.T:.2f})\n")
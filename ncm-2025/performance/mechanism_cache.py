@@ -0,0 +1,258 @@
+"""
+Binary cache of parsed mechanisms for faster `Solution` startup.
+
+`preconditioned_integration` creates a `Solution` from `n-hexane-NUIG-2015.yaml`
+twice, and every worker process of `reactor_map.py` reads its mechanism again.
+Most of the startup time is spent parsing YAML. `cached_solution` parses the
+input file once, and stores the definitions of the phase, its species and its
+reactions as a pickle with the extension `.ctcache` in a per-user cache
+directory, `default_cache_dir`. Later calls, including those from other
+processes, create the `Solution` from these definitions without parsing the
+YAML file:
+
+    gas = cached_solution('../inputs/n-hexane-NUIG-2015.yaml')
+
+Input files are found like Cantera finds them, so files from the Cantera data
+directories, such as ``gri30.yaml``, can be given by name. The cache is keyed by
+the SHA-256 hash of the input file and the Cantera version, and is rebuilt
+whenever either changes. Loads with different phase names or transport model
+overrides are stored as separate entries of the cache file. Species or reactions imported
+from other files, such as `gri30.yaml/species: [...]`, are not part of the
+hash; edits to such files require `clear_cache`. Phases with fields that cannot
+be passed to the `Solution` constructor, such as the electron energy
+distribution of plasma phases, or phases with adjacent phases, are loaded from
+the input file every time.
+
+The cache saves the time spent reading the input file, but not the time spent
+fitting transport properties, which Cantera repeats for every new `Solution`
+that uses a transport model.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python mechanism_cache.py
+"""
+import hashlib
+import os
+from pathlib import Path
+import pickle
+import subprocess
+import sys
+from timeit import default_timer
+
+import cantera as ct
+
+#: Version of the cache file layout
+cache_version = 2
+
+#: Directory for cache files if no other directory is given
+default_cache_dir = Path(os.environ.get('XDG_CACHE_HOME', Path.home() / '.cache'),
+                         'cantera', 'mechanisms')
+
+#: Phase fields that are represented by the arguments of the `Solution` constructor
+_portable_fields = {'name', 'thermo', 'elements', 'species', 'kinetics',
+                    'reactions', 'transport', 'state', 'skip-undeclared-elements',
+                    'skip-undeclared-third-bodies', 'note'}
+
+
+def _plain(data):
+    """Convert nested `AnyMap` objects to plain dictionaries."""
+    if isinstance(data, dict):
+        return {key: _plain(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_plain(value) for value in data]
+    return data
+
+
+def find_input_file(filename):
+    """Absolute path of an input file, searched for in the current directory
+    and then in the Cantera data directories, as Cantera does.
+    """
+    path = Path(filename)
+    if path.is_file():
+        return path.resolve()
+    if not path.is_absolute():
+        for directory in ct.get_data_directories():
+            candidate = Path(directory) / path
+            if candidate.is_file():
+                return candidate.resolve()
+    raise FileNotFoundError(f"Input file '{filename}' not found")
+
+
+def file_hash(filename):
+    """SHA-256 hex digest of the contents of ``filename``."""
+    return hashlib.sha256(find_input_file(filename).read_bytes()).hexdigest()
+
+
+def cache_path(filename, cache_dir=None):
+    """Location of the cache file of ``filename``.
+
+    The name of the cache file contains a hash of the absolute path of the
+    input file, so that input files with the same name do not share a cache
+    file.
+
+    :param cache_dir:
+        Directory for the cache file; by default, `default_cache_dir`.
+    """
+    path = find_input_file(filename)
+    directory = Path(cache_dir) if cache_dir is not None else default_cache_dir
+    tag = hashlib.sha256(str(path).encode()).hexdigest()[:16]
+    return directory / f"{path.name}.{tag}.ctcache"
+
+
+def _portable(gas):
+    data = gas.input_data
+    return set(data) <= _portable_fields and 'kinetics' in data
+
+
+def _definition(gas):
+    """Plain data needed to create ``gas`` again."""
+    data = gas.input_data
+    return {
+        'thermo': data['thermo'],
+        'kinetics': data['kinetics'],
+        'transport': gas.transport_model,
+        'species': [_plain(sp.input_data) for sp in gas.species()],
+        'reactions': [_plain(R.input_data) for R in gas.reactions()],
+        'state': gas.TPY,
+    }
+
+
+def _read(path, digest):
+    try:
+        with open(path, 'rb') as stream:
+            cache = pickle.load(stream)
+    except (OSError, EOFError, pickle.UnpicklingError):
+        return {}
+    if (cache.get('version') != cache_version or cache.get('cantera') != ct.__version__
+            or cache.get('hash') != digest):
+        return {}
+    return cache['phases']
+
+
+def _build(definition):
+    species = [ct.Species.from_dict(data) for data in definition['species']]
+    # reactions need a kinetics object that knows the species
+    template = ct.Solution(thermo=definition['thermo'], kinetics=definition['kinetics'],
+                           species=species, reactions=[])
+    reactions = [ct.Reaction.from_dict(data, template)
+                 for data in definition['reactions']]
+    gas = ct.Solution(thermo=definition['thermo'], kinetics=definition['kinetics'],
+                      species=species, reactions=reactions, name=definition['name'],
+                      transport_model=definition['transport'])
+    gas.TPY = definition['state']
+    return gas
+
+
+def cached_solution(filename, name='', transport_model=..., cache_dir=None):
+    """Create a `Solution`, using the cache file of ``filename`` if it is valid.
+
+    :param filename:
+        YAML input file, which may be in a Cantera data directory.
+    :param name:
+        Name of the phase; by default, the first phase of the file.
+    :param transport_model:
+        Transport model, overriding the one of the input file.
+    :param cache_dir:
+        Directory for the cache file; by default, `default_cache_dir`.
+        Failures to write the cache file are ignored.
+    """
+    kwargs = {} if transport_model is ... else {'transport_model': transport_model}
+    filename = find_input_file(filename)
+    digest = file_hash(filename)
+    path = cache_path(filename, cache_dir)
+    phases = _read(path, digest)
+    # the definition records the transport model of this load, which is only
+    # the one of the input file if it was not overridden
+    key = (name, transport_model)
+    if key in phases:
+        return _build(phases[key])
+
+    gas = ct.Solution(str(filename), name, **kwargs)
+    if not _portable(gas):
+        return gas
+    definition = _definition(gas)
+    definition['name'] = gas.name
+    phases[key] = definition
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'wb') as stream:
+            pickle.dump({'version': cache_version, 'cantera': ct.__version__,
+                         'hash': digest, 'phases': phases},
+                        stream, protocol=pickle.HIGHEST_PROTOCOL)
+    except OSError:
+        pass
+    return gas
+
+
+def clear_cache(filename, cache_dir=None):
+    """Remove the cache file of ``filename``, if it exists."""
+    cache_path(filename, cache_dir).unlink(missing_ok=True)
+
+
+def _time_load(filename, name, mode, cache_dir, transport_model, repeat=3):
+    """Time loads in new processes, where Cantera has not read any files yet.
+
+    :return:
+        Shortest of ``repeat`` load times [s]; cold loads start without a cache
+        file.
+    """
+    args = [sys.executable, '-W', 'ignore', __file__, '--time', str(filename), name,
+            'yaml' if mode == 'yaml' else 'cache', str(cache_dir), transport_model or '']
+    times = []
+    for _ in range(repeat):
+        if mode == 'cold':
+            clear_cache(filename, cache_dir)
+        result = subprocess.run(args, capture_output=True, text=True, check=True)
+        times.append(float(result.stdout.split()[-1]))
+    return min(times)
+
+
+if __name__ == '__main__' and sys.argv[1:2] == ['--time']:
+    filename, name, mode, cache_dir, transport_model = sys.argv[2:]
+    kwargs = {'transport_model': transport_model} if transport_model else {}
+    ct.suppress_thermo_warnings()
+    t0 = default_timer()
+    if mode == 'yaml':
+        ct.Solution(filename, name, **kwargs)
+    else:
+        cached_solution(filename, name, cache_dir=cache_dir, **kwargs)
+    print(default_timer() - t0)
+
+elif __name__ == '__main__':
+    import tempfile
+    import numpy as np
+
+    ct.suppress_thermo_warnings()
+    inputs = Path('../inputs')
+    # phase names and transport models differing from the defaults
+    names = {'ptcombust_simple.yaml': 'gas',
+             'oxygen-plasma.yaml': 'isotropic-electron-energy-plasma'}
+    transport = {'oxygen-plasma.yaml': 'none'}
+
+    print(f"{'mechanism':28s} {'size':>9s} {'YAML':>9s} {'cold':>9s} {'warm':>9s}"
+          "   (new process for each load)")
+    with tempfile.TemporaryDirectory() as cache_dir:
+        for path in sorted(inputs.rglob('*.yaml')):
+            name = names.get(path.name, '')
+            kwargs = {'transport_model': transport[path.name]} \
+                if path.name in transport else {}
+            t_yaml = _time_load(path, name, 'yaml', cache_dir, kwargs.get('transport_model'))
+            t_cold = _time_load(path, name, 'cold', cache_dir, kwargs.get('transport_model'))
+            t_warm = _time_load(path, name, 'warm', cache_dir, kwargs.get('transport_model'))
+            cached = cache_path(path, cache_dir).exists()
+            print(f"{str(path.relative_to(inputs)):28s} {path.stat().st_size / 1024:6.0f} kB "
+                  f"{1e3 * t_yaml:6.0f} ms {1e3 * t_cold:6.0f} ms {1e3 * t_warm:6.0f} ms"
+                  f"{'' if cached else '   not cacheable, read from YAML'}")
+            if not cached:
+                continue
+
+            # the cached Solution reproduces the original one
+            gas = ct.Solution(str(path), name, **kwargs)
+            copy = cached_solution(path, name, cache_dir=cache_dir, **kwargs)
+            for phase in (gas, copy):
+                phase.TPX = 1500, ct.one_atm, np.ones(phase.n_species)
+            assert gas.species_names == copy.species_names
+            assert gas.reaction_equations() == copy.reaction_equations()
+            assert gas.transport_model == copy.transport_model
+            assert np.allclose(gas.net_production_rates, copy.net_production_rates,
+                               rtol=1e-12, atol=1e-300)
@@ -0,0 +1,316 @@
+"""
+Hash-indexed comparison of two mechanisms.
+
+In `07_thermo_debugging`, reaction 295 of `mech.yaml` is matched to reaction 288
+of GRI 3.0 by searching for species names and comparing equations by eye.
+`diff_mechanisms` matches all reactions of two mechanisms at once: each
+reaction is reduced to a canonical key, made of its reactant and product
+stoichiometry with the two sides sorted, its reaction type and its third body,
+so the key does not depend on the order of species or the direction in which
+the reaction is written. Keys are looked up in a dictionary, so matching takes
+linear time. Matched reactions are then compared over a temperature grid using
+`SolutionArray` rate constants, and matched species using `ThermoTable`.
+
+    diff = diff_mechanisms(ct.Solution('../inputs/mech.yaml'),
+                           ct.Solution('gri30.yaml'))
+    print(diff)
+
+Rate constants of different reaction types, such as ``NNH <=> H + N2`` and
+``NNH + M <=> H + N2 + M``, have different units, and reactions with different
+explicit colliders are different reactions, so neither are matched; a reaction
+that changes its type or collider is reported as removed and added. Reactions
+marked as duplicates share a key, and are compared by their summed rate
+constants. Reactions written in opposite directions are compared using the
+reverse rate constants of the second mechanism.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python mechanism_diff.py
+"""
+from typing import NamedTuple
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+from thermo_table import ThermoTable
+
+
+class ReactionChange(NamedTuple):
+    """A reaction found in both mechanisms with different rate constants or
+    reversibility.
+
+    ``log_ratio`` is ``log10(k_a / k_b)`` at temperature ``T``, where the
+    magnitude is largest, and `nan` if the reactions have no direction in
+    which both are nonzero, for example irreversible reactions written in
+    opposite directions.
+    """
+    index_a: tuple
+    index_b: tuple
+    equation: str
+    type_a: str
+    type_b: str
+    log_ratio: float
+    T: float
+    reversible_a: bool
+    reversible_b: bool
+
+
+class SpeciesChange(NamedTuple):
+    """A species found in both mechanisms with different thermo data.
+
+    Largest absolute differences of cp/R, h/RT and s/R over the temperature grid.
+    """
+    name: str
+    d_cp: float
+    d_h: float
+    d_s: float
+
+
+class MechanismDiff(NamedTuple):
+    """Result of `diff_mechanisms`.
+    """
+    added_species: list
+    removed_species: list
+    changed_species: list
+    added_reactions: list
+    removed_reactions: list
+    changed_reactions: list
+    n_matched_reactions: int
+
+    def __str__(self):
+        lines = [
+            f"species: {len(self.added_species)} added, "
+            f"{len(self.removed_species)} removed, "
+            f"{len(self.changed_species)} with changed thermo",
+            f"reactions: {self.n_matched_reactions} matched, "
+            f"{len(self.added_reactions)} added, {len(self.removed_reactions)} "
+            f"removed, {len(self.changed_reactions)} with changed rates or "
+            f"reversibility"]
+        for change in self.changed_reactions[:10]:
+            if np.isnan(change.log_ratio):
+                rates = f"{'no common direction':29s}"
+            else:
+                rates = f"{change.log_ratio:+7.2f} decades at {change.T:6.0f} K"
+            if change.reversible_a != change.reversible_b:
+                rates += " (now reversible)" if change.reversible_b else " (now irreversible)"
+            lines.append(f"  {rates}  {change.equation}  "
+                         f"{change.index_a} -> {change.index_b}")
+        return "\n".join(lines)
+
+
+def _side(stoich, normalize):
+    return tuple(sorted((normalize(k), float(nu)) for k, nu in stoich.items()))
+
+
+def _collider(R, normalize):
+    if R.third_body is None:
+        return None
+    name = R.third_body.name
+    return name if name == 'M' else normalize(name)
+
+
+def reaction_keys(gas, normalize=str.upper):
+    """Canonical keys of all reactions.
+
+    Reactions that have the same stoichiometry, reaction type and third body
+    but are not marked as duplicates are numbered in the order of appearance,
+    so that only duplicate reactions share a key.
+
+    :return:
+        List with one ``(key, reversed)`` pair per reaction, where ``reversed``
+        is `True` if the key lists the products first.
+    """
+    keys = []
+    count = {}
+    for R in gas.reactions():
+        left = _side(R.reactants, normalize)
+        right = _side(R.products, normalize)
+        reversed_ = left > right
+        if reversed_:
+            left, right = right, left
+        key = (left, right, R.reaction_type, _collider(R, normalize))
+        if R.duplicate:
+            occurrence = 'duplicate'
+        else:
+            occurrence = count.get(key, 0)
+            count[key] = occurrence + 1
+        keys.append((key + (occurrence,), reversed_))
+    return keys
+
+
+def _group(keys):
+    """Map each key to the indices of the reactions that share it."""
+    groups = {}
+    for i, (key, _) in enumerate(keys):
+        groups.setdefault(key, []).append(i)
+    return groups
+
+
+def _bath_gas(gas, normalize):
+    names = {normalize(k): k for k in gas.species_names}
+    for candidate in ('N2', 'AR', 'HE'):
+        if candidate in names:
+            return f"{names[candidate]}:1.0"
+    return {k: 1.0 for k in gas.species_names}
+
+
+def diff_mechanisms(gas_a, gas_b, T=None, P=ct.one_atm, rate_tol=0.01,
+                    thermo_tol=1e-3, normalize=str.upper):
+    """Compare species thermo and reactions of two mechanisms.
+
+    :param gas_a, gas_b:
+        `Solution` objects to be compared; changes are reported from ``a`` to
+        ``b``.
+    :param T:
+        Temperature grid [K]; defaults to 100 points from 300 to 3000 K.
+    :param P:
+        Pressure [Pa] used for pressure-dependent reactions.
+    :param rate_tol:
+        Tolerated difference of rate constants in decades. Rate constants are
+        compared in a common direction of matched reactions, so a reaction
+        that is reversible in one mechanism and irreversible in the other is
+        compared in the direction of the irreversible reaction.
+    :param thermo_tol:
+        Tolerated difference of cp/R, h/RT and s/R.
+    :param normalize:
+        Function applied to species names before matching; the default ignores
+        capitalization.
+    :return:
+        `MechanismDiff`, with changes sorted by magnitude and reactions without
+        a common direction last.
+    """
+    T = np.linspace(300, 3000, 100) if T is None else np.asarray(T, float)
+
+    # species
+    names_a = {normalize(k): k for k in gas_a.species_names}
+    names_b = {normalize(k): k for k in gas_b.species_names}
+    common = [k for k in names_a if k in names_b]
+    table_a = ThermoTable([gas_a.species(names_a[k]) for k in common])
+    table_b = ThermoTable([gas_b.species(names_b[k]) for k in common])
+    thermo_a = np.array(table_a.reduced(T))
+    thermo_b = np.array(table_b.reduced(T))
+    delta = np.abs(thermo_a - thermo_b).max(axis=1)
+    changed_species = [SpeciesChange(names_b[common[j]], *delta[:, j])
+                       for j in np.nonzero(delta.max(axis=0) > thermo_tol)[0]]
+    changed_species.sort(key=lambda change: -max(change[1:]))
+
+    # reactions
+    keys_a = reaction_keys(gas_a, normalize)
+    keys_b = reaction_keys(gas_b, normalize)
+    groups_a = _group(keys_a)
+    groups_b = _group(keys_b)
+    matched = [key for key in groups_a if key in groups_b]
+    removed = [gas_a.reaction(i).equation for key in groups_a
+               if key not in groups_b for i in groups_a[key]]
+    added = [gas_b.reaction(i).equation for key in groups_b
+             if key not in groups_a for i in groups_b[key]]
+
+    states_a = ct.SolutionArray(gas_a, len(T))
+    states_a.TPX = T, P, _bath_gas(gas_a, normalize)
+    states_b = ct.SolutionArray(gas_b, len(T))
+    states_b.TPX = T, P, _bath_gas(gas_b, normalize)
+    kf_a, kr_a = states_a.forward_rate_constants, states_a.reverse_rate_constants
+    kf_b, kr_b = states_b.forward_rate_constants, states_b.reverse_rate_constants
+    reversible_a = [R.reversible for R in gas_a.reactions()] if matched else []
+    reversible_b = [R.reversible for R in gas_b.reactions()] if matched else []
+
+    # Rates are compared in one direction per matched key: the written
+    # direction of an irreversible reaction, if there is one, and otherwise the
+    # written direction of the first reaction in ``a``. Each reaction
+    # contributes its forward rate constant if it is written in that
+    # direction, and its reverse rate constant otherwise.
+    direction = []
+    for key in matched:
+        irreversible = [keys[i][1] for keys, reversible, group in (
+            (keys_b, reversible_b, groups_b[key]), (keys_a, reversible_a, groups_a[key]))
+            for i in group if not reversible[i]]
+        direction.append(irreversible[0] if irreversible else keys_a[groups_a[key][0]][1])
+
+    def by_key(kf, kr, keys, groups):
+        column = []
+        selected = []
+        for j, key in enumerate(matched):
+            for i in groups[key]:
+                column.append(j)
+                selected.append(i)
+        flipped = np.array([keys[i][1] for i in selected], dtype=bool)
+        same = flipped == np.array(direction, dtype=bool)[column]
+        k = np.where(same, kf[:, selected], kr[:, selected])
+        summed = np.zeros((len(T), len(matched)))
+        np.add.at(summed, (slice(None), column), k)
+        return summed
+
+    k_a = by_key(kf_a, kr_a, keys_a, groups_a)
+    k_b = by_key(kf_b, kr_b, keys_b, groups_b)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        log_ratio = np.log10(k_a) - np.log10(k_b)
+    # zero in both mechanisms compares equal; zero in only one is not compared
+    log_ratio[(k_a == 0) & (k_b == 0)] = 0.0
+    log_ratio[(k_a == 0) != (k_b == 0)] = np.nan
+    comparable = ~np.isnan(log_ratio).all(axis=0)
+    worst = np.nanargmax(np.where(np.isnan(log_ratio), -1.0, np.abs(log_ratio)), axis=0)
+    worst_ratio = np.where(comparable, log_ratio[worst, np.arange(len(matched))], np.nan)
+    worst_T = np.where(comparable, T[worst], np.nan)
+
+    types_a = [R.reaction_type for R in gas_a.reactions()] if matched else []
+    types_b = [R.reaction_type for R in gas_b.reactions()] if matched else []
+    changed = []
+    for j, key in enumerate(matched):
+        ia, ib = groups_a[key], groups_b[key]
+        rev_a = all(reversible_a[i] for i in ia)
+        rev_b = all(reversible_b[i] for i in ib)
+        if comparable[j] and abs(worst_ratio[j]) <= rate_tol and rev_a == rev_b:
+            continue
+        changed.append(ReactionChange(
+            tuple(ia), tuple(ib), gas_a.reaction(ia[0]).equation,
+            types_a[ia[0]], types_b[ib[0]], worst_ratio[j], worst_T[j], rev_a, rev_b))
+    # changes without a common direction last
+    changed.sort(key=lambda change: (np.isnan(change.log_ratio), -abs(change.log_ratio)))
+
+    return MechanismDiff(
+        added_species=[names_b[k] for k in names_b if k not in names_a],
+        removed_species=[names_a[k] for k in names_a if k not in names_b],
+        changed_species=changed_species,
+        added_reactions=added, removed_reactions=removed,
+        changed_reactions=changed, n_matched_reactions=len(matched))
+
+
+if __name__ == '__main__':
+    ct.suppress_thermo_warnings()
+
+    # the comparison from 07_thermo_debugging
+    gas = ct.Solution('../inputs/mech.yaml')
+    gri = ct.Solution('gri30.yaml')
+    t0 = default_timer()
+    diff = diff_mechanisms(gas, gri)
+    t_diff = default_timer() - t0
+    print(f"mech.yaml -> gri30.yaml ({1e3 * t_diff:.0f} ms)")
+    print(diff)
+    # reaction 295 has a different type in GRI 3.0, and is not matched
+    stoich = reaction_keys(gas)[295][0][:2]
+    for i, (key, _) in enumerate(reaction_keys(gri)):
+        if key[:2] == stoich:
+            print(f"  reaction 295 ({gas.reaction(295).reaction_type}) -> "
+                  f"{i} ({gri.reaction(i).reaction_type}): {gri.reaction(i).equation}")
+
+    # NUIG against a modified copy of itself
+    nuig = 'n-hexane-NUIG-2015.yaml'
+    gas_a = ct.Solution(f'../inputs/{nuig}')
+    reactions = gas_a.reactions()
+    rng = np.random.default_rng(0)
+    modified = rng.choice(len(reactions), 10, replace=False)
+    for i in modified:
+        R = reactions[i]
+        if isinstance(R.rate, ct.ArrheniusRate):
+            R.rate = ct.ArrheniusRate(2 * R.rate.pre_exponential_factor,
+                                      R.rate.temperature_exponent,
+                                      R.rate.activation_energy)
+    gas_b = ct.Solution(thermo='ideal-gas', kinetics='gas',
+                        species=gas_a.species(), reactions=reactions[:-20])
+    t0 = default_timer()
+    diff = diff_mechanisms(gas_a, gas_b)
+    t_diff = default_timer() - t0
+    print(f"{nuig} -> modified copy ({gas_a.n_reactions} reactions, "
+          f"{1e3 * t_diff:.0f} ms)")
+    print(diff)
@@ -0,0 +1,175 @@
+"""
+Loading a subset of the species and reactions of a mechanism.
+
+Thermo and equilibrium calculations, such as the adiabatic flame temperatures in
+`02_thermo_kinetics_intro`, often need only a handful of species, but load all
+of GRI 3.0 or NUIG. `subset_solution` writes a small phase definition that
+imports the selected species from the mechanism file, together with the
+reactions among them (``declared-species``), and creates the `Solution` from
+it. Cantera still reads the input file, but only creates objects for the
+selected species and reactions:
+
+    gas = subset_solution('gri30.yaml', ['CH4', 'O2', 'N2', 'H2O', 'CO2'])
+
+Species can also be selected by element, for example all species made of H,
+O and N:
+
+    h2o2 = subset_solution('gri30.yaml', elements=['H', 'O', 'N'])
+
+which requires reading the composition of every species first.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python mechanism_subset.py
+"""
+import json
+from pathlib import Path
+import subprocess
+import sys
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+
+def _locate(filename):
+    """Absolute path of an input file, or the name of a Cantera data file."""
+    path = Path(filename)
+    return str(path.resolve()) if path.exists() else str(filename)
+
+
+def select_species(filename, elements, species=None):
+    """Names of species that contain only the given elements.
+
+    :param filename:
+        YAML input file.
+    :param elements:
+        Allowed element symbols.
+    :param species:
+        Candidate species names; by default, all species of the file.
+    """
+    allowed = {e.upper() for e in elements}
+    candidates = None if species is None else set(species)
+    return [sp.name for sp in ct.Species.list_from_file(_locate(filename))
+            if (candidates is None or sp.name in candidates)
+            and all(e.upper() in allowed for e in sp.composition)]
+
+
+def subset_yaml(filename, species, reactions=True, thermo='ideal-gas',
+                transport_model=None, name='subset'):
+    """YAML phase definition importing ``species`` from ``filename``.
+
+    Species names and paths are written as JSON strings, which are valid YAML
+    and need no further quoting.
+    """
+    source = _locate(filename)
+    lines = ["phases:",
+             f"- name: {json.dumps(name)}",
+             f"  thermo: {thermo}",
+             f"  species: [{{{json.dumps(source + '/species')}: "
+             f"{json.dumps(list(species))}}}]"]
+    if reactions:
+        lines += ["  kinetics: gas",
+                  f"  reactions: [{{{json.dumps(source + '/reactions')}: "
+                  "declared-species}]",
+                  "  skip-undeclared-third-bodies: true"]
+    if transport_model:
+        lines.append(f"  transport: {transport_model}")
+    return "\n".join(lines) + "\n"
+
+
+def subset_solution(filename, species=None, elements=None, reactions=True,
+                    thermo='ideal-gas', transport_model=None):
+    """Create a `Solution` with a subset of the species of a mechanism.
+
+    :param filename:
+        YAML input file, or the name of a file in the Cantera data directories.
+    :param species:
+        Names of the species to keep.
+    :param elements:
+        Element symbols; only species made of these elements are kept. If
+        ``species`` is not given, all such species of the file are kept.
+    :param reactions:
+        If `False`, create a thermo-only `Solution` without reactions.
+        Otherwise, keep all reactions that involve only the selected species;
+        third-body efficiencies of other species are dropped.
+    :param thermo:
+        Thermo model of the new phase.
+    :param transport_model:
+        Transport model; the selected species need transport data.
+    """
+    if species is None and elements is None:
+        raise ValueError("Either species or elements need to be specified")
+    if elements is not None:
+        species = select_species(filename, elements, species)
+    if not species:
+        raise ValueError("No species selected")
+    return ct.Solution(yaml=subset_yaml(filename, species, reactions, thermo,
+                                        transport_model))
+
+
+def adiabatic_flame_temperatures(gas, fuel, phi, oxidizer='O2:1.0, N2:3.76'):
+    """Adiabatic flame temperatures [K] of fuel/oxidizer mixtures at 300 K, 1 atm."""
+    T = np.empty(len(phi))
+    for i, value in enumerate(phi):
+        gas.TP = 300, ct.one_atm
+        gas.set_equivalence_ratio(value, fuel, oxidizer)
+        gas.equilibrate('HP')
+        T[i] = gas.T
+    return T
+
+
+#: Species for equilibrium calculations of hydrocarbon/air flames
+major_species = ['O2', 'N2', 'H2O', 'CO2', 'CO', 'H2', 'OH', 'H', 'O']
+
+#: Benchmark cases: input file, fuel, and whether reactions are included
+cases = {
+    'gri30 thermo': ('gri30.yaml', 'CH4', False),
+    'gri30 kinetics': ('gri30.yaml', 'CH4', True),
+    'NUIG thermo': ('../inputs/n-hexane-NUIG-2015.yaml', 'NC6H14', False),
+}
+
+
+def _run_case(case, mode, phi):
+    """Load a mechanism and compute flame temperatures; return both times."""
+    filename, fuel, kinetics = cases[case]
+    t0 = default_timer()
+    if mode == 'full':
+        gas = ct.Solution(_locate(filename), transport_model=None)
+    else:
+        gas = subset_solution(filename, [fuel] + major_species, reactions=kinetics)
+    t_load = default_timer() - t0
+    t0 = default_timer()
+    T = adiabatic_flame_temperatures(gas, fuel, phi)
+    return t_load, default_timer() - t0, T, gas
+
+
+if __name__ == '__main__' and sys.argv[1:2] == ['--time']:
+    ct.suppress_thermo_warnings()
+    t_load, t_eq, T, gas = _run_case(sys.argv[2], sys.argv[3],
+                                     np.linspace(0.5, 1.5, 21))
+    print(t_load, t_eq, gas.n_species, gas.n_reactions, *T)
+
+elif __name__ == '__main__':
+    ct.suppress_thermo_warnings()
+    print(f"{'case':16s} {'':6s} {'species':>8s} {'reactions':>9s} {'load':>9s} "
+          f"{'21 x HP':>9s}  (new process for each load)")
+    for case in cases:
+        results = {}
+        for mode in ('full', 'subset'):
+            output = subprocess.run(
+                [sys.executable, '-W', 'ignore', __file__, '--time', case, mode],
+                capture_output=True, text=True, check=True).stdout.split()
+            t_load, t_eq, n_species, n_reactions = map(float, output[:4])
+            results[mode] = np.array(output[4:], dtype=float)
+            print(f"{case:16s} {mode:6s} {n_species:8.0f} {n_reactions:9.0f} "
+                  f"{1e3 * t_load:6.0f} ms {1e3 * t_eq:6.0f} ms")
+        error = np.abs(results['subset'] - results['full']).max()
+        print(f"{'':16s} largest difference of adiabatic flame temperature: "
+              f"{error:.1f} K")
+
+    # selection by element
+    t0 = default_timer()
+    h2o2 = subset_solution('gri30.yaml', elements=['H', 'O', 'N', 'Ar'])
+    print(f"gri30 without carbon: {h2o2.n_species} species, {h2o2.n_reactions} "
+          f"reactions ({1e3 * (default_timer() - t0):.0f} ms)")
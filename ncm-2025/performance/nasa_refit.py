@@ -0,0 +1,303 @@
+"""
+Constrained refitting of 7-coefficient NASA polynomials.
+
+`thermo_scan.py` flags species such as `H2CNO` in `mech_debug`, whose two
+NASA polynomials do not meet at the midpoint temperature (here, because the
+polynomials meet at 1000 K while the entry says 1500 K). Repairing such entries
+by hand means editing coefficients in `thermo.txt`. `refit_nasa7` does this
+for many species at once:
+
+1. Each polynomial is sampled on its side of the temperature where the two
+   polynomials agree best, which recovers the data the entry was fitted to.
+2. New low and high temperature polynomials are fitted to cp/R, h/RT and s/R
+   by least squares, subject to continuity of cp, its first two derivatives,
+   h and s at the midpoint temperature.
+
+All species are fitted together as one batch of equality-constrained least
+squares problems. The results can be written as a CHEMKIN thermo block for
+`ck2yaml`, as a YAML file with the corrected species entries, or used
+directly to create a `Solution`:
+
+    fits = refit_nasa7([gas.species('H2CNO')])
+    print(thermo_block(fits))
+    fixed = patched_solution(gas, fits)
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python nasa_refit.py
+"""
+from typing import NamedTuple
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+from thermo_table import ThermoTable
+
+#: Temperature scale used to keep the fitting problem well conditioned
+_T_scale = 1000.0
+
+
+class NasaFit(NamedTuple):
+    """Refitted NASA-7 polynomials of one species.
+
+    ``T_split`` is the temperature where the original polynomials agreed best,
+    and ``rms`` the root mean square deviation of the new fit from the sampled
+    cp/R, h/RT and s/R values.
+    """
+    species: ct.Species
+    T_min: float
+    T_mid: float
+    T_max: float
+    low: np.ndarray
+    high: np.ndarray
+    T_split: float
+    rms: float
+
+    @property
+    def thermo(self):
+        """The fit as a `NasaPoly2` object."""
+        return ct.NasaPoly2(self.T_min, self.T_max, self.species.thermo.reference_pressure,
+                            np.hstack([self.T_mid, self.high, self.low]))
+
+
+def _rows(tau):
+    """Rows of cp/R, h/RT and s/R in the scaled coefficients, shape (..., 3, 7)."""
+    zero = np.zeros_like(tau)
+    one = np.ones_like(tau)
+    cp = np.stack([one, tau, tau**2, tau**3, tau**4, zero, zero], axis=-1)
+    h = np.stack([one, tau / 2, tau**2 / 3, tau**3 / 4, tau**4 / 5, 1 / tau, zero],
+                 axis=-1)
+    s = np.stack([np.log(tau), tau, tau**2 / 2, tau**3 / 3, tau**4 / 4, zero, one],
+                 axis=-1)
+    return np.stack([cp, h, s], axis=-2)
+
+
+def _derivatives(tau):
+    """Rows of d(cp/R)/dtau and d2(cp/R)/dtau2, shape (..., 2, 7)."""
+    zero = np.zeros_like(tau)
+    one = np.ones_like(tau)
+    d1 = np.stack([zero, one, 2 * tau, 3 * tau**2, 4 * tau**3, zero, zero], axis=-1)
+    d2 = np.stack([zero, zero, 2 * one, 6 * tau, 12 * tau**2, zero, zero], axis=-1)
+    return np.stack([d1, d2], axis=-2)
+
+
+def _unscale(alpha):
+    """Convert coefficients in tau = T / 1000 to the standard NASA-7 form."""
+    a = alpha.copy()
+    a[..., :5] /= _T_scale ** np.arange(5)
+    a[..., 5] *= _T_scale
+    a[..., 6] -= alpha[..., 0] * np.log(_T_scale)
+    return a
+
+
+def _evaluate(a, T):
+    """cp/R, h/RT and s/R of NASA-7 coefficients ``a`` (n, 7) at ``T`` (n, m)."""
+    return np.einsum('kmij,kj->kmi', _rows(T), a)
+
+
+def split_temperatures(table, n_points=500):
+    """Temperatures where the low and high polynomials of each species agree best.
+
+    :param table:
+        `ThermoTable` of species with NASA-7 polynomials.
+    :return:
+        Array with one temperature per species.
+    """
+    T = np.linspace(table.min_temp.min(), table.max_temp.max(), n_points)
+    T = np.broadcast_to(T, (table.n_species, n_points))
+    # NASA-7 coefficients are stored in the NASA-9 basis, as a2..a8
+    low = _evaluate(table.coeffs[0][:, 2:], T)
+    high = _evaluate(table.coeffs[1][:, 2:], T)
+    mismatch = np.abs(high - low).sum(axis=2)
+    inside = (T > table.min_temp[:, np.newaxis]) & (T < table.max_temp[:, np.newaxis])
+    mismatch[~inside] = np.inf
+    return T[0, mismatch.argmin(axis=1)]
+
+
+def refit_nasa7(species, T_mid=None, n_points=50):
+    """Refit the NASA-7 polynomials of several species.
+
+    :param species:
+        List of `Species` with `NasaPoly2` thermo.
+    :param T_mid:
+        New midpoint temperature; by default, each species keeps its own.
+    :param n_points:
+        Number of samples on each side of the split temperature.
+    :return:
+        List of `NasaFit`, in the order of ``species``.
+    """
+    species = list(species)
+    if not all(isinstance(sp.thermo, ct.NasaPoly2) for sp in species):
+        raise TypeError("Only species with NASA-7 polynomials can be refitted")
+    table = ThermoTable(species)
+    n = len(species)
+    T_min, T_max = table.min_temp, table.max_temp
+    T_split = split_temperatures(table)
+    if T_mid is None:
+        T_mid = table.bounds[:, 1].copy()
+    T_mid = np.broadcast_to(np.asarray(T_mid, dtype=float), (n,))
+
+    # samples of the original polynomials, each on its side of the split
+    x = np.linspace(0, 1, n_points)
+    T_low = T_min[:, np.newaxis] + x * (T_split - T_min)[:, np.newaxis]
+    T_high = T_split[:, np.newaxis] + x * (T_max - T_split)[:, np.newaxis]
+    samples = np.concatenate([_evaluate(table.coeffs[0][:, 2:], T_low),
+                              _evaluate(table.coeffs[1][:, 2:], T_high)], axis=1)
+
+    # design matrix: samples below T_mid use the low coefficients (0..6),
+    # samples above use the high coefficients (7..13)
+    T_all = np.concatenate([T_low, T_high], axis=1)
+    rows = _rows(T_all / _T_scale)  # (n, m, 3, 7)
+    above = (T_all >= T_mid[:, np.newaxis])[..., np.newaxis, np.newaxis]
+    A = np.concatenate([np.where(above, 0.0, rows), np.where(above, rows, 0.0)],
+                       axis=-1).reshape(n, -1, 14)
+    b = samples.reshape(n, -1)
+
+    # continuity of cp, h, s and two derivatives of cp at T_mid
+    tau_mid = T_mid / _T_scale
+    C_mid = np.concatenate([_rows(tau_mid), _derivatives(tau_mid)], axis=1)
+    C = np.concatenate([C_mid, -C_mid], axis=-1)  # (n, 5, 14)
+
+    # KKT system of the equality-constrained least squares problems
+    K = np.zeros((n, 19, 19))
+    K[:, :14, :14] = 2 * np.einsum('kmi,kmj->kij', A, A)
+    K[:, :14, 14:] = C.transpose(0, 2, 1)
+    K[:, 14:, :14] = C
+    rhs = np.zeros((n, 19))
+    rhs[:, :14] = 2 * np.einsum('kmi,km->ki', A, b)
+    solution = np.linalg.solve(K, rhs[..., np.newaxis])[..., 0]
+    alpha = solution[:, :14]
+    residual = np.einsum('kmi,ki->km', A, alpha) - b
+    rms = np.sqrt((residual**2).mean(axis=1))
+
+    low = _unscale(alpha[:, :7])
+    high = _unscale(alpha[:, 7:])
+    return [NasaFit(species[k], T_min[k], T_mid[k], T_max[k], low[k], high[k],
+                    T_split[k], rms[k]) for k in range(n)]
+
+
+def patched_species(fits):
+    """Copies of the fitted species, with the new thermo data."""
+    result = []
+    for fit in fits:
+        data = dict(fit.species.input_data)
+        data['thermo'] = {'model': 'NASA7',
+                          'temperature-ranges': [fit.T_min, fit.T_mid, fit.T_max],
+                          'data': [fit.low.tolist(), fit.high.tolist()]}
+        result.append(ct.Species.from_dict(data))
+    return result
+
+
+def patched_solution(gas, fits):
+    """New `Solution` where the fitted species replace those of ``gas``."""
+    fixed = {sp.name: sp for sp in patched_species(fits)}
+    species = [fixed.get(sp.name, sp) for sp in gas.species()]
+    kwargs = {}
+    if gas.transport_model != 'none':
+        kwargs['transport_model'] = gas.transport_model
+    return ct.Solution(thermo=gas.thermo_model, kinetics=gas.kinetics_model,
+                       species=species, reactions=gas.reactions(), **kwargs)
+
+
+def thermo_block(fits):
+    """CHEMKIN-format THERMO entries of the fitted species, for ``ck2yaml``."""
+    lines = []
+    for fit in fits:
+        composition = list(fit.species.composition.items())
+        if len(composition) > 4:
+            raise ValueError(f"Species '{fit.species.name}' has more than four "
+                             "elements, which the fixed format cannot hold")
+        elements = "".join(f"{m.upper():<2s}{int(round(n)):>3d}"
+                           for m, n in composition).ljust(20)
+        lines.append(f"{fit.species.name:<18s}REFIT {elements}G"
+                     f"{fit.T_min:10.3f}{fit.T_max:10.3f}{fit.T_mid:8.2f}"
+                     .ljust(79) + "1")
+        coeffs = np.hstack([fit.high, fit.low])
+        for i, chunk in enumerate((coeffs[0:5], coeffs[5:10], coeffs[10:14]), 2):
+            lines.append("".join(f"{a:15.8E}" for a in chunk).ljust(79) + str(i))
+    return "\n".join(lines) + "\n"
+
+
+def _plain(data):
+    """Convert nested `AnyMap` objects to plain dictionaries."""
+    if isinstance(data, dict):
+        return {key: _plain(value) for key, value in data.items()}
+    if isinstance(data, list):
+        return [_plain(value) for value in data]
+    return data
+
+
+def write_yaml_patch(fits, filename):
+    """Write the fitted species to a YAML file with a ``species`` list.
+
+    The entries can be used in place of the originals, for example through
+    ``species: [{patch.yaml/species: [H2CNO]}, ...]`` in a phase definition.
+    """
+    from ruamel.yaml import YAML
+    yaml = YAML()
+    yaml.default_flow_style = None
+    entries = []
+    for sp in patched_species(fits):
+        data = _plain(sp.input_data)
+        data['note'] = (data.get('note', '') + ' refit').strip()
+        entries.append(data)
+    with open(filename, 'w') as stream:
+        yaml.dump({'species': entries}, stream)
+
+
+if __name__ == '__main__':
+    from thermo_scan import scan_thermo, rank_species
+
+    ct.suppress_thermo_warnings()
+    gas = ct.Solution('../inputs/mech_debug/mech.yaml')
+    flagged = [name for name, _, checks in rank_species(scan_thermo(gas))
+               if any(check.endswith('jump') for check in checks)]
+    species = [gas.species(name) for name in flagged]
+
+    t0 = default_timer()
+    fits = refit_nasa7(species)
+    t_fit = default_timer() - t0
+    print(f"Refitted {len(fits)} species in {1e3 * t_fit:.1f} ms")
+    for fit in fits[:5]:
+        print(f"  {fit.species.name:>10s}: T_mid {fit.T_mid:6.0f} K, polynomials "
+              f"agree at {fit.T_split:6.0f} K, rms {fit.rms:.2e}")
+
+    fixed = patched_solution(gas, fits)
+    remaining = [name for name, _, checks in rank_species(scan_thermo(fixed))
+                 if name in flagged and any(c.endswith('jump') for c in checks)]
+    print(f"Jumps remaining after refit: {len(remaining)}")
+    print(thermo_block(fits[:1]))
+
+    # replace the broken entries of the CHEMKIN input and convert it again
+    import tempfile
+    from pathlib import Path
+    from cantera import ck2yaml
+    inputs = Path('../inputs/mech_debug')
+    lines = (inputs / 'thermo_fixed.txt').read_text().splitlines()
+    refit = set(flagged)
+    kept = []
+    i = 0
+    while i < len(lines):
+        name = lines[i][:18].split()[0] if lines[i].strip() else ''
+        if name in refit and lines[i].rstrip().endswith('1'):
+            i += 4
+        else:
+            kept.append(lines[i])
+            i += 1
+    end = next(j for j in range(len(kept) - 1, -1, -1) if kept[j].strip() == 'END')
+    kept[end:end] = thermo_block(fits).splitlines()
+    with tempfile.TemporaryDirectory() as tmp:
+        thermo_file = Path(tmp) / 'thermo_refit.txt'
+        thermo_file.write_text("\n".join(kept) + "\n")
+        out = Path(tmp) / 'mech_refit.yaml'
+        ck2yaml.convert(str(inputs / 'mech_fixed.txt'), thermo_file=str(thermo_file),
+                        transport_file=str(inputs / 'tran.txt'),
+                        out_name=str(out), quiet=True, permissive=True)
+        converted = ct.Solution(str(out))
+        write_yaml_patch(fits, Path(tmp) / 'thermo_refit.yaml')
+        patched = ct.Species.list_from_file(str(Path(tmp) / 'thermo_refit.yaml'))
+    remaining = [name for name, _, checks in rank_species(scan_thermo(converted))
+                 if name in refit and any(c.endswith('jump') for c in checks)]
+    print(f"ck2yaml with refitted entries: {converted.n_species} species, "
+          f"jumps remaining: {len(remaining)}; YAML patch: {len(patched)} species")
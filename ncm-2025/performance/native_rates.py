@@ -0,0 +1,226 @@
+"""
+Replacing Python rate functions with fitted native rates.
+
+In `extensible_reaction_rates`, reactions such as
+
+    ct.Reaction(equation='H2 + O <=> H + OH',
+                rate=lambda T: 38.7 * T**2.7 * exp(-3150.1542797022735/T))
+
+call the Python function whenever the temperature changes. `native_rate`
+samples such a function once over a temperature range, and fits a rate that
+Cantera evaluates without calling Python: first a modified Arrhenius
+expression, and if that is not accurate enough, Chebyshev polynomials in the
+reduced inverse temperature of increasing order. The accuracy of the fit is
+checked against the function on a finer grid, using the fitted rate object
+itself:
+
+    fit = native_rate(lambda T: 38.7 * T**2.7 * exp(-3150.15/T), rtol=1e-6)
+    fit.rate, fit.kind, fit.max_error
+
+`native_solution` replaces all temperature-dependent custom rates of a
+`Solution` this way. Cantera has no native rate for tabulated data in
+temperature, so Chebyshev polynomials take the role of an interpolation table
+in log space. Their `Chebyshev` rate depends on pressure as well; the fits use
+a single pressure coefficient, so the rate does not depend on pressure.
+
+Outside of the temperature range, Arrhenius fits extrapolate with the physical
+form of the rate, while Cantera evaluates the Chebyshev polynomials outside of
+their domain, where they quickly diverge from the function: a fit over
+300-3000 K can be off by an order of magnitude at 250 K. `native_solution`
+therefore keeps the custom rate where only a Chebyshev fit converges, unless
+it is told that the temperature stays within the range of the fit.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python native_rates.py
+"""
+from math import exp
+from typing import NamedTuple
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+
+class NativeRate(NamedTuple):
+    """Fitted native rate, from `native_rate`."""
+    rate: ct.ReactionRate
+    kind: str  #: ``'Arrhenius'`` or ``'Chebyshev'``
+    T_range: tuple  #: temperature range of the fit [K]
+    n_coeffs: int
+    max_error: float  #: largest relative error on the validation grid
+    rms_error: float  #: root-mean-square relative error on the validation grid
+    converged: bool  #: whether ``max_error`` is within the tolerance
+
+
+#: Pressure range of Chebyshev fits [Pa]; the rates do not depend on pressure
+_P_range = (1.0, 1e10)
+
+
+def _grid(T_range, n_points):
+    """Temperatures equally spaced in ``1/T``."""
+    return 1 / np.linspace(1 / T_range[0], 1 / T_range[1], n_points)
+
+
+def _sample(func, T):
+    k = np.array([func(t) for t in T], dtype=float)
+    if not (k > 0).all():
+        raise ValueError("Rate function is not positive over the temperature range")
+    return k
+
+
+def _errors(rate, T, k):
+    fitted = np.array([rate(t) for t in T]) if not isinstance(rate, ct.ChebyshevRate) \
+        else np.array([rate(t, ct.one_atm) for t in T])
+    error = np.abs(fitted / k - 1)
+    return error.max(), np.sqrt(np.mean(error**2))
+
+
+def fit_arrhenius(T, k):
+    """Least-squares fit of ``ln k = ln A + b ln T - Ea_R / T``.
+
+    :return:
+        `ArrheniusRate` in SI units.
+    """
+    M = np.column_stack([np.ones_like(T), np.log(T), -1 / T])
+    (log_A, b, Ea_R), *_ = np.linalg.lstsq(M, np.log(k), rcond=None)
+    return ct.ArrheniusRate(exp(log_A), b, Ea_R * ct.gas_constant)
+
+
+def fit_chebyshev(T, k, T_range, n_T):
+    """Least-squares fit of ``log10 k`` with ``n_T`` Chebyshev polynomials.
+
+    :return:
+        `ChebyshevRate` in SI units, independent of pressure.
+    """
+    T_min, T_max = T_range
+    T_reduced = (2 / T - 1 / T_min - 1 / T_max) / (1 / T_max - 1 / T_min)
+    coeffs = np.polynomial.chebyshev.chebfit(T_reduced, np.log10(k), n_T - 1)
+    return ct.ChebyshevRate(temperature_range=T_range, pressure_range=_P_range,
+                            data=coeffs[:, np.newaxis])
+
+
+def native_rate(func, T_range=(300., 3000.), rtol=1e-4, n_points=100, max_order=16):
+    """Fit a native rate to a function of temperature.
+
+    :param func:
+        Rate constant [kmol, m, s] as a function of temperature [K], for
+        example the function of a `CustomRate`, or the rate object itself.
+    :param T_range:
+        Temperature range of the fit [K]. Chebyshev fits are only valid within
+        this range.
+    :param rtol:
+        Tolerated relative error of the rate constant.
+    :param n_points:
+        Number of samples, equally spaced in ``1/T``. The fit is checked on
+        a grid with ``4 * n_points`` points.
+    :param max_order:
+        Largest number of Chebyshev coefficients.
+    :return:
+        `NativeRate`; if no fit meets the tolerance, the Chebyshev fit with
+        ``max_order`` coefficients, with ``converged`` set to `False`.
+    """
+    T = _grid(T_range, n_points)
+    k = _sample(func, T)
+    T_check = _grid(T_range, 4 * n_points)
+    k_check = _sample(func, T_check)
+
+    rate = fit_arrhenius(T, k)
+    max_error, rms_error = _errors(rate, T_check, k_check)
+    if max_error <= rtol:
+        return NativeRate(rate, 'Arrhenius', T_range, 3, max_error, rms_error, True)
+    for n_T in range(2, max_order + 1):
+        rate = fit_chebyshev(T, k, T_range, n_T)
+        max_error, rms_error = _errors(rate, T_check, k_check)
+        if max_error <= rtol:
+            break
+    return NativeRate(rate, 'Chebyshev', T_range, n_T, max_error, rms_error,
+                      max_error <= rtol)
+
+
+def native_solution(gas, chebyshev=False, **kwargs):
+    """Copy of ``gas`` with custom rate functions replaced by native rates.
+
+    :param gas:
+        `Solution` with an ideal gas phase.
+    :param chebyshev:
+        Whether to replace rates with Chebyshev fits as well. Only use this if
+        the temperature stays within the ``T_range`` of the fits; otherwise,
+        custom rates without a converged Arrhenius fit are kept.
+    :param kwargs:
+        Options of `native_rate`.
+    :return:
+        New `Solution`, and a dictionary of `NativeRate` by reaction index,
+        for the rates that were replaced.
+    """
+    reactions = gas.reactions()
+    fits = {}
+    for i, R in enumerate(reactions):
+        if R.rate.type != 'custom-rate-function':
+            continue
+        fit = native_rate(R.rate, **kwargs)
+        if fit.kind == 'Chebyshev' and not (chebyshev and fit.converged):
+            continue
+        fits[i] = fit
+        native = ct.Reaction(equation=R.equation, rate=fit.rate)
+        native.duplicate = R.duplicate
+        reactions[i] = native
+    new = ct.Solution(thermo='ideal-gas', kinetics='gas', species=gas.species(),
+                      reactions=reactions)
+    new.TPY = gas.TPY
+    return new, fits
+
+
+def report(gas, fits, n=None):
+    """Accuracy of the native rates of ``fits``, worst first."""
+    order = sorted(fits, key=lambda i: -fits[i].max_error)[:n]
+    lines = [f"{'reaction':42s} {'kind':10s} {'T range [K]':>11s} {'coeffs':>6s} "
+             f"{'max err':>9s} {'rms err':>9s}"]
+    for i in order:
+        fit = fits[i]
+        T_range = f"{fit.T_range[0]:.0f}-{fit.T_range[1]:.0f}"
+        lines.append(f"{gas.reaction(i).equation[:42]:42s} {fit.kind:10s} "
+                     f"{T_range:>11s} {fit.n_coeffs:6d} {fit.max_error:9.2e} "
+                     f"{fit.rms_error:9.2e}"
+                     + ("" if fit.converged else "  not converged"))
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    from batched_rates import time_per_step
+    from rate_benchmark import lambda_solution
+
+    ct.suppress_thermo_warnings()
+
+    # an expression that is not of Arrhenius form: two channels
+    fit = native_rate(lambda T: 1.2e9 * exp(-2000 / T) + 3.5e5 * T**1.5 * exp(500 / T),
+                      rtol=1e-4)
+    print(f"Two-channel rate: {fit.kind} with {fit.n_coeffs} coefficients, "
+          f"max error {fit.max_error:.1e} at {fit.T_range[0]:.0f}-"
+          f"{fit.T_range[1]:.0f} K\n")
+
+    # the two lambda rates of the notebook, and all elementary reactions of GRI 3.0
+    for mech, replace in (('h2o2.yaml', [2, 4]), ('gri30.yaml', None)):
+        gas0 = ct.Solution(mech)
+        gas1, n_lambda = lambda_solution(gas0)
+        if replace is not None:
+            reactions = gas0.reactions()
+            for i in replace:
+                reactions[i] = gas1.reaction(i)
+            gas1 = ct.Solution(thermo='ideal-gas', kinetics='gas',
+                               species=gas0.species(), reactions=reactions)
+            n_lambda = len(replace)
+        t0 = default_timer()
+        gas2, fits = native_solution(gas1)
+        t_fit = default_timer() - t0
+        print(f"{mech}: {n_lambda} lambda rates fitted in {1e3 * t_fit:.0f} ms")
+        print(report(gas2, fits, 3))
+
+        base = time_per_step(gas0)
+        print(f"- Built-in rate parameterizations: {base:7.2f} μs/step "
+              f"(T_final={gas0.T:.2f})")
+        for label, gas in (('Lambda rates', gas1), ('Fitted native rates', gas2)):
+            t = time_per_step(gas)
+            print(f"- {label + ':':33s} {t:7.2f} μs/step (T_final={gas.T:.2f}) ... "
+                  f"{100 * t / base - 100:+.1f}%")
+        print()
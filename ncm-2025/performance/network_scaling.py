@@ -0,0 +1,250 @@
+"""
+Scaling of reactor network integration with the number of reactors.
+
+The reactor examples, including `preconditioned_integration`, integrate one
+reactor or a few. `build_network` creates networks of N
+`IdealGasConstPressureMoleReactor` objects connected by mass flow controllers,
+in one of three layouts:
+
+* ``chain``: inlet -> 1 -> 2 -> ... -> N -> outlet,
+* ``tree``: a binary tree, where each reactor feeds two others, and the
+  leaves feed the outlet,
+* ``recycle``: a chain, where part of the flow leaving the last reactor is fed
+  back to the first.
+
+`scaling` integrates the networks for increasing N, with the default direct
+linear solver and with the `AdaptivePreconditioner`, and reports the wall time
+per step and the number of linear iterations and preconditioner or Jacobian
+evaluations. It also reports the exponents ``p`` of ``cost ~ N**p`` between
+successive network sizes, and flags super-linear growth of the time per step
+and growth of the linear iterations or Jacobian evaluations per step:
+
+    results = scaling('../inputs/n-hexane-NUIG-2015.yaml', [1, 2, 4, 8])
+    print(report(results))
+
+All reactors start with the inlet mixture, which ignites as it flows through
+the network. Integrations stop
+when they exceed ``time_limit``; the time per step is then measured on the
+part that was integrated, and larger networks are skipped for that solver.
+The dense Jacobian of the direct solver grows with N**2 and its factorization
+with N**3, so only small networks are feasible without preconditioning.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python network_scaling.py
+"""
+from typing import NamedTuple
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+#: Network layouts
+layouts = ('chain', 'tree', 'recycle')
+
+
+class ScalingResult(NamedTuple):
+    """Integration statistics of one network, from `integrate`."""
+    layout: str
+    n_reactors: int
+    preconditioned: bool
+    time: float  #: wall time [s]
+    simulated: float  #: simulated time that was reached [s]
+    steps: int
+    nonlinear_iters: int
+    lin_iters: int
+    jac_evals: int  #: preconditioner or Jacobian evaluations
+    aborted: bool
+
+    @property
+    def time_per_step(self):
+        return self.time / max(self.steps, 1)
+
+
+def build_network(gas, n_reactors, layout='chain', residence_time=1e-3,
+                  recycle_fraction=0.5):
+    """Reactors that are filled with and fed by the mixture of ``gas``.
+
+    :param gas:
+        `Solution` in the state of the inlet mixture; it is shared by all
+        reactors and reservoirs.
+    :param residence_time:
+        Residence time of each reactor in a chain [s].
+    :param recycle_fraction:
+        Recycled mass flow relative to the inlet flow, for the ``recycle``
+        layout.
+    :return:
+        List of reactors, and the `ReactorNet`.
+    """
+    inlet = ct.Reservoir(gas)
+    outlet = ct.Reservoir(gas)
+    reactors = [ct.IdealGasConstPressureMoleReactor(gas, volume=1e-3)
+                for _ in range(n_reactors)]
+    mdot = reactors[0].mass / residence_time
+
+    if layout == 'chain':
+        for upstream, downstream in zip([inlet] + reactors, reactors + [outlet]):
+            ct.MassFlowController(upstream, downstream, mdot=mdot)
+    elif layout == 'recycle':
+        ct.MassFlowController(inlet, reactors[0], mdot=mdot)
+        for upstream, downstream in zip(reactors[:-1], reactors[1:]):
+            ct.MassFlowController(upstream, downstream, mdot=(1 + recycle_fraction) * mdot)
+        ct.MassFlowController(reactors[-1], reactors[0], mdot=recycle_fraction * mdot)
+        ct.MassFlowController(reactors[-1], outlet, mdot=mdot)
+    elif layout == 'tree':
+        # reactor i feeds reactors 2i+1 and 2i+2
+        flows = np.zeros(n_reactors)
+        flows[0] = mdot
+        ct.MassFlowController(inlet, reactors[0], mdot=mdot)
+        for i, reactor in enumerate(reactors):
+            children = [j for j in (2 * i + 1, 2 * i + 2) if j < n_reactors]
+            for j in children:
+                flows[j] = flows[i] / len(children)
+                ct.MassFlowController(reactor, reactors[j], mdot=flows[j])
+            if not children:
+                ct.MassFlowController(reactor, outlet, mdot=flows[i])
+    else:
+        raise ValueError(f"Unknown layout '{layout}'")
+    return reactors, ct.ReactorNet(reactors)
+
+
+def integrate(gas, n_reactors, layout, preconditioned, end_time=2e-3, time_limit=None):
+    """Integrate a network from `build_network` step by step.
+
+    The integration stops after the first step that exceeds ``time_limit`` [s]
+    of wall time, or when the solver fails.
+    """
+    state = gas.state
+    reactors, net = build_network(gas, n_reactors, layout)
+    if preconditioned:
+        net.derivative_settings = {'skip-third-bodies': True, 'skip-falloff': True}
+        net.preconditioner = ct.AdaptivePreconditioner()
+    aborted = False
+    t0 = default_timer()
+    try:
+        net.initialize()
+        while net.time < end_time:
+            net.step()
+            if time_limit is not None and default_timer() - t0 > time_limit:
+                aborted = net.time < end_time
+                break
+    except ct.CanteraError:
+        aborted = True
+    finally:
+        # reactors leave the shared phase in their last state
+        gas.state = state
+    elapsed = default_timer() - t0
+    stats = net.solver_stats
+    jac_evals = stats['prec_evals'] if preconditioned else stats['jac_evals']
+    return ScalingResult(layout, n_reactors, preconditioned, elapsed, net.time,
+                         stats['steps'], stats['nonlinear_iters'],
+                         stats.get('lin_iters', 0), jac_evals, aborted)
+
+
+def scaling(mechanism, sizes, X='NC6H14:1, O2:9.5, N2:35.72', T=1200, P=ct.one_atm,
+            layouts=layouts, end_time=2e-3, time_limit=30.0):
+    """Integrate networks of increasing size with and without preconditioning.
+
+    :param mechanism:
+        Input file.
+    :param sizes:
+        Increasing numbers of reactors.
+    :param X, T, P:
+        Inlet mixture.
+    :param time_limit:
+        Wall time [s] per integration; once a network exceeds it, larger
+        networks are skipped for that layout and solver.
+    :return:
+        List of `ScalingResult`.
+    """
+    gas = ct.Solution(mechanism, transport_model=None)
+    gas.TPX = T, P, X
+    results = []
+    for layout in layouts:
+        for preconditioned in (False, True):
+            for n in sizes:
+                result = integrate(gas, n, layout, preconditioned, end_time, time_limit)
+                results.append(result)
+                if result.aborted:
+                    break
+    return results
+
+
+def exponents(results):
+    """Scaling exponents ``p`` of ``cost ~ N**p`` between successive sizes.
+
+    :return:
+        Dictionary by (layout, preconditioned) of lists of tuples ``(N1, N2,
+        p_time, p_linear, p_jac)``, where ``p_time`` refers to the wall time per
+        step, ``p_linear`` to the linear iterations per Newton iteration plus
+        one, and ``p_jac`` to the Jacobian or preconditioner evaluations per
+        step.
+    """
+    groups = {}
+    for r in results:
+        groups.setdefault((r.layout, r.preconditioned), []).append(r)
+    slopes = {}
+    for key, group in groups.items():
+        slopes[key] = []
+        for a, b in zip(group[:-1], group[1:]):
+            ratio = np.log(b.n_reactors / a.n_reactors)
+            linear_a = 1 + a.lin_iters / max(a.nonlinear_iters, 1)
+            linear_b = 1 + b.lin_iters / max(b.nonlinear_iters, 1)
+            jac_a = a.jac_evals / max(a.steps, 1)
+            jac_b = b.jac_evals / max(b.steps, 1)
+            slopes[key].append((a.n_reactors, b.n_reactors,
+                                np.log(b.time_per_step / a.time_per_step) / ratio,
+                                np.log(linear_b / linear_a) / ratio,
+                                np.log(jac_b / jac_a) / ratio))
+    return slopes
+
+
+def report(results, tolerance=0.25):
+    """Table of results, with flags for super-linear scaling.
+
+    :param tolerance:
+        Exponents of the time per step above ``1 + tolerance``, and of the
+        linear iterations per Newton iteration and the Jacobian evaluations per
+        step above ``tolerance``, are flagged.
+    """
+    lines = [f"{'layout':8s} {'solver':15s} {'N':>4s} {'time':>8s} {'ms/step':>8s} "
+             f"{'steps':>6s} {'lin/Newton':>10s} {'jac/prec':>8s}"]
+    for r in results:
+        solver = 'preconditioned' if r.preconditioned else 'direct'
+        lines.append(f"{r.layout:8s} {solver:15s} {r.n_reactors:4d} {r.time:6.2f} s "
+                     f"{1e3 * r.time_per_step:8.2f} {r.steps:6d} "
+                     f"{r.lin_iters / max(r.nonlinear_iters, 1):10.2f} {r.jac_evals:8d}"
+                     + (f"  stopped at t = {r.simulated:.2e} s" if r.aborted else ""))
+    lines.append("\nscaling exponents p (cost ~ N**p) of time per step; linear "
+                 "iterations per Newton iteration; Jacobian evaluations per step")
+    for (layout, preconditioned), slopes in exponents(results).items():
+        solver = 'preconditioned' if preconditioned else 'direct'
+        for n1, n2, p_time, p_linear, p_jac in slopes:
+            flags = []
+            if p_time > 1 + tolerance:
+                flags.append("super-linear cost per step")
+            if p_linear > tolerance:
+                flags.append("linear solver iterations grow")
+            if p_jac > tolerance:
+                flags.append("Jacobian evaluations grow")
+            lines.append(f"{layout:8s} {solver:15s} N {n1:3d} -> {n2:3d}: "
+                         f"{p_time:5.2f}; {p_linear:5.2f}; {p_jac:5.2f}"
+                         + (f"  ** {', '.join(flags)}" if flags else ""))
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    ct.suppress_thermo_warnings()
+    mechanism = '../inputs/n-hexane-NUIG-2015.yaml'
+
+    # before ignition: cost of the linear algebra as the network grows
+    t0 = default_timer()
+    results = scaling(mechanism, [1, 2, 4, 8, 16], end_time=2e-3)
+    print("Integration to 2 ms, before ignition:")
+    print(report(results))
+    print(f"total: {default_timer() - t0:.0f} s\n")
+
+    # through ignition of the downstream reactors of a chain
+    results = scaling(mechanism, [1, 2, 4], layouts=['chain'], end_time=5e-3)
+    print("Chain, integration to 5 ms, through ignition:")
+    print(report(results))
@@ -0,0 +1,279 @@
+"""
+Parameter sweep of the `AdaptivePreconditioner` with a speed/accuracy report.
+
+`preconditioned_integration` uses the `AdaptivePreconditioner` with its default
+settings. `sweep` integrates a reactor problem for every combination of
+preconditioner threshold, ILUT fill factor and drop tolerance, and derivative
+settings, distributed over a pool of worker processes. For each combination,
+it measures the wall time and solver statistics, and the deviation of the
+temperature and selected mass fractions from those of an integration without
+preconditioner:
+
+    problem = ReactorProblem('../inputs/n-hexane-NUIG-2015.yaml',
+                             'NC6H14:1, O2:9.5, N2:35.7', 1200, ct.one_atm, 5e-3)
+    reference, points = sweep(problem, thresholds=[0, 1e-8],
+                              drop_tols=[1e-10, 1e-6])
+    print(report(points, pareto_front(points)))
+
+`pareto_front` selects the combinations that are not both slower and less
+accurate than another combination, and `write_front` writes them to a CSV file.
+
+Settings given as `None` keep the defaults of Cantera: no threshold, a fill
+factor of a quarter of the number of state variables, a drop tolerance of
+1e-10, and right preconditioning. In Cantera 3.2, setting the threshold, fill
+factor or drop tolerance of an `AdaptivePreconditioner` from Python crashes
+the interpreter. `options_supported` checks this in a separate process, and
+`sweep` skips these values with a warning where they cannot be set, so that
+only the derivative settings and the preconditioning side are swept.
+
+Like `reactor_map.py`, the sweep starts the worker processes with
+`multiprocessing`, so scripts calling it need an ``if __name__ == '__main__':``
+guard.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python preconditioner_sweep.py
+"""
+from functools import lru_cache
+from itertools import product
+import multiprocessing
+import subprocess
+import sys
+from typing import NamedTuple
+from timeit import default_timer
+import warnings
+
+import cantera as ct
+import numpy as np
+
+
+class ReactorProblem(NamedTuple):
+    """Initial state and integration time of a reactor problem."""
+    mechanism: str
+    X: str
+    T: float  #: initial temperature [K]
+    P: float  #: pressure [Pa]
+    end_time: float  #: [s]
+    reactor: str = 'IdealGasConstPressureMoleReactor'
+    species: tuple = ('CO2', 'NC6H14')  #: species whose mass fractions are compared
+    n_samples: int = 50  #: number of sample times
+
+
+class PreconditionerSettings(NamedTuple):
+    """Preconditioner parameters; `None` keeps the default of Cantera."""
+    threshold: float = None
+    fill_factor: int = None
+    drop_tol: float = None
+    skip: tuple = ()  #: enabled derivative settings, such as ``'skip-falloff'``
+    side: str = None  #: ``'left'``, ``'right'`` or ``'both'``
+
+    @property
+    def label(self):
+        values = [f"threshold={self.threshold:g}" if self.threshold is not None else "",
+                  f"fill={self.fill_factor}" if self.fill_factor is not None else "",
+                  f"drop={self.drop_tol:g}" if self.drop_tol is not None else "",
+                  f"side={self.side}" if self.side is not None else ""]
+        values += self.skip
+        return ", ".join(v for v in values if v) or "defaults"
+
+
+class SweepPoint(NamedTuple):
+    """Result of one integration, from `sweep`."""
+    settings: PreconditionerSettings  #: `None` for the unpreconditioned reference
+    time: float  #: wall time [s]
+    steps: int
+    nonlinear_iters: int
+    lin_iters: int
+    errors: dict  #: deviation of T and of each species from the reference
+    error: float  #: largest of ``errors``
+    failure: str  #: error message if the integration failed
+
+
+#: Derivative settings that are combined in sweeps
+derivative_options = ('skip-third-bodies', 'skip-falloff')
+
+#: Solutions of a worker process, by mechanism
+_solutions = {}
+
+
+@lru_cache
+def options_supported():
+    """Whether the threshold and ILUT options of `AdaptivePreconditioner` can be set.
+
+    The check runs in a new process, since it crashes the interpreter where the
+    options are not supported.
+    """
+    code = ("import cantera as ct; p = ct.AdaptivePreconditioner(); "
+            "p.threshold = 1e-8; p.ilut_fill_factor = 10; p.ilut_drop_tol = 1e-8")
+    return subprocess.run([sys.executable, '-c', code], capture_output=True).returncode == 0
+
+
+def _integrate(problem, settings):
+    """Integrate ``problem``; return timing, statistics and sampled trajectories."""
+    if problem.mechanism not in _solutions:
+        _solutions[problem.mechanism] = ct.Solution(problem.mechanism,
+                                                    transport_model=None)
+    gas = _solutions[problem.mechanism]
+    gas.TPX = problem.T, problem.P, problem.X
+    reactor = getattr(ct, problem.reactor)(gas)
+    net = ct.ReactorNet([reactor])
+    if settings is not None:
+        net.derivative_settings = {option: option in settings.skip
+                                   for option in derivative_options}
+        precon = ct.AdaptivePreconditioner()
+        if settings.threshold is not None:
+            precon.threshold = settings.threshold
+        if settings.fill_factor is not None:
+            precon.ilut_fill_factor = settings.fill_factor
+        if settings.drop_tol is not None:
+            precon.ilut_drop_tol = settings.drop_tol
+        if settings.side is not None:
+            precon.side = settings.side
+        net.preconditioner = precon
+
+    times = np.linspace(0, problem.end_time, problem.n_samples + 1)[1:]
+    indices = [gas.species_index(name) for name in problem.species]
+    values = np.full((len(times), 1 + len(indices)), np.nan)
+    t0 = default_timer()
+    try:
+        net.initialize()
+        for i, t in enumerate(times):
+            net.advance(t)
+            values[i, 0] = reactor.T
+            values[i, 1:] = reactor.thermo.Y[indices]
+        failure = ""
+    except ct.CanteraError as err:
+        failure = str(err).strip().splitlines()[-1]
+    elapsed = default_timer() - t0
+    stats = net.solver_stats
+    return (elapsed, stats['steps'], stats['nonlinear_iters'], stats.get('lin_iters', 0),
+            values, failure)
+
+
+def _errors(problem, values, reference):
+    """Deviations from the reference: relative for T, relative to the peak for Y."""
+    scale = np.abs(reference).max(axis=0)
+    scale[0] = 1.0
+    deviation = np.abs(values - reference)
+    deviation[:, 0] /= reference[:, 0]
+    deviation /= np.maximum(scale, 1e-300)
+    return dict(zip(('T',) + tuple(problem.species), deviation.max(axis=0)))
+
+
+def sweep(problem, thresholds=(None,), fill_factors=(None,), drop_tols=(None,),
+          skips=None, sides=(None,), processes=None):
+    """Integrate ``problem`` for all combinations of preconditioner settings.
+
+    :param problem:
+        `ReactorProblem`.
+    :param thresholds:
+        Values of `AdaptivePreconditioner.threshold`.
+    :param fill_factors:
+        Values of `AdaptivePreconditioner.ilut_fill_factor`.
+    :param drop_tols:
+        Values of `AdaptivePreconditioner.ilut_drop_tol`.
+    :param skips:
+        Tuples of enabled derivative settings; by default, all combinations of
+        `derivative_options`.
+    :param sides:
+        Values of `AdaptivePreconditioner.side`.
+    :param processes:
+        Number of worker processes; by default, the number of CPUs.
+    :return:
+        `SweepPoint` of the reference, and list of `SweepPoint`.
+    """
+    if skips is None:
+        skips = [tuple(o for o, on in zip(derivative_options, flags) if on)
+                 for flags in product((False, True), repeat=len(derivative_options))]
+    if not options_supported():
+        options = (thresholds, fill_factors, drop_tols)
+        if any(value is not None for values in options for value in values):
+            warnings.warn("Preconditioner threshold and ILUT options cannot be set "
+                          f"with Cantera {ct.__version__}; using the defaults")
+        thresholds = fill_factors = drop_tols = (None,)
+    settings = [None] + [PreconditionerSettings(*values) for values in
+                         product(thresholds, fill_factors, drop_tols, skips, sides)]
+    with multiprocessing.Pool(processes) as pool:
+        runs = pool.starmap(_integrate, [(problem, s) for s in settings])
+
+    reference_values = runs[0][4]
+    if runs[0][5]:
+        raise ct.CanteraError(f"Reference integration failed: {runs[0][5]}")
+    points = []
+    for s, (elapsed, steps, nonlinear, linear, values, failure) in zip(settings, runs):
+        errors = _errors(problem, values, reference_values) if not failure else {}
+        error = max(errors.values()) if errors else np.inf
+        points.append(SweepPoint(s, elapsed, steps, nonlinear, linear, errors, error,
+                                 failure))
+    return points[0], points[1:]
+
+
+def pareto_front(points):
+    """Points that no other point beats in both wall time and error."""
+    front = []
+    for point in sorted(points, key=lambda p: (p.time, p.error)):
+        if point.failure:
+            continue
+        if not front or point.error < front[-1].error:
+            front.append(point)
+    return front
+
+
+def write_front(front, filename):
+    """Write the points of a Pareto front to a CSV file."""
+    species = list(front[0].errors) if front else []
+    with open(filename, 'w') as stream:
+        stream.write(",".join(["threshold", "fill_factor", "drop_tol", "skip", "side",
+                               "time", "steps", "nonlinear_iters", "lin_iters"]
+                              + [f"error_{name}" for name in species]) + "\n")
+        for p in front:
+            s = p.settings
+            fields = [s.threshold, s.fill_factor, s.drop_tol, "+".join(s.skip), s.side,
+                      p.time, p.steps, p.nonlinear_iters, p.lin_iters]
+            fields += [p.errors[name] for name in species]
+            stream.write(",".join("" if f is None else str(f) for f in fields) + "\n")
+
+
+def report(points, front=(), reference=None):
+    """Table of sweep results, sorted by wall time; ``*`` marks the Pareto front."""
+    lines = [f"  {'settings':58s} {'time':>8s} {'steps':>6s} {'Newton':>6s} "
+             f"{'linear':>7s} {'error':>8s}"]
+    if reference is not None:
+        lines.append(f"  {'no preconditioner (reference)':58s} {reference.time:6.2f} s "
+                     f"{reference.steps:6d} {reference.nonlinear_iters:6d} "
+                     f"{reference.lin_iters:7d}")
+    for p in sorted(points, key=lambda p: p.time):
+        mark = "*" if p in front else " "
+        if p.failure:
+            lines.append(f"{mark} {p.settings.label:58s} failed: {p.failure}")
+            continue
+        lines.append(f"{mark} {p.settings.label:58s} {p.time:6.2f} s {p.steps:6d} "
+                     f"{p.nonlinear_iters:6d} {p.lin_iters:7d} {p.error:8.1e}")
+    return "\n".join(lines)
+
+
+if __name__ == '__main__':
+    from pathlib import Path
+    import tempfile
+
+    ct.suppress_thermo_warnings()
+
+    # NUIG n-hexane ignition from `preconditioned_integration`, started at
+    # 1200 K so that ignition happens within a few milliseconds
+    problem = ReactorProblem('../inputs/n-hexane-NUIG-2015.yaml',
+                             'NC6H14:1, O2:9.5, N2:35.72', 1200, ct.one_atm, 5e-3)
+    n_states = ct.Solution(problem.mechanism, transport_model=None).n_species + 2
+    print(f"threshold and ILUT options supported: {options_supported()}")
+    t0 = default_timer()
+    reference, points = sweep(problem, thresholds=(None, 1e-8),
+                              fill_factors=(None, n_states // 2),
+                              drop_tols=(None, 1e-6),
+                              sides=(None, 'left'))
+    print(f"{len(points) + 1} integrations in {default_timer() - t0:.0f} s "
+          f"({multiprocessing.cpu_count()} CPUs)")
+    front = pareto_front(points)
+    print(report(points, front, reference))
+    with tempfile.TemporaryDirectory() as tmp:
+        write_front(front, Path(tmp) / 'pareto.csv')
+        print(f"\nPareto front ({len(front)} points) as CSV:")
+        print((Path(tmp) / 'pareto.csv').read_text())
@@ -0,0 +1,263 @@
+"""
+Streaming rate-of-production and reaction path analysis for reactor networks.
+
+Finding out which reactions produce NO in `04_NOx_WSR`, or which reactions
+drive ignition in `03_ignition_delay_NTC`, usually means storing the complete
+time history and post-processing it. `RateAccumulator` instead integrates the
+forward and reverse rates of progress of every reaction while the network is
+advanced, using the trapezoidal rule between consecutive steps. Memory use is
+proportional to the number of reactions, independent of the number of steps.
+
+Since reaction path fluxes are linear in the rates of progress, time-integrated
+element fluxes between species follow from the integrated rates alone:
+
+    acc = RateAccumulator(sim)
+    acc.advance(0.1)
+    acc.contributions('OH')     # reactions ranked by integrated OH production
+    acc.path_fluxes('C')        # integrated carbon fluxes between species
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python rate_accumulator.py
+"""
+from timeit import default_timer
+import tracemalloc
+
+import cantera as ct
+import numpy as np
+import scipy.integrate
+import scipy.sparse
+
+
+class RateAccumulator:
+    """Time integrals of the rates of progress of reactors in a `ReactorNet`.
+
+    Rates of progress are multiplied by the reactor volume, so the integrals
+    are amounts in kmol. The contributions of several reactors are summed,
+    which requires all of them to use the same mechanism.
+
+    :param sim:
+        `ReactorNet` to be integrated. Advance it through `step` or `advance`
+        of this object, or call `update` after advancing it directly.
+    :param reactors:
+        Reactors to include; defaults to all reactors of the network.
+    """
+    def __init__(self, sim, reactors=None):
+        self.sim = sim
+        self.reactors = list(sim.reactors if reactors is None else reactors)
+        if not self.reactors:
+            raise ValueError("No reactors to accumulate")
+        phases = [R.phase for R in self.reactors]
+        if len({(gas.n_species, gas.n_reactions) for gas in phases}) > 1:
+            raise ValueError("All reactors need to use the same mechanism")
+        self.gas = phases[0]
+        self.n_reactions = self.gas.n_reactions
+        self._paths = {}
+        self._stoich = None
+        self.reset()
+
+    def _rates(self):
+        """Volume-integrated forward and reverse rates of progress [kmol/s]."""
+        qf = np.zeros(self.n_reactions)
+        qr = np.zeros(self.n_reactions)
+        for R in self.reactors:
+            qf += R.volume * R.phase.forward_rates_of_progress
+            qr += R.volume * R.phase.reverse_rates_of_progress
+        return qf, qr
+
+    def reset(self):
+        """Discard accumulated values and restart from the current state."""
+        self.t_start = self.time = self.sim.time
+        self.forward = np.zeros(self.n_reactions)
+        self.reverse = np.zeros(self.n_reactions)
+        self.n_updates = 0
+        self._qf, self._qr = self._rates()
+
+    def update(self):
+        """Accumulate from the previous update to the current network time."""
+        t = self.sim.time
+        qf, qr = self._rates()
+        dt = t - self.time
+        self.forward += 0.5 * dt * (self._qf + qf)
+        self.reverse += 0.5 * dt * (self._qr + qr)
+        self._qf, self._qr = qf, qr
+        self.time = t
+        self.n_updates += 1
+
+    def step(self):
+        """Take one integrator step and accumulate it.
+
+        :return:
+            The new network time.
+        """
+        t = self.sim.step()
+        self.update()
+        return t
+
+    def advance(self, t_end):
+        """Step up to ``t_end``, accumulating every internal step.
+
+        Unlike `ReactorNet.advance`, each internal step is accumulated, which
+        keeps the trapezoidal rule as accurate as the integrator's time steps.
+        """
+        while self.sim.time < t_end:
+            self.step()
+        return self.sim.time
+
+    @property
+    def net(self):
+        """Integrated net rates of progress [kmol]."""
+        return self.forward - self.reverse
+
+    @property
+    def mean_rates(self):
+        """Time-averaged net rates of progress [kmol/s].
+
+        Before any time has been accumulated, these are the current net rates.
+        """
+        if self.time == self.t_start:
+            return self._qf - self._qr
+        return self.net / (self.time - self.t_start)
+
+    def species_production(self, species):
+        """Integrated production of a species by each reaction [kmol].
+        """
+        if self._stoich is None:
+            self._stoich = scipy.sparse.csr_matrix(
+                self.gas.product_stoich_coeffs - self.gas.reactant_stoich_coeffs)
+        k = self.gas.species_index(species)
+        return self._stoich[k].toarray().ravel() * self.net
+
+    def contributions(self, species, n=10):
+        """Reactions with the largest integrated contribution to a species.
+
+        :return:
+            List of ``(index, equation, amount)`` sorted by the magnitude of
+            the amount [kmol]; positive amounts produce the species.
+        """
+        production = self.species_production(species)
+        order = np.argsort(-np.abs(production))[:n]
+        return [(i, self.gas.reaction(i).equation, production[i]) for i in order]
+
+    def _path_weights(self, element):
+        """Element transfer weights for all reactant/product pairs.
+
+        In each reaction, the atoms of the element leaving reactant A are
+        distributed over the products in proportion to their atom content, so
+        the flux from A to B is ``q * n_A * n_B / n_total``.
+        """
+        if element in self._paths:
+            return self._paths[element]
+        gas = self.gas
+        m = gas.element_index(element)
+        atoms = {k: gas.n_atoms(k, m) for k in gas.species_names}
+        index = {k: i for i, k in enumerate(gas.species_names)}
+        rows = []
+        for i, R in enumerate(gas.reactions()):
+            left = [(k, nu * atoms[k]) for k, nu in R.reactants.items() if atoms[k]]
+            right = [(k, nu * atoms[k]) for k, nu in R.products.items() if atoms[k]]
+            total = sum(n for _, n in left)
+            for a, n_a in left:
+                for b, n_b in right:
+                    if a != b:
+                        rows.append((i, index[a], index[b], n_a * n_b / total))
+        rows = np.array(rows, dtype=float).reshape(-1, 4)
+        weights = (rows[:, 0].astype(int), rows[:, 1].astype(int),
+                   rows[:, 2].astype(int), rows[:, 3])
+        self._paths[element] = weights
+        return weights
+
+    def path_fluxes(self, element, threshold=0.0):
+        """Integrated net element fluxes between species [kmol of atoms].
+
+        :param element:
+            Element to follow, for example ``'N'``.
+        :param threshold:
+            Omit fluxes smaller than this fraction of the largest flux.
+        :return:
+            Dictionary mapping ``(source, target)`` to the net amount of the
+            element transferred from ``source`` to ``target``, sorted from the
+            largest flux; every pair appears once, in its net direction.
+        """
+        i, a, b, w = self._path_weights(element)
+        K = self.gas.n_species
+        flux = np.zeros((K, K))
+        np.add.at(flux, (a, b), w * self.forward[i])
+        np.add.at(flux, (b, a), w * self.reverse[i])
+        net = flux - flux.T
+        src, dst = np.nonzero(net > threshold * net.max())
+        order = np.argsort(-net[src, dst])
+        names = self.gas.species_names
+        return {(names[src[j]], names[dst[j]]): net[src[j], dst[j]] for j in order}
+
+
+if __name__ == '__main__':
+    ct.suppress_thermo_warnings()
+
+    # NTC point from 03_ignition_delay_NTC
+    gas = ct.Solution('../inputs/seiser.yaml')
+    T0 = 700.0
+    t_end = 0.1
+
+    def ignition_reactor():
+        gas.set_equivalence_ratio(phi=1.0, fuel="nc7h16",
+                                  oxidizer={"o2": 1.0, "n2": 3.76})
+        gas.TP = T0, ct.one_atm
+        reactor = ct.IdealGasReactor(gas)
+        return reactor, ct.ReactorNet([reactor])
+
+    # reference: store the full history, then integrate
+    tracemalloc.start()
+    t0 = default_timer()
+    reactor, sim = ignition_reactor()
+    times, qf_hist, qr_hist = [0.0], [gas.forward_rates_of_progress * reactor.volume], \
+        [gas.reverse_rates_of_progress * reactor.volume]
+    while sim.time < t_end:
+        times.append(sim.step())
+        qf_hist.append(reactor.phase.forward_rates_of_progress * reactor.volume)
+        qr_hist.append(reactor.phase.reverse_rates_of_progress * reactor.volume)
+    net_ref = scipy.integrate.trapezoid(np.array(qf_hist) - np.array(qr_hist), times, axis=0)
+    t_ref = default_timer() - t0
+    mem_ref = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    tracemalloc.start()
+    t0 = default_timer()
+    reactor, sim = ignition_reactor()
+    acc = RateAccumulator(sim)
+    acc.advance(t_end)
+    t_acc = default_timer() - t0
+    mem_acc = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    scale = np.abs(net_ref).max()
+    print(f"n-heptane ignition at {T0} K, {acc.n_updates} steps, "
+          f"{gas.n_reactions} reactions")
+    print(f"  stored history: {t_ref:6.2f} s, peak memory {mem_ref / 2**20:6.2f} MiB")
+    print(f"  accumulator:    {t_acc:6.2f} s, peak memory {mem_acc / 2**20:6.2f} MiB")
+    print(f"  max. difference: {np.abs(acc.net - net_ref).max() / scale:.1e} "
+          "(relative to the largest reaction)")
+
+    print("Largest contributions to OH:")
+    for i, equation, amount in acc.contributions('oh', n=5):
+        print(f"  {i:4d}  {equation:40s} {amount:10.3e} kmol")
+    print("Largest carbon fluxes:")
+    for (a, b), amount in list(acc.path_fluxes('C').items())[:5]:
+        print(f"  {a:>10s} -> {b:10s} {amount:10.3e} kmol")
+
+    # NO formation in the WSR of 04_NOx_WSR
+    from steady_wsr import SteadyWSR, WSRConditions
+    wsr = SteadyWSR(WSRConditions(), mdot=1.0, method='march')
+    wsr.set_inlet(1.0)
+    wsr.reseed()
+    wsr.sim.initial_time = 0.0
+    wsr.sim.reinitialize()
+    acc = RateAccumulator(wsr.sim)
+    acc.advance(4.0)
+    print(f"WSR, phi = 1.0: {acc.n_updates} steps")
+    print("Largest contributions to NO:")
+    for i, equation, amount in acc.contributions('NO', n=5):
+        print(f"  {i:4d}  {equation:40s} {amount:10.3e} kmol")
+    print("Largest nitrogen fluxes:")
+    for (a, b), amount in list(acc.path_fluxes('N').items())[:5]:
+        print(f"  {a:>10s} -> {b:10s} {amount:10.3e} kmol")
@@ -0,0 +1,281 @@
+"""
+Benchmark suite for reaction rate parameterizations.
+
+`extensible_reaction_rates` compares built-in, lambda and extensible rates by
+timing 100 ignition runs of `h2o2.yaml` with a hand-written loop. This module
+runs the same comparison for several mechanisms, with all elementary Arrhenius
+reactions replaced by each kind of rate:
+
+* ``built-in``: the mechanism as it is,
+* ``lambda``: `CustomRate` objects with Python lambdas, as `custom2` and `custom4`,
+* ``extensible``: the per-reaction `ExtensibleArrhenius` rate,
+* ``batched``: `BatchedArrhenius` from `batched_rates.py`.
+
+Each configuration runs in a new process and reports the median and
+interquartile range of the integration time per step over the repeated runs,
+the number of steps and right-hand side evaluations, and the peak memory of
+the process:
+
+    results = run_suite(['h2o2', 'gri30'], repeat=5)
+    print(report(results))
+
+Results can be saved as a JSON baseline; `compare` lists the configurations
+that became slower than the baseline by more than a threshold. From the command
+line, the suite exits with status 1 if there are any:
+
+    python rate_benchmark.py --save            # write the baseline
+    python rate_benchmark.py --threshold 0.2   # check against the baseline
+
+Timings depend on the machine, so baselines are only comparable on the machine
+where they were written. All variants replace the same reactions, selected by
+`batched_rates.replaceable`; reactions with explicit reaction orders or
+negative pre-exponential factors are not replaced.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python rate_benchmark.py [--cases h2o2,gri30] [--variants built-in,batched]
+                             [--repeat 5] [--baseline FILE] [--save]
+                             [--threshold 0.2]
+"""
+import json
+from math import exp
+from pathlib import Path
+import resource
+import subprocess
+import sys
+from typing import NamedTuple
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+from batched_rates import batched_solution, replaceable
+
+
+class Case(NamedTuple):
+    """Ignition problem of a benchmark case."""
+    mechanism: str
+    fuel: str
+    T: float  #: initial temperature [K]
+    P: float  #: pressure [atm]
+    end_time: float  #: integration time [s]
+    preconditioned: bool  #: use `AdaptivePreconditioner`, as in `preconditioned_integration`
+
+
+class BenchmarkResult(NamedTuple):
+    """Timing of one configuration, from `run_config`."""
+    case: str
+    variant: str
+    n_replaced: int
+    us_per_step: float  #: median [μs]
+    iqr: float  #: interquartile range of the time per step [μs]
+    steps: int
+    rhs_evals: int
+    max_rss: float  #: peak memory of the process [MB]
+    T_final: float
+
+
+#: Benchmark cases: stoichiometric fuel/air ignition
+cases = {
+    'h2o2': Case('h2o2.yaml', 'H2', 1000, 5, 0.5, False),
+    'gri30': Case('gri30.yaml', 'CH4', 1200, 5, 0.5, False),
+    'seiser': Case('../inputs/seiser.yaml', 'nc7h16', 1000, 20, 0.5, False),
+    'nuig': Case('../inputs/n-hexane-NUIG-2015.yaml', 'NC6H14', 1000, 1, 0.1, True),
+}
+
+#: Kinds of rates that replace the elementary Arrhenius reactions
+variants = ('built-in', 'lambda', 'extensible', 'batched')
+
+#: Default number of runs per configuration
+default_repeat = {'h2o2': 20, 'gri30': 10, 'seiser': 5, 'nuig': 3}
+
+
+def lambda_solution(gas):
+    """Copy of ``gas`` with elementary Arrhenius reactions replaced by lambdas.
+
+    :return:
+        New `Solution` and the number of replaced reactions.
+    """
+    reactions = gas.reactions()
+    n_replaced = 0
+    for i, R in enumerate(reactions):
+        if not replaceable(R):
+            continue
+        A = R.rate.pre_exponential_factor
+        b = R.rate.temperature_exponent
+        Ea_R = R.rate.activation_energy / ct.gas_constant
+        custom = ct.Reaction(equation=R.equation,
+                             rate=lambda T, A=A, b=b, Ea_R=Ea_R: A * T**b * exp(-Ea_R/T))
+        custom.duplicate = R.duplicate
+        reactions[i] = custom
+        n_replaced += 1
+    new = ct.Solution(thermo='ideal-gas', kinetics='gas', species=gas.species(),
+                      reactions=reactions)
+    return new, n_replaced
+
+
+def variant_solution(gas, variant):
+    """`Solution` for one of the `variants`, and the number of replaced reactions."""
+    if variant == 'built-in':
+        return gas, 0
+    if variant == 'lambda':
+        return lambda_solution(gas)
+    rate_type = {'extensible': 'extensible-Arrhenius',
+                 'batched': 'batched-Arrhenius'}[variant]
+    return batched_solution(gas, rate_type)
+
+
+def ignition(gas, case, dT=0):
+    """Run the ignition problem of ``case``.
+
+    :return:
+        Integration time [s], and the `ReactorNet` for its solver statistics.
+    """
+    gas.TP = case.T + dT, case.P * ct.one_atm
+    gas.set_equivalence_ratio(1.0, case.fuel, 'O2:1.0, N2:3.76')
+    if case.preconditioned:
+        r = ct.IdealGasConstPressureMoleReactor(gas)
+        net = ct.ReactorNet([r])
+        net.derivative_settings = {"skip-third-bodies": True, "skip-falloff": True}
+        net.preconditioner = ct.AdaptivePreconditioner()
+    else:
+        r = ct.IdealGasReactor(gas)
+        net = ct.ReactorNet([r])
+    net.initialize()
+
+    t0 = default_timer()
+    net.advance(case.end_time)
+    return default_timer() - t0, net
+
+
+def run_config(case_name, variant, repeat):
+    """Time one configuration in the current process.
+
+    Runs start at initial temperatures 1 K apart, as in the notebook.
+    """
+    case = cases[case_name]
+    gas = ct.Solution(case.mechanism, transport_model=None)
+    gas, n_replaced = variant_solution(gas, variant)
+    times = []
+    for i in range(repeat):
+        elapsed, net = ignition(gas, case, dT=i)
+        stats = net.solver_stats
+        times.append(1e6 * elapsed / stats['steps'])
+    q1, median, q3 = np.percentile(times, [25, 50, 75])
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return BenchmarkResult(case_name, variant, n_replaced, median, q3 - q1,
+                           stats['steps'], stats['rhs_evals'], max_rss, gas.T)
+
+
+def run_suite(case_names=None, variant_names=None, repeat=None):
+    """Time configurations, each in a new process.
+
+    :param case_names:
+        Keys of `cases`; by default, all cases.
+    :param variant_names:
+        Elements of `variants`; by default, all variants.
+    :param repeat:
+        Number of runs per configuration; by default, `default_repeat`.
+    :return:
+        List of `BenchmarkResult`.
+    """
+    results = []
+    for case_name in case_names or cases:
+        for variant in variant_names or variants:
+            n = repeat or default_repeat[case_name]
+            output = subprocess.run(
+                [sys.executable, '-W', 'ignore', __file__, '--run', case_name, variant,
+                 str(n)], capture_output=True, text=True, check=True).stdout
+            results.append(BenchmarkResult(*json.loads(output.splitlines()[-1])))
+    return results
+
+
+def save_baseline(results, filename):
+    """Write ``results`` to a JSON file."""
+    data = {'cantera': ct.__version__,
+            'results': {f"{r.case}/{r.variant}": r._asdict() for r in results}}
+    Path(filename).write_text(json.dumps(data, indent=2) + "\n")
+
+
+def load_baseline(filename):
+    """Results of a JSON baseline, by ``'case/variant'``."""
+    data = json.loads(Path(filename).read_text())
+    return {key: BenchmarkResult(**value) for key, value in data['results'].items()}
+
+
+def compare(results, baseline, threshold=0.2):
+    """Configurations that became slower than the baseline.
+
+    :param baseline:
+        Results by ``'case/variant'``, see `load_baseline`.
+    :param threshold:
+        Tolerated relative increase of the median time per step.
+    :return:
+        List of messages, one for each regression.
+    """
+    regressions = []
+    for r in results:
+        old = baseline.get(f"{r.case}/{r.variant}")
+        if old is None:
+            continue
+        change = r.us_per_step / old.us_per_step - 1
+        if change > threshold:
+            regressions.append(
+                f"{r.case}/{r.variant}: {old.us_per_step:.2f} -> {r.us_per_step:.2f} "
+                f"μs/step ({100 * change:+.0f}%, threshold {100 * threshold:.0f}%)")
+    return regressions
+
+
+def report(results, baseline=None):
+    """Table of results, with changes relative to ``baseline`` if given."""
+    lines = [f"{'case':8s} {'variant':11s} {'replaced':>8s} {'μs/step':>9s} "
+             f"{'IQR':>7s} {'steps':>6s} {'RHS':>6s} {'MB':>6s} {'T_final':>8s}"
+             + ("  vs. baseline" if baseline else "")]
+    for r in results:
+        line = (f"{r.case:8s} {r.variant:11s} {r.n_replaced:8d} {r.us_per_step:9.2f} "
+                f"{r.iqr:7.2f} {r.steps:6d} {r.rhs_evals:6d} {r.max_rss:6.0f} "
+                f"{r.T_final:8.2f}")
+        old = (baseline or {}).get(f"{r.case}/{r.variant}")
+        if old is not None:
+            line += f"  {100 * (r.us_per_step / old.us_per_step - 1):+6.1f}%"
+        lines.append(line)
+    return "\n".join(lines)
+
+
+if __name__ == '__main__' and sys.argv[1:2] == ['--run']:
+    ct.suppress_thermo_warnings()
+    result = run_config(sys.argv[2], sys.argv[3], int(sys.argv[4]))
+    print(json.dumps(result))
+
+elif __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('--cases', default=','.join(cases),
+                        help="comma-separated cases (default: %(default)s)")
+    parser.add_argument('--variants', default=','.join(variants),
+                        help="comma-separated variants (default: %(default)s)")
+    parser.add_argument('--repeat', type=int, help="runs per configuration")
+    parser.add_argument('--baseline', default='rate_benchmark.json',
+                        help="JSON baseline (default: %(default)s)")
+    parser.add_argument('--save', action='store_true',
+                        help="write the results as the new baseline")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="tolerated relative slowdown (default: %(default)s)")
+    args = parser.parse_args()
+
+    results = run_suite(args.cases.split(','), args.variants.split(','), args.repeat)
+    if args.save:
+        save_baseline(results, args.baseline)
+        print(report(results))
+        print(f"Baseline written to {args.baseline}")
+        sys.exit()
+    baseline = load_baseline(args.baseline) if Path(args.baseline).exists() else None
+    print(report(results, baseline))
+    if baseline is None:
+        print(f"No baseline found at {args.baseline}; write one with --save")
+        sys.exit()
+    regressions = compare(results, baseline, args.threshold)
+    for message in regressions:
+        print(f"REGRESSION {message}")
+    sys.exit(1 if regressions else 0)
@@ -0,0 +1,235 @@
+"""
+Scan of forward and reverse rate constants over a temperature/pressure grid.
+
+`07_thermo_debugging` looks for unphysical reverse rates at a single
+equilibrated state:
+
+    kr = gas.reverse_rate_constants
+    for i, k in enumerate(kr):
+        if k > 1e20:
+            print(f'{i:4d}  {k:.4e}  {gas.reaction(i).equation}')
+
+which misses reactions that misbehave at other temperatures, and uses the same
+threshold for rate constants of different reaction orders. `scan_rates` fills
+a `SolutionArray` over a (T, P) grid, evaluates all forward and reverse rate
+constants at once, and compares them with
+
+* collision limits that depend on the molecularity of the reaction direction
+  (see `collision_limits`), and
+* monotonic behavior in temperature: a rate constant that rises and falls (or
+  falls and rises) by more than a tolerance along the temperature axis is
+  flagged, which catches reverse rates distorted by broken thermo data.
+
+    anomalies = scan_rates(gas)
+    to_dataframe(anomalies).sort_values('value', ascending=False)
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python rate_scan.py
+"""
+from typing import NamedTuple
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+#: Collision diameter [m] used for species without transport data
+default_diameter = 5e-10
+
+
+class RateAnomaly(NamedTuple):
+    """A rate constant failing one of the checks of `scan_rates`.
+
+    ``value`` is ``log10(k / k_limit)`` for the collision limit check, and the
+    depth of the non-monotonic excursion in decades otherwise.
+    """
+    reaction: int
+    equation: str
+    direction: str
+    check: str
+    T: float
+    P: float
+    value: float
+    threshold: float
+
+    def __str__(self):
+        return (f"{self.reaction:5d}  {self.direction:8s} {self.check:16s} "
+                f"{self.value:7.2f} at {self.T:6.0f} K, {self.P / ct.one_atm:7.3g} atm"
+                f"  {self.equation}")
+
+
+def collision_limits(gas, T, bath=None):
+    """Order-of-magnitude upper bounds for forward and reverse rate constants.
+
+    * molecularity 1: the transition state limit ``k_B T / h``,
+    * molecularity 2: the gas kinetic collision rate
+      ``N_A pi sigma^2 sqrt(8 k_B T / (pi mu))``, using the mean collision
+      diameter and the reduced mass of the first two species,
+    * molecularity 3: the bimolecular limit times ``N_A 4/3 pi sigma^3``, the
+      probability that a third molecule is within collision distance.
+
+    Third bodies count towards the molecularity of three-body reactions, but not
+    of falloff reactions, whose rate constants already include them. A single
+    species and a third body, for example ``HCO + M``, is treated as a
+    collision of that species with the explicit collider or with ``bath``.
+    Limits are infinite for higher molecularities.
+
+    :param bath:
+        Name of the species representing the generic third body ``M``; by
+        default, the species with the largest mole fraction in ``gas``.
+    :return:
+        Arrays with shape ``(len(T), n_reactions)`` for both directions, in the
+        units of `Kinetics.forward_rate_constants`.
+    """
+    T = np.atleast_1d(np.asarray(T, dtype=float))
+    species = {sp.name: sp for sp in gas.species()}
+    W = dict(zip(gas.species_names, gas.molecular_weights))
+    if bath is None:
+        bath = gas.species_names[np.argmax(gas.X)]
+
+    def diameter(name):
+        transport = species[name].transport
+        return transport.diameter if transport is not None else default_diameter
+
+    kT_h = ct.boltzmann * T / ct.planck
+    limits = []
+    for side in ('reactants', 'products'):
+        prefactor = np.full(gas.n_reactions, np.inf)
+        order = np.zeros(gas.n_reactions, dtype=int)
+        for i, R in enumerate(gas.reactions()):
+            names = [k for k, nu in getattr(R, side).items()
+                     for _ in range(int(round(nu)))]
+            n = len(names)
+            if R.third_body is not None and not R.reaction_type.startswith(
+                    ('falloff', 'chemically-activated')):
+                n += 1
+                if len(names) == 1:
+                    collider = R.third_body.name
+                    names.append(collider if collider in species else bath)
+            order[i] = n
+            if n in (2, 3) and len(names) >= 2:
+                a, b = names[:2]
+                sigma = 0.5 * (diameter(a) + diameter(b))
+                mu = W[a] * W[b] / (W[a] + W[b]) / ct.avogadro
+                prefactor[i] = (ct.avogadro * np.pi * sigma**2
+                                * np.sqrt(8 * ct.boltzmann / (np.pi * mu)))
+                if n == 3:
+                    prefactor[i] *= ct.avogadro * 4 / 3 * np.pi * sigma**3
+        limit = prefactor * np.sqrt(T)[:, np.newaxis]
+        limit[:, order == 1] = kT_h[:, np.newaxis]
+        limits.append(limit)
+    return tuple(limits)
+
+
+def _non_monotonic(log_k):
+    """Depth of non-monotonic excursions of log10(k) along the first axis."""
+    # steps from or to zero rate constants (-inf) are not counted
+    with np.errstate(invalid='ignore'):
+        d = np.diff(log_k, axis=0)
+    d = np.where(np.isfinite(d), d, 0.0)
+    rise = np.clip(d, 0, None).sum(axis=0)
+    fall = np.clip(-d, 0, None).sum(axis=0)
+    return np.minimum(rise, fall)
+
+
+def scan_rates(gas, T=None, P=None, X='N2:1.0', collision_factor=1.0,
+               monotonic_tol=1.0):
+    """Flag rate constants that exceed collision limits or are not monotonic.
+
+    :param gas:
+        `Solution` to be checked.
+    :param T:
+        Temperature grid [K]; defaults to 100 points from 300 to 3000 K.
+    :param P:
+        Pressure grid [Pa]; defaults to 0.01, 0.1, 1, 10 and 100 atm.
+    :param X:
+        Composition of the bath gas, which only matters for pressure-dependent
+        reactions.
+    :param collision_factor:
+        Tolerated ratio between rate constant and collision limit.
+    :param monotonic_tol:
+        Tolerated depth of non-monotonic excursions in decades.
+    :return:
+        List of `RateAnomaly`, one per reaction, direction and check, at the
+        grid point where it is most severe; largest values first.
+    """
+    T = np.linspace(300, 3000, 100) if T is None else np.sort(np.asarray(T, float))
+    P = ct.one_atm * np.logspace(-2, 2, 5) if P is None else np.asarray(P, float)
+    states = ct.SolutionArray(gas, (len(T), len(P)))
+    TT, PP = np.meshgrid(T, P, indexing='ij')
+    states.TPX = TT, PP, X
+    bath = gas.species_names[np.argmax(states.X[0, 0])]
+
+    k = {'forward': states.forward_rate_constants,
+         'reverse': states.reverse_rate_constants}
+    limits = dict(zip(k, collision_limits(gas, T, bath)))
+    equations = None
+    anomalies = []
+    for direction, values in k.items():
+        with np.errstate(divide='ignore'):
+            log_k = np.log10(values)
+            excess = log_k - np.log10(limits[direction])[:, np.newaxis, :]
+        flat = excess.reshape(-1, gas.n_reactions)
+        worst = flat.argmax(axis=0)
+        worst_excess = flat[worst, np.arange(gas.n_reactions)]
+        depth = _non_monotonic(log_k)
+        worst_p = depth.argmax(axis=0)
+        worst_depth = depth[worst_p, np.arange(gas.n_reactions)]
+
+        flagged = (np.nonzero(worst_excess > np.log10(collision_factor))[0],
+                   np.nonzero(worst_depth > monotonic_tol)[0])
+        if equations is None and any(len(f) for f in flagged):
+            equations = gas.reaction_equations()
+        for i in flagged[0]:
+            iT, iP = np.unravel_index(worst[i], (len(T), len(P)))
+            anomalies.append(RateAnomaly(
+                i, equations[i], direction, 'collision-limit', T[iT], P[iP],
+                worst_excess[i], np.log10(collision_factor)))
+        for i in flagged[1]:
+            line = log_k[:, worst_p[i], i]
+            # report the interior extremum
+            iT = max(line.argmax(), line.argmin(),
+                     key=lambda j: min(j, len(T) - 1 - j))
+            anomalies.append(RateAnomaly(
+                i, equations[i], direction, 'non-monotonic', T[iT], P[worst_p[i]],
+                worst_depth[i], monotonic_tol))
+
+    anomalies.sort(key=lambda anomaly: -anomaly.value)
+    return anomalies
+
+
+def to_dataframe(anomalies):
+    """Convert the results of `scan_rates` to a `pandas.DataFrame`."""
+    import pandas as pd
+    return pd.DataFrame(anomalies, columns=RateAnomaly._fields)
+
+
+if __name__ == '__main__':
+    ct.suppress_thermo_warnings()
+    for mech in ['gri30.yaml', '../inputs/mech_debug/mech.yaml',
+                 '../inputs/n-hexane-NUIG-2015.yaml']:
+        gas = ct.Solution(mech)
+        print(f"{mech}: {gas.n_reactions} reactions")
+
+        # single-state check from 07_thermo_debugging
+        t0 = default_timer()
+        gas.TPX = 300, 101325, 'CH4:1.0, O2:0.1' if 'CH4' in gas.species_names \
+            else 'N2:1.0'
+        gas.equilibrate('TP')
+        kr = gas.reverse_rate_constants
+        single = [i for i, k in enumerate(kr) if k > 1e20]
+        t_single = default_timer() - t0
+
+        t0 = default_timer()
+        anomalies = scan_rates(gas)
+        t_scan = default_timer() - t0
+        table = to_dataframe(anomalies)
+        counts = table.groupby(['direction', 'check']).size()
+        print(f"  single state, kr > 1e20: {len(single):4d} reactions "
+              f"({1e3 * t_single:.0f} ms)")
+        print(f"  (T, P) grid scan:        {table.reaction.nunique():4d} reactions "
+              f"({1e3 * t_scan:.0f} ms)")
+        for (direction, check), n in counts.items():
+            print(f"    {direction:8s} {check:16s} {n:5d}")
+        for anomaly in anomalies[:5]:
+            print(f"  {anomaly}")
@@ -0,0 +1,216 @@
+"""
+Inverted species-to-reaction index for mechanism queries.
+
+`04_NOx_WSR` and `07_thermo_debugging` look up reactions with loops such as
+
+    for i, R in enumerate(gas.reactions()):
+        all_species = R.reactants | R.products
+        if 'N' in all_species and 'NO' in all_species:
+            print(i, R)
+
+which creates a Python `Reaction` object for every reaction in the mechanism
+each time a question is asked. `ReactionIndex` collects species, reaction type,
+third-body and falloff flags and elements once per `Solution`, after which
+queries reduce to set intersections:
+
+    index = reaction_index(gas)
+    index.find(species=['N', 'NO'])
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python reaction_index.py
+"""
+from collections import OrderedDict
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+
+class ReactionIndex:
+    """Inverted index from species, elements and reaction types to reactions.
+
+    :param gas:
+        `Solution` with a kinetics model. The index reflects the reactions at
+        the time it is built; use `reaction_index` to get an index that is
+        rebuilt when reactions are added.
+    """
+    def __init__(self, gas):
+        self.n_species = gas.n_species
+        self.n_reactions = gas.n_reactions
+        self.species_names = gas.species_names
+        self.element_names = gas.element_names
+
+        species_elements = {
+            k: frozenset(m for m in self.element_names if gas.n_atoms(k, m) > 0)
+            for k in self.species_names}
+        reactants = {k: set() for k in self.species_names}
+        products = {k: set() for k in self.species_names}
+        elements = {m: set() for m in self.element_names}
+        types = {}
+        flags = {'third_body': set(), 'falloff': set(), 'reversible': set(),
+                 'duplicate': set()}
+        self.reaction_types = []
+        for i, R in enumerate(gas.reactions()):
+            for k in R.reactants:
+                reactants[k].add(i)
+            for k in R.products:
+                products[k].add(i)
+            for m in frozenset().union(
+                    *(species_elements[k] for k in R.reactants | R.products)):
+                elements[m].add(i)
+            self.reaction_types.append(R.reaction_type)
+            types.setdefault(R.reaction_type, set()).add(i)
+            if R.third_body is not None:
+                flags['third_body'].add(i)
+            if R.reaction_type.startswith(('falloff', 'chemically-activated')):
+                flags['falloff'].add(i)
+            if R.reversible:
+                flags['reversible'].add(i)
+            if R.duplicate:
+                flags['duplicate'].add(i)
+
+        self._reactants = {k: frozenset(v) for k, v in reactants.items()}
+        self._products = {k: frozenset(v) for k, v in products.items()}
+        self._species = {k: self._reactants[k] | self._products[k]
+                         for k in self.species_names}
+        self._elements = {m: frozenset(v) for m, v in elements.items()}
+        self._types = {key: frozenset(v) for key, v in types.items()}
+        self._flags = {key: frozenset(v) for key, v in flags.items()}
+        self._all = frozenset(range(self.n_reactions))
+
+    @staticmethod
+    def _as_list(value):
+        return [value] if isinstance(value, str) else list(value)
+
+    def _lookup(self, table, name, kind):
+        try:
+            return table[name]
+        except KeyError:
+            raise KeyError(f"Unknown {kind} '{name}'") from None
+
+    def reactions_of_type(self, reaction_type):
+        """Reactions of a type, for example ``'falloff-Troe'``.
+
+        A type also matches its specializations, so ``'falloff'`` includes
+        ``'falloff-Troe'`` and ``'falloff-Lindemann'``.
+        """
+        match = set()
+        for rtype, indices in self._types.items():
+            if rtype == reaction_type or rtype.startswith(reaction_type + '-'):
+                match |= indices
+        return frozenset(match)
+
+    def find(self, species=(), any_species=(), reactants=(), products=(),
+             elements=(), reaction_type=None, third_body=None, falloff=None,
+             reversible=None, duplicate=None):
+        """Indices of all reactions that satisfy every given criterion.
+
+        :param species:
+            Species that all have to participate, as reactant or product.
+        :param any_species:
+            Species of which at least one has to participate.
+        :param reactants:
+            Species that all have to appear on the reactant side.
+        :param products:
+            Species that all have to appear on the product side.
+        :param elements:
+            Elements that all have to be contained in participating species.
+        :param reaction_type:
+            Reaction type or list of types, see `reactions_of_type`.
+        :param third_body, falloff, reversible, duplicate:
+            If `True` or `False`, require the flag to be set or unset.
+        :return:
+            Sorted array of reaction indices.
+        """
+        selected = [self._lookup(self._species, k, 'species')
+                    for k in self._as_list(species)]
+        selected += [self._lookup(self._reactants, k, 'species')
+                     for k in self._as_list(reactants)]
+        selected += [self._lookup(self._products, k, 'species')
+                     for k in self._as_list(products)]
+        selected += [self._lookup(self._elements, m, 'element')
+                     for m in self._as_list(elements)]
+        if any_species:
+            selected.append(frozenset().union(
+                *(self._lookup(self._species, k, 'species')
+                  for k in self._as_list(any_species))))
+        if reaction_type is not None:
+            selected.append(frozenset().union(
+                *(self.reactions_of_type(t) for t in self._as_list(reaction_type))))
+
+        # start from the smallest set to keep intersections cheap
+        selected.sort(key=len)
+        result = set(selected[0]) if selected else set(self._all)
+        for indices in selected[1:]:
+            result &= indices
+        for flag, value in (('third_body', third_body), ('falloff', falloff),
+                            ('reversible', reversible), ('duplicate', duplicate)):
+            if value is True:
+                result &= self._flags[flag]
+            elif value is False:
+                result -= self._flags[flag]
+        return np.array(sorted(result), dtype=int)
+
+
+_cache = OrderedDict()
+_cache_size = 8
+
+
+def reaction_index(gas):
+    """Cached `ReactionIndex` for a `Solution`.
+
+    An index is kept for each of the most recently used `Solution` objects,
+    and rebuilt if species or reactions have been added since.
+    """
+    key = id(gas)
+    if key in _cache:
+        cached_gas, index = _cache[key]
+        if (cached_gas is gas and index.n_reactions == gas.n_reactions
+                and index.n_species == gas.n_species):
+            _cache.move_to_end(key)
+            return index
+    index = ReactionIndex(gas)
+    # keep a reference to the Solution, so that its id is not reused
+    _cache[key] = (gas, index)
+    _cache.move_to_end(key)
+    while len(_cache) > _cache_size:
+        _cache.popitem(last=False)
+    return index
+
+
+def find_reactions(gas, **criteria):
+    """Shortcut for ``reaction_index(gas).find(**criteria)``.
+    """
+    return reaction_index(gas).find(**criteria)
+
+
+if __name__ == '__main__':
+    for mech, query in [('gri30.yaml', ['N', 'NO']),
+                        ('../inputs/mech_debug/mech.yaml', ['CH3', 'H2', 'CH']),
+                        ('../inputs/n-hexane-NUIG-2015.yaml', ['OH', 'NC6H14'])]:
+        ct.suppress_thermo_warnings()
+        gas = ct.Solution(mech)
+        print(f"{mech}: {gas.n_species} species, {gas.n_reactions} reactions")
+
+        t0 = default_timer()
+        found = [i for i, R in enumerate(gas.reactions())
+                 if all(k in R.reactants or k in R.products for k in query)]
+        t_scan = default_timer() - t0
+
+        t0 = default_timer()
+        index = reaction_index(gas)
+        t_build = default_timer() - t0
+
+        repeat = 1000
+        t0 = default_timer()
+        for _ in range(repeat):
+            indices = find_reactions(gas, species=query)
+        t_query = (default_timer() - t0) / repeat
+
+        assert list(indices) == found
+        print(f"  linear scan:  {1e6 * t_scan:9.1f} μs")
+        print(f"  build index:  {1e6 * t_build:9.1f} μs (once)")
+        print(f"  query index:  {1e6 * t_query:9.1f} μs")
+        for i in indices[:5]:
+            print(f"  {i:5d}  {gas.reaction(i).equation}")
@@ -0,0 +1,262 @@
+"""
+Parallel reactor maps over named parameter axes.
+
+The NOx map in `04_NOx_WSR` and the extinction grid in
+`perfectly_stirred_reactor_completed` are nested loops over two parameters,
+where every point is started from scratch. `run_map` instead treats the last
+axis as a continuation axis: each line along it is solved by one reactor that
+is warm-started from point to point, and the lines are distributed over a pool
+of worker processes. Results come back as a `ReactorMap`, which carries the
+dimension names and coordinates along with the selected outputs.
+
+Builders passed to `run_map` are called once per line with the fixed parameter
+values as keyword arguments, and return a callable that takes the next value of
+the continuation axis and returns the `Solution` holding the converged state.
+Builders need to be defined at module level, so that they can be sent to worker
+processes.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python reactor_map.py
+"""
+from itertools import product
+import multiprocessing
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+from steady_wsr import SteadyWSR, WSRConditions
+
+
+class ReactorMap:
+    """Labeled results of `run_map`.
+
+    :param dims:
+        Names of the parameter axes.
+    :param coords:
+        Dictionary mapping dimension names to coordinate arrays.
+    :param data:
+        Dictionary mapping output names to arrays with one axis per dimension.
+    """
+    def __init__(self, dims, coords, data):
+        self.dims = tuple(dims)
+        self.coords = {name: np.asarray(coords[name]) for name in self.dims}
+        self.data = dict(data)
+
+    @property
+    def shape(self):
+        return tuple(len(self.coords[name]) for name in self.dims)
+
+    @property
+    def outputs(self):
+        return list(self.data)
+
+    def __getitem__(self, output):
+        return self.data[output]
+
+    def __repr__(self):
+        dims = ", ".join(f"{name}: {n}" for name, n in zip(self.dims, self.shape))
+        return f"<ReactorMap ({dims}) outputs: {', '.join(self.outputs)}>"
+
+    def sel(self, **values):
+        """Select by coordinate value, using the nearest coordinate.
+
+        Selected dimensions are dropped from the result, for example
+        ``results.sel(mdot=1.0)['NO']`` is the NO profile along ``phi``.
+        """
+        index = []
+        dims = []
+        for name in self.dims:
+            if name in values:
+                index.append(np.abs(self.coords[name] - values[name]).argmin())
+            else:
+                index.append(slice(None))
+                dims.append(name)
+        index = tuple(index)
+        return ReactorMap(dims, self.coords,
+                          {key: value[index] for key, value in self.data.items()})
+
+    def to_dataframe(self):
+        """Convert to a `pandas.DataFrame` in long format, one row per point.
+        """
+        import pandas as pd
+        index = pd.MultiIndex.from_product(
+            [self.coords[name] for name in self.dims], names=self.dims)
+        return pd.DataFrame(
+            {key: value.ravel() for key, value in self.data.items()}, index=index)
+
+    def to_xarray(self):
+        """Convert to an `xarray.Dataset` (requires the `xarray` package).
+        """
+        import xarray as xr
+        return xr.Dataset(
+            {key: (self.dims, value) for key, value in self.data.items()},
+            coords=self.coords)
+
+    def save(self, filename):
+        """Save to a compressed NumPy ``.npz`` file.
+        """
+        arrays = {f"coord:{name}": self.coords[name] for name in self.dims}
+        arrays.update({f"data:{key}": value for key, value in self.data.items()})
+        np.savez_compressed(filename, dims=np.array(self.dims), **arrays)
+
+    @classmethod
+    def load(cls, filename):
+        """Load results written by `save`.
+        """
+        with np.load(filename) as npz:
+            dims = [str(name) for name in npz["dims"]]
+            coords = {name: npz[f"coord:{name}"] for name in dims}
+            data = {key[5:]: npz[key] for key in npz.files if key.startswith("data:")}
+        return cls(dims, coords, data)
+
+
+def _evaluate(phase, outputs, basis):
+    """Extract outputs from a converged state."""
+    values = []
+    for name in outputs:
+        if name in phase.species_names:
+            values.append(getattr(phase[name], basis)[0])
+        else:
+            values.append(getattr(phase, name))
+    return values
+
+
+def _run_line(job):
+    """Worker function: solve one continuation line."""
+    index, build, fixed, sweep, outputs, basis = job
+    solve = build(**fixed)
+    values = np.empty((len(sweep), len(outputs)))
+    for i, value in enumerate(sweep):
+        values[i] = _evaluate(solve(value), outputs, basis)
+    return index, values
+
+
+def run_map(build, axes, outputs, basis='X', processes=None):
+    """Solve a reactor over all combinations of the parameter axes.
+
+    :param build:
+        Module-level function called with one keyword argument per fixed axis,
+        returning a callable that solves for the next value of the last axis.
+    :param axes:
+        Dictionary mapping parameter names to coordinate arrays. The last entry
+        is the continuation axis, so it should be ordered such that neighbors
+        are close to each other.
+    :param outputs:
+        Names of species (reported as mole or mass fractions) or of `Solution`
+        properties, for example ``['T', 'NO', 'CO']``.
+    :param basis:
+        ``'X'`` for mole fractions or ``'Y'`` for mass fractions.
+    :param processes:
+        Number of worker processes. Defaults to all available cores but one;
+        with ``processes=1``, lines are solved in the current process.
+    :return:
+        `ReactorMap` with one array per output.
+    """
+    dims = list(axes)
+    fixed_dims, sweep_dim = dims[:-1], dims[-1]
+    sweep = np.asarray(axes[sweep_dim])
+    shape = tuple(len(axes[name]) for name in dims)
+
+    jobs = []
+    for index in product(*(range(len(axes[name])) for name in fixed_dims)):
+        fixed = {name: axes[name][i] for name, i in zip(fixed_dims, index)}
+        jobs.append((index, build, fixed, sweep, list(outputs), basis))
+
+    if processes is None:
+        processes = max(multiprocessing.cpu_count() - 1, 1)
+    processes = min(processes, len(jobs))
+    if processes > 1:
+        with multiprocessing.Pool(processes=processes) as pool:
+            results = pool.map(_run_line, jobs, chunksize=1)
+    else:
+        results = map(_run_line, jobs)
+
+    values = np.empty(shape + (len(outputs),))
+    for index, line in results:
+        values[index] = line
+    return ReactorMap(dims, axes,
+                      {name: values[..., j] for j, name in enumerate(outputs)})
+
+
+def nox_wsr(mdot):
+    """Builder for the NOx map of `04_NOx_WSR`, continued along ``phi``.
+    """
+    return SteadyWSR(WSRConditions(), mdot).continue_to
+
+
+class ResidenceTimePSR:
+    """PSR with fixed residence time from `perfectly_stirred_reactor_completed`.
+
+    Calling the object with a new residence time solves for the steady state,
+    starting from the previous solution unless the reactor has blown out.
+    """
+    def __init__(self, phi, model_file='h2o2.yaml', fuel='H2',
+                 oxidizer='O2:1.0, AR:4.0', T_in=300.0, pressure=ct.one_atm):
+        self.gas = ct.Solution(model_file)
+        self.inlet_gas = ct.Solution(model_file)
+        self.inlet_gas.TP = T_in, pressure
+        self.inlet_gas.set_equivalence_ratio(phi, fuel, oxidizer)
+        self.gas.TPX = self.inlet_gas.TPX
+
+        self.upstream = ct.Reservoir(self.inlet_gas)
+        self.downstream = ct.Reservoir(self.gas)
+        self.gas.equilibrate('HP')
+        self.T_equil = self.gas.T
+        self.reactor = ct.IdealGasReactor(self.gas)
+        self.inlet = ct.MassFlowController(self.upstream, self.reactor)
+        self.inlet.mass_flow_rate = lambda t: self.reactor.mass / self.residence_time
+        self.outlet = ct.PressureController(self.reactor, self.downstream,
+                                            primary=self.inlet)
+        self.sim = ct.ReactorNet([self.reactor])
+        self.residence_time = None
+
+    def __call__(self, residence_time):
+        if self.reactor.T < self.inlet_gas.T + 50.0:
+            self.gas.TPX = self.inlet_gas.TPX
+            self.gas.equilibrate('HP')
+            self.reactor.syncState()
+        self.residence_time = residence_time
+        self.sim.initial_time = 0.0
+        self.sim.reinitialize()
+        self.sim.advance_to_steady_state()
+        return self.reactor.thermo
+
+
+def extinction_psr(phi):
+    """Builder for the extinction grid, continued along ``residence_time``.
+    """
+    return ResidenceTimePSR(phi)
+
+
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
+    t0 = default_timer()
+    nox = run_map(nox_wsr, {'mdot': np.logspace(-2, 2, 7),
+                            'phi': np.linspace(0.5, 1.8, 60)},
+                  outputs=['T', 'NO', 'CO'], basis='Y')
+    print(f"NOx map {nox.shape}: {default_timer() - t0:.2f} s")
+
+    t0 = default_timer()
+    extinction = run_map(extinction_psr,
+                         {'phi': [0.5, 0.7, 1.0],
+                          'residence_time': np.logspace(0, -5, num=200)},
+                         outputs=['T', 'OH'])
+    print(f"Extinction grid {extinction.shape}: {default_timer() - t0:.2f} s")
+
+    fig, ax = plt.subplots(1, 2, figsize=(10, 4))
+    for mdot in nox.coords['mdot']:
+        line = nox.sel(mdot=mdot)
+        ax[0].plot(line.coords['phi'], line['NO'],
+                   label=r"$\dot{m} = " + f"{mdot:.2f}$ kg/s")
+    ax[0].set(xlabel=r"Equivalence ratio, $\phi$", ylabel="NO mass fraction")
+    ax[0].legend()
+    for phi in extinction.coords['phi']:
+        line = extinction.sel(phi=phi)
+        ax[1].semilogx(line.coords['residence_time'], line['T'],
+                       label=rf"$\phi = {phi}$")
+    ax[1].set(xlabel="Residence Time, s", ylabel="Temperature, K")
+    ax[1].legend()
+    plt.show()
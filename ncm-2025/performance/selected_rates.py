@@ -0,0 +1,141 @@
+"""
+Rates of selected reactions over a `SolutionArray`.
+
+`04_NOx_WSR` plots `states.reverse_rates_of_progress[:, iZ1]` and
+`07_thermo_debugging` plots `gasN.forward_rate_constants[:, 295]`: every
+reaction of the mechanism is evaluated for every state, only to keep one or two
+columns. `SelectedRates` builds a small kinetics object that contains just the
+selected reactions, and the species they need, and evaluates it for all states.
+
+    rates = SelectedRates(gas, [177, 178])
+    rop = rates.evaluate(states, 'reverse_rates_of_progress')  # (n_states, 2)
+
+Reactions with third bodies (including falloff reactions) depend on the
+concentrations of all species, so the full species set is kept if any of the
+selected reactions has a third body.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python selected_rates.py
+"""
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+#: Reaction properties that can be evaluated by `SelectedRates`
+quantities = (
+    'forward_rate_constants', 'reverse_rate_constants', 'equilibrium_constants',
+    'forward_rates_of_progress', 'reverse_rates_of_progress',
+    'net_rates_of_progress', 'delta_gibbs', 'delta_enthalpy',
+    'delta_standard_gibbs', 'delta_standard_enthalpy', 'delta_standard_entropy')
+
+
+class SelectedRates:
+    """Evaluate reaction properties for a subset of the reactions of a mechanism.
+
+    :param gas:
+        `Solution` using the ``ideal-gas`` thermo model.
+    :param reactions:
+        Indices of the reactions to evaluate, for example the output of
+        `reaction_index.find_reactions`.
+    """
+    def __init__(self, gas, reactions):
+        if gas.thermo_model != 'ideal-gas':
+            raise ValueError("Selective rate evaluation requires an ideal gas, "
+                             f"not '{gas.thermo_model}'")
+        self.reactions = np.atleast_1d(np.asarray(reactions, dtype=int))
+        self.n_species = gas.n_species
+        selected = [gas.reaction(i) for i in self.reactions]
+        if any(R.third_body is not None for R in selected):
+            names = gas.species_names
+        else:
+            participants = set()
+            for R in selected:
+                participants.update(R.reactants, R.products, R.orders)
+            names = [k for k in gas.species_names if k in participants]
+        self.species_index = np.array([gas.species_index(k) for k in names])
+        self.phase = ct.Solution(
+            thermo='ideal-gas', kinetics='gas',
+            species=[gas.species(k) for k in names], reactions=selected)
+
+    def evaluate(self, states, quantity='net_rates_of_progress'):
+        """Evaluate a reaction property for all states.
+
+        :param states:
+            `SolutionArray` of the mechanism used to create this object.
+        :param quantity:
+            Name of a `Kinetics` property, see `quantities`.
+        :return:
+            Array with shape ``states.shape + (n_selected,)``.
+        """
+        if quantity not in quantities:
+            raise ValueError(f"Unsupported quantity '{quantity}'")
+        if states.n_species != self.n_species:
+            raise ValueError("SolutionArray does not match the mechanism")
+        T = np.ravel(states.T)
+        P = np.ravel(states.P)
+        X = states.X.reshape(-1, self.n_species)[:, self.species_index]
+
+        # mole fractions of the retained species are set without normalization,
+        # which preserves their concentrations
+        phase = self.phase
+        values = np.empty((len(T), len(self.reactions)))
+        for i in range(len(T)):
+            phase.TP = T[i], P[i]
+            phase.set_unnormalized_mole_fractions(X[i])
+            phase.TP = T[i], P[i]
+            values[i] = getattr(phase, quantity)
+        return values.reshape(states.shape + (len(self.reactions),))
+
+
+def selected_rates(states, reactions, quantity='net_rates_of_progress'):
+    """Shortcut for ``SelectedRates(gas, reactions).evaluate(states, quantity)``.
+
+    The mechanism is taken from ``states``, and the reduced mechanism is built
+    on every call. For repeated evaluations with the same reactions, create a
+    `SelectedRates` object once instead.
+    """
+    gas = ct.Solution(thermo='ideal-gas', kinetics='gas',
+                      species=states.species(), reactions=states.reactions())
+    return SelectedRates(gas, reactions).evaluate(states, quantity)
+
+
+if __name__ == '__main__':
+    ct.suppress_thermo_warnings()
+    repeat = 10
+
+    cases = [
+        ('gri30.yaml', [177, 178], 'reverse_rates_of_progress', 500,
+         'CH4:1.0, O2:2.0, N2:7.52, NO:0.01, HCN:0.01'),
+        ('../inputs/mech_debug/mech.yaml', [295], 'forward_rate_constants', 200,
+         'CH4:1.0, O2:2.0, N2:7.52'),
+        ('../inputs/n-hexane-NUIG-2015.yaml', [10, 11], 'net_rates_of_progress', 200,
+         'NC6H14:1.0, O2:9.5, N2:35.72'),
+    ]
+    for mech, reactions, quantity, n_states, X in cases:
+        gas = ct.Solution(mech)
+        gas.TPX = 1500, ct.one_atm, X
+        gas.equilibrate('TP')
+        states = ct.SolutionArray(gas, n_states)
+        states.TPX = np.linspace(300, 3000, n_states), ct.one_atm, gas.X
+        print(f"{mech}: {gas.n_reactions} reactions, {n_states} states, {quantity}")
+
+        t0 = default_timer()
+        for _ in range(repeat):
+            full = getattr(states, quantity)[:, reactions]
+        t_full = (default_timer() - t0) / repeat
+
+        t0 = default_timer()
+        rates = SelectedRates(gas, reactions)
+        t_setup = default_timer() - t0
+        t0 = default_timer()
+        for _ in range(repeat):
+            selected = rates.evaluate(states, quantity)
+        t_selected = (default_timer() - t0) / repeat
+
+        assert np.allclose(selected, full, rtol=1e-10, atol=0)
+        print(f"  all reactions:      {1e3 * t_full:7.2f} ms")
+        print(f"  selected reactions: {1e3 * t_selected:7.2f} ms "
+              f"(+ {1e3 * t_setup:.2f} ms setup, "
+              f"{len(rates.species_index)} of {gas.n_species} species)")
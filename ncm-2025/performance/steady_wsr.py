@@ -0,0 +1,296 @@
+"""
+Steady-state well-stirred reactor (WSR) solutions with continuation.
+
+The NOx map in `04_NOx_WSR` integrates every (phi, mdot) point for 4 seconds of
+simulated time, starting each time from an HP equilibrium guess. Here, a single
+reactor network is built per mass flow rate and reused along the equivalence
+ratio axis: only the inlet composition is updated, and each point is solved
+directly for its steady state, starting from the solution found at the
+neighboring value of phi.
+
+At steady state, the constant-volume reactor with a pressure-controlled outlet
+satisfies
+
+    0 = Y_k - Y_k,in - V / mdot * W_k * omega_k(T, Y)
+    0 = h(T, Y) - h_in
+
+which is solved with a damped Newton method whenever a converged neighbor is
+available. Points without a burning neighbor, and points where the Newton
+iteration does not converge (typically close to extinction), are time-marched
+from HP equilibrium with `ReactorNet.advance_to_steady_state`, which mirrors
+what the original notebook does for every point.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python steady_wsr.py
+"""
+from typing import NamedTuple
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+
+class WSRConditions(NamedTuple):
+    """Holds inlet and reactor parameters shared by all points of a sweep.
+    """
+    model_file: str = 'gri30.yaml'
+    fuel: str = 'CH4:1.0'
+    oxidizer: str = 'O2:1.0, N2:3.76'
+    T_in: float = 300.0
+    pressure: float = ct.one_atm
+    volume: float = 0.1
+
+
+class SteadyWSR:
+    """Well-stirred reactor that is solved directly for its steady state.
+
+    The reactor network is built once; `set_inlet` changes the inlet mixture
+    without touching the reactor contents, so the next call to `solve` is
+    warm-started from the previous solution.
+
+    :param conditions:
+        `WSRConditions` describing the inlet and reactor.
+    :param mdot:
+        Inlet mass flow rate [kg/s].
+    :param method:
+        ``'newton'`` solves the steady-state residual with a damped Newton
+        method and falls back to time marching if that fails; ``'march'``
+        always uses `ReactorNet.advance_to_steady_state`.
+    :param rtol:
+        Relative tolerance of the Newton iteration.
+    :param atol:
+        Absolute tolerance of the Newton iteration, for mass fractions.
+    :param gas:
+        Optional `Solution` to reuse instead of loading ``conditions.model_file``.
+    """
+    def __init__(self, conditions, mdot, method='newton', rtol=1e-7, atol=1e-14,
+                 gas=None):
+        if method not in ('newton', 'march'):
+            raise ValueError(f"Unknown steady-state method '{method}'")
+        self.conditions = conditions
+        self.mdot = mdot
+        self.method = method
+        self.rtol = rtol
+        self.atol = atol
+
+        self.gas = gas if gas is not None else ct.Solution(conditions.model_file)
+        # separate phase for the inlet, so that the reactor contents survive
+        # changes of the inlet composition
+        self.inlet_gas = ct.Solution(thermo='ideal-gas',
+                                     species=self.gas.species())
+        self.inlet_gas.TPX = conditions.T_in, conditions.pressure, conditions.fuel
+        self.fuel_species = [k for k, X in zip(self.inlet_gas.species_names,
+                                               self.inlet_gas.X) if X > 0]
+        self.inlet_gas.TPX = conditions.T_in, conditions.pressure, conditions.oxidizer
+        self.gas.TPX = self.inlet_gas.TPX
+
+        self.upstream = ct.Reservoir(self.inlet_gas)
+        self.reactor = ct.IdealGasMoleReactor(self.gas)
+        self.reactor.volume = conditions.volume
+        self.downstream = ct.Reservoir(self.gas)
+        self.inlet = ct.MassFlowController(self.upstream, self.reactor, mdot=mdot)
+        self.outlet = ct.PressureController(self.reactor, self.downstream,
+                                            primary=self.inlet)
+        self.sim = ct.ReactorNet([self.reactor])
+
+        self.solved = False
+        self.newton_iterations = 0
+        self.newton_failures = 0
+        self.steps = 0
+
+    def set_inlet(self, phi):
+        """Change the inlet equivalence ratio; the reactor state is kept.
+        """
+        c = self.conditions
+        self.inlet_gas.TP = c.T_in, c.pressure
+        self.inlet_gas.set_equivalence_ratio(phi, c.fuel, c.oxidizer)
+        self.upstream.syncState()
+
+    def reseed(self):
+        """Reset the reactor to the HP equilibrium state of the inlet mixture.
+        """
+        self.gas.TPY = self.inlet_gas.TPY
+        self.gas.equilibrate('HP')
+        self.reactor.syncState()
+
+    @property
+    def Y_fuel_in(self):
+        """Mass fraction of fuel in the inlet mixture."""
+        return self.inlet_gas[self.fuel_species].Y.sum()
+
+    @property
+    def burning(self):
+        """`True` if the reactor is noticeably hotter than its inlet."""
+        return self.reactor.T > self.conditions.T_in + 50.0
+
+    def residual(self, x):
+        """Steady-state residual for the state vector ``x = [T, Y_1, ..., Y_K]``.
+        """
+        gas = self.gas
+        gas.TP = x[0], self.conditions.pressure
+        gas.set_unnormalized_mass_fractions(x[1:])
+        gas.TP = x[0], self.conditions.pressure
+        F = np.empty_like(x)
+        F[1:] = (x[1:] - self.inlet_gas.Y - self.conditions.volume / self.mdot
+                 * gas.net_production_rates * gas.molecular_weights)
+        F[0] = (gas.enthalpy_mass - self.inlet_gas.enthalpy_mass) / gas.cp_mass
+        return F
+
+    def jacobian(self, x, F):
+        """Finite difference approximation of the residual Jacobian.
+        """
+        J = np.empty((len(x), len(x)))
+        for j in range(len(x)):
+            dx = 1e-7 * abs(x[j]) + 1e-12
+            x1 = x.copy()
+            x1[j] += dx
+            J[:, j] = (self.residual(x1) - F) / dx
+        return J
+
+    def newton(self, max_iterations=15):
+        """Damped Newton iteration, starting from the current reactor state.
+
+        :return:
+            `True` if the iteration converged. The reactor is only updated in
+            this case.
+        """
+        x = np.hstack([self.reactor.T, self.reactor.thermo.Y])
+        scale = np.hstack([1e6 * self.atol, np.full(len(x) - 1, self.atol)])
+        try:
+            F = self.residual(x)
+            for i in range(max_iterations):
+                dx = np.linalg.solve(self.jacobian(x, F), -F)
+                # limit temperature steps and search for a decrease of |F|
+                damping = min(1.0, 0.2 * x[0] / abs(dx[0]))
+                while True:
+                    x1 = x + damping * dx
+                    x1[1:] = np.maximum(x1[1:], 0.0)
+                    F1 = self.residual(x1)
+                    if np.linalg.norm(F1) < np.linalg.norm(F) or damping < 1e-3:
+                        break
+                    damping *= 0.5
+                x, F = x1, F1
+                self.newton_iterations += 1
+                if np.all(np.abs(damping * dx) < self.rtol * np.abs(x) + scale):
+                    break
+            else:
+                return False
+        except (ct.CanteraError, np.linalg.LinAlgError):
+            return False
+        if damping < 1e-3:
+            return False
+
+        self.gas.TPY = x[0], self.conditions.pressure, x[1:]
+        self.reactor.syncState()
+        return True
+
+    def solve(self, warm_start=True):
+        """Solve for the steady state, starting from the current reactor state.
+
+        :param warm_start:
+            Set to `False` if the current reactor state is not a converged
+            neighboring solution; time marching is then used irrespective of
+            ``method``, so that the transient decides between the burning and
+            the extinguished branch.
+        """
+        if self.method == 'newton' and warm_start:
+            if self.newton():
+                return
+            self.newton_failures += 1
+        self.sim.initial_time = 0.0
+        self.sim.reinitialize()
+        self.sim.advance_to_steady_state()
+        self.steps += self.sim.solver_stats['steps']
+
+    def continue_to(self, phi):
+        """Solve for the steady state at a new inlet equivalence ratio.
+
+        The first point is seeded from HP equilibrium; every following point
+        starts from its neighbor's converged state, which keeps a sweep on the
+        burning branch up to its turning point. If the neighbor has blown out,
+        the reactor is reseeded from HP equilibrium, so that the burning branch
+        is found again if it exists.
+
+        :return:
+            The reactor's `Solution`, holding the steady state.
+        """
+        warm_start = self.solved and self.burning
+        self.set_inlet(phi)
+        if not warm_start:
+            self.reseed()
+        self.solve(warm_start)
+        self.solved = True
+        return self.reactor.thermo
+
+
+def wsr_sweep(conditions, phis, mdot, method='newton', gas=None):
+    """Steady WSR states along a line of equivalence ratios.
+
+    See `SteadyWSR.continue_to` for how each point is seeded.
+
+    :return:
+        `SolutionArray` of steady reactor states with extra columns ``phi`` and
+        ``Y_fuel_in`` (inlet fuel mass fraction).
+    """
+    wsr = SteadyWSR(conditions, mdot, method=method, gas=gas)
+    states = ct.SolutionArray(wsr.gas, extra=['phi', 'Y_fuel_in'])
+    for phi in phis:
+        wsr.continue_to(phi)
+        states.append(wsr.reactor.thermo.state, phi=phi, Y_fuel_in=wsr.Y_fuel_in)
+    return states
+
+
+def calc_nox(gas, phi, mdot):
+    """Reference implementation from `04_NOx_WSR`: cold start, 4 s integration.
+    """
+    gas.TP = 300, ct.one_atm
+    gas.set_equivalence_ratio(phi, "CH4:1.0", "N2:3.76, O2:1.0")
+    Yf_in = gas["CH4"].Y[0]
+    upstream = ct.Reservoir(gas)
+
+    gas.equilibrate("HP")
+    wsr = ct.IdealGasMoleReactor(gas)
+    wsr.volume = 0.1
+    downstream = ct.Reservoir(gas)
+    inlet = ct.MassFlowController(upstream, wsr, mdot=mdot)
+    outlet = ct.PressureController(wsr, downstream, primary=inlet)
+    sim = ct.ReactorNet([wsr])
+
+    tEnd = 4.0
+    while sim.time < tEnd:
+        sim.step()
+
+    return wsr.thermo["NO"].Y[0] / Yf_in
+
+
+if __name__ == '__main__':
+    import matplotlib.pyplot as plt
+
+    conditions = WSRConditions()
+    gas = ct.Solution(conditions.model_file)
+    phi_in = np.linspace(0.5, 1.8, 60)
+    mdot_in = np.logspace(-2, 2, 7)
+
+    t0 = default_timer()
+    NOx_ref = np.array([[calc_nox(gas, phi, mdot) for phi in phi_in]
+                        for mdot in mdot_in])
+    t_ref = default_timer() - t0
+    print(f"Cold start, 4 s integration:     {t_ref:6.2f} s")
+
+    for method in ('march', 'newton'):
+        t0 = default_timer()
+        lines = [wsr_sweep(conditions, phi_in, mdot, method=method, gas=gas)
+                 for mdot in mdot_in]
+        elapsed = default_timer() - t0
+        NOx = np.array([states('NO').Y[:, 0] / states.Y_fuel_in for states in lines])
+        print(f"Continuation, method='{method}': {elapsed:6.2f} s "
+              f"(speed-up {t_ref / elapsed:.1f}x, "
+              f"max. |dNOx| = {np.abs(NOx - NOx_ref).max():.2e})")
+
+    fig, ax = plt.subplots()
+    for mdot, NOx_line in zip(mdot_in, NOx):
+        ax.plot(phi_in, NOx_line, label=r"$\dot{m} = " + f"{mdot:.2f}$ kg/s")
+    ax.set(xlabel=r"Equivalence ratio, $\phi$", ylabel=r"$Y_{NO} / Y_{fuel,in}$")
+    ax.legend()
+    plt.show()
@@ -0,0 +1,183 @@
+"""
+Mechanism-wide consistency scan of species thermo data.
+
+`07_thermo_debugging` finds the broken NASA polynomial of `H2CNO` by plotting
+the species by hand and experimenting with its midpoint temperature. The
+scanner below checks every species of a mechanism at once, using `ThermoTable`
+to evaluate all polynomials on a dense temperature grid:
+
+* jumps of cp, h and s at the midpoint temperature (or the region boundaries
+  of NASA-9 polynomials),
+* negative heat capacities, and heat capacities below the translational limit
+  cp/R = 5/2,
+* heat capacities above the classical limit of a fully excited molecule,
+  cp/R = 3 n_atoms - 3/2, and
+* cp decreasing steeply with temperature.
+
+Findings are ranked by how far they exceed their threshold:
+
+    issues = scan_thermo('../inputs/mech_debug/mech.yaml')
+    print(report(issues))
+
+`check_thermo` raises an exception instead, so the scan can be used as a
+check whenever a mechanism is loaded.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python thermo_scan.py
+"""
+from typing import NamedTuple
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+from thermo_table import ThermoTable
+
+
+class ThermoIssue(NamedTuple):
+    """A species failing one of the checks of `scan_thermo`.
+    """
+    species: str
+    check: str
+    T: float
+    value: float
+    threshold: float
+
+    @property
+    def severity(self):
+        """How many times the threshold is exceeded."""
+        return abs(self.value) / self.threshold
+
+    def __str__(self):
+        return (f"{self.species:>16s}  {self.check:10s} {self.value:10.4g} "
+                f"at {self.T:7.1f} K  (threshold {self.threshold:g})")
+
+
+def _load(species):
+    if isinstance(species, str):
+        return ct.Species.list_from_file(species)
+    if hasattr(species, 'species'):
+        return species.species()
+    return list(species)
+
+
+def scan_thermo(species, n_points=1000, cp_jump=0.01, h_jump=0.01, s_jump=0.01,
+                cp_min=2.5, cp_excess=2.0, slope=5.0):
+    """Check the thermo data of all species for unphysical behavior.
+
+    :param species:
+        Input file name, `Solution`, or list of `Species`.
+    :param n_points:
+        Number of grid points between the lowest and highest temperature limit
+        of all species; each species is checked within its own limits.
+    :param cp_jump:
+        Tolerance for relative jumps of cp at region boundaries.
+    :param h_jump, s_jump:
+        Tolerances for jumps of h/RT and s/R at region boundaries.
+    :param cp_min:
+        Lower bound for cp/R; values below zero are reported as
+        ``negative-cp``, other values below the bound as ``low-cp``.
+    :param cp_excess:
+        Tolerated excess of cp/R over the classical limit.
+    :param slope:
+        Tolerated decrease of cp/R per unit of ln(T).
+    :return:
+        List of `ThermoIssue`, most severe first.
+    """
+    species = _load(species)
+    table = ThermoTable(species)
+    names = np.array(table.species_names)
+    issues = []
+
+    T = np.linspace(table.min_temp.min(), table.max_temp.max(), n_points)
+    valid = ((T[:, np.newaxis] >= table.min_temp)
+             & (T[:, np.newaxis] <= table.max_temp))
+    cp = table.reduced(T)[0]
+    columns = np.arange(len(names))
+
+    T_b, (d_cp, d_h, d_s) = table.region_jumps()
+    # cp jumps are relative to the largest cp of the species
+    cp_scale = np.abs(np.where(valid, cp, 0.0)).max(axis=0)[:, np.newaxis]
+    for check, jump, tol in (('cp-jump', d_cp / cp_scale, cp_jump),
+                             ('h-jump', d_h, h_jump), ('s-jump', d_s, s_jump)):
+        k, r = np.nonzero(np.abs(np.nan_to_num(jump)) > tol)
+        issues.extend(ThermoIssue(names[i], check, T_b[i, j], jump[i, j], tol)
+                      for i, j in zip(k, r))
+
+    low = np.where(valid, cp, np.inf)
+    i_low = low.argmin(axis=0)
+    cp_low = low[i_low, columns]
+    for k in np.nonzero(cp_low < cp_min * (1 - 1e-3))[0]:
+        if cp_low[k] < 0:
+            issues.append(ThermoIssue(names[k], 'negative-cp', T[i_low[k]],
+                                      cp_low[k], 1.0))
+        else:
+            issues.append(ThermoIssue(names[k], 'low-cp', T[i_low[k]],
+                                      cp_min - cp_low[k], cp_min * 1e-3))
+
+    n_atoms = np.array([sum(sp.composition.values()) for sp in species])
+    excess = np.where(valid, cp - (3 * n_atoms - 1.5), -np.inf)
+    i_high = excess.argmax(axis=0)
+    for k in np.nonzero(excess[i_high, columns] > cp_excess)[0]:
+        issues.append(ThermoIssue(names[k], 'high-cp', T[i_high[k]],
+                                  excess[i_high[k], k], cp_excess))
+
+    dcp = np.where(valid, table.cp_slope(T), np.inf)
+    i_slope = dcp.argmin(axis=0)
+    for k in np.nonzero(dcp[i_slope, columns] < -slope)[0]:
+        issues.append(ThermoIssue(names[k], 'cp-slope', T[i_slope[k]],
+                                  dcp[i_slope[k], k], slope))
+
+    issues.sort(key=lambda issue: -issue.severity)
+    return issues
+
+
+def rank_species(issues):
+    """Species ordered by their most severe issue.
+
+    :return:
+        List of ``(species, severity, checks)`` tuples.
+    """
+    ranking = {}
+    for issue in issues:
+        severity, checks = ranking.get(issue.species, (0.0, []))
+        if issue.check not in checks:
+            checks = checks + [issue.check]
+        ranking[issue.species] = (max(severity, issue.severity), checks)
+    return sorted(((name, severity, checks)
+                   for name, (severity, checks) in ranking.items()),
+                  key=lambda item: -item[1])
+
+
+def report(issues, n=20):
+    """Text summary of the most severe issues."""
+    lines = [f"{len(issues)} issue(s) for {len(rank_species(issues))} species"]
+    lines.extend(str(issue) for issue in issues[:n])
+    return "\n".join(lines)
+
+
+def check_thermo(species, **tolerances):
+    """Raise `ValueError` if `scan_thermo` finds any issue.
+
+    Keyword arguments are passed to `scan_thermo`.
+    """
+    issues = scan_thermo(species, **tolerances)
+    if issues:
+        raise ValueError("Inconsistent thermo data: " + report(issues, n=10))
+
+
+if __name__ == '__main__':
+    ct.suppress_thermo_warnings()
+    for mech in ['gri30.yaml', '../inputs/mech_debug/mech.yaml',
+                 '../inputs/seiser.yaml', '../inputs/n-hexane-NUIG-2015.yaml']:
+        t0 = default_timer()
+        species = ct.Species.list_from_file(mech)
+        t_load = default_timer() - t0
+        t0 = default_timer()
+        issues = scan_thermo(species)
+        t_scan = default_timer() - t0
+        print(f"{mech}: {len(species)} species, scan {1e3 * t_scan:.0f} ms "
+              f"(+ {1e3 * t_load:.0f} ms to read the species)")
+        for name, severity, checks in rank_species(issues)[:5]:
+            print(f"  {name:>16s}  {severity:8.1f}x  {', '.join(checks)}")
@@ -0,0 +1,240 @@
+"""
+Vectorized species thermo evaluation over temperature arrays.
+
+`02_thermo_kinetics_intro` evaluates `[CH4.thermo.cp(T) for T in TT]`, and
+`plot_thermo` in `07_thermo_debugging` calls `thermo.cp`, `thermo.h` and
+`thermo.s` once per temperature. `ThermoTable` packs the NASA polynomial
+coefficients of many species into one coefficient array and evaluates all
+species at all temperatures with a few matrix products:
+
+    table = ThermoTable(gas)
+    cp = table.cp(np.linspace(300, 3000, 500))  # shape (500, n_species)
+
+Both 7-coefficient (`NasaPoly2`) and 9-coefficient
+(`Nasa9PolyMultiTempRegion`) polynomials are supported. NASA-7 polynomials are
+rewritten in the NASA-9 basis, with the midpoint temperature as the boundary
+between two regions, so both are handled by the same code. Species with other
+parameterizations are evaluated one temperature at a time.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python thermo_table.py
+"""
+from timeit import default_timer
+
+import cantera as ct
+import numpy as np
+
+
+def _basis(T):
+    """NASA-9 basis functions for cp/R, h/RT and s/R, each of shape (nT, 9)."""
+    T = np.asarray(T, dtype=float)
+    logT = np.log(T)
+    zero = np.zeros_like(T)
+    one = np.ones_like(T)
+    T2, T3, T4 = T**2, T**3, T**4
+    cp = np.stack([T**-2, 1 / T, one, T, T2, T3, T4, zero, zero], axis=-1)
+    h = np.stack([-T**-2, logT / T, one, T / 2, T2 / 3, T3 / 4, T4 / 5,
+                  1 / T, zero], axis=-1)
+    s = np.stack([-T**-2 / 2, -1 / T, logT, T, T2 / 2, T3 / 3, T4 / 4,
+                  zero, one], axis=-1)
+    return cp, h, s
+
+
+class ThermoTable:
+    """Reference-state thermo properties of many species at once.
+
+    :param species:
+        A `Solution`, or a list of `Species` or `SpeciesThermo` objects.
+    :param names:
+        Species names, if ``species`` is a list of `SpeciesThermo` objects.
+    """
+    def __init__(self, species, names=None):
+        if hasattr(species, 'species'):
+            species = species.species()
+        species = list(species)
+        if names is None:
+            names = [getattr(sp, 'name', str(i)) for i, sp in enumerate(species)]
+        self.species_names = list(names)
+        thermo = [getattr(sp, 'thermo', sp) for sp in species]
+        self.n_species = len(thermo)
+        self.min_temp = np.array([t.min_temp for t in thermo])
+        self.max_temp = np.array([t.max_temp for t in thermo])
+        self.reference_pressure = np.array([t.reference_pressure for t in thermo])
+
+        regions = []
+        self._other = []
+        #: Species whose upper regions start above, not at, their lower bound
+        self.exclusive_bounds = np.zeros(self.n_species, dtype=bool)
+        for k, t in enumerate(thermo):
+            c = t.coeffs
+            if isinstance(t, ct.NasaPoly2):
+                # [T_mid, high, low]; NASA-7 terms a0..a6 map to a2..a8
+                low = np.hstack([0.0, 0.0, c[8:15]])
+                high = np.hstack([0.0, 0.0, c[1:8]])
+                regions.append([(t.min_temp, low), (c[0], high)])
+                # Cantera uses the low polynomial at the midpoint temperature
+                self.exclusive_bounds[k] = True
+            elif isinstance(t, ct.Nasa9PolyMultiTempRegion):
+                n = int(c[0])
+                regions.append([(c[1 + 11 * r], c[3 + 11 * r:12 + 11 * r])
+                                for r in range(n)])
+            else:
+                regions.append([])
+                self._other.append((k, t))
+
+        # a table of only other parameterizations keeps a single region of
+        # zeros, which the species of `_other` override
+        n_regions = max([len(r) for r in regions] + [1])
+        #: Lower temperature bound of each region; unused regions are +inf
+        self.bounds = np.full((self.n_species, n_regions), np.inf)
+        #: NASA-9 coefficients of each region
+        self.coeffs = np.zeros((n_regions, self.n_species, 9))
+        for k, species_regions in enumerate(regions):
+            for r, (T_low, a) in enumerate(species_regions):
+                self.bounds[k, r] = T_low
+                self.coeffs[r, k] = a
+
+    def _evaluate(self, T, basis):
+        """Polynomial values for stacked basis functions of shape (n, nT, 9)."""
+        shape = basis.shape[:2] + (self.n_species,)
+        basis = basis.reshape(-1, 9)
+        # region of each (temperature, species) pair; the first region is
+        # also used below its lower bound, as in Cantera
+        T = T[:, np.newaxis, np.newaxis]
+        bounds = self.bounds[np.newaxis, :, 1:]
+        region = np.where(self.exclusive_bounds[:, np.newaxis],
+                          T > bounds, T >= bounds).sum(axis=2)
+        values = (basis @ self.coeffs[0].T).reshape(shape)
+        for r in range(1, len(self.coeffs)):
+            mask = region == r
+            if mask.any():
+                values = np.where(mask, (basis @ self.coeffs[r].T).reshape(shape),
+                                  values)
+        return values
+
+    def reduced(self, T):
+        """Dimensionless cp/R, h/RT and s/R.
+
+        :param T:
+            Temperature or 1D array of temperatures [K].
+        :return:
+            Tuple of three arrays with shape ``(len(T), n_species)``.
+        """
+        T = np.atleast_1d(np.asarray(T, dtype=float))
+        # basis functions of cp, h and s are stacked, so that each region
+        # takes a single matrix product
+        cp, h, s = self._evaluate(T, np.stack(_basis(T)))
+        for k, t in self._other:
+            for i, Ti in enumerate(T):
+                cp[i, k] = t.cp(Ti) / ct.gas_constant
+                h[i, k] = t.h(Ti) / (ct.gas_constant * Ti)
+                s[i, k] = t.s(Ti) / ct.gas_constant
+        return cp, h, s
+
+    def cp_slope(self, T):
+        """Logarithmic temperature derivative of cp/R, ``d(cp/R) / d ln(T)``.
+        """
+        T = np.atleast_1d(np.asarray(T, dtype=float))
+        basis = _basis(T)[0] * np.array([-2, -1, 0, 1, 2, 3, 4, 0, 0])
+        slope = self._evaluate(T, basis[np.newaxis])[0]
+        for k, t in self._other:
+            for i, Ti in enumerate(T):
+                dT = 1e-4 * Ti
+                slope[i, k] = Ti * (t.cp(Ti + dT) - t.cp(Ti - dT)) / (
+                    2 * dT * ct.gas_constant)
+        return slope
+
+    def region_jumps(self):
+        """Discontinuities of cp/R, h/RT and s/R at the region boundaries.
+
+        :return:
+            Boundary temperatures with shape ``(n_species, n_regions - 1)``
+            (`nan` where a species has fewer regions), and the differences
+            upper minus lower region of cp/R, h/RT and s/R with shape
+            ``(3, n_species, n_regions - 1)``.
+        """
+        T_b = self.bounds[:, 1:]
+        T_b = np.where(np.isfinite(T_b), T_b, np.nan)
+        jumps = np.full((3,) + T_b.shape, np.nan)
+        for r in range(1, len(self.coeffs)):
+            valid = np.isfinite(T_b[:, r - 1])
+            basis = np.stack(_basis(T_b[valid, r - 1]))
+            lower = np.einsum('ikj,kj->ik', basis, self.coeffs[r - 1, valid])
+            upper = np.einsum('ikj,kj->ik', basis, self.coeffs[r, valid])
+            jumps[:, valid, r - 1] = upper - lower
+        return T_b, jumps
+
+    def cp(self, T):
+        """Molar heat capacities [J/kmol/K], shape ``(len(T), n_species)``."""
+        return ct.gas_constant * self.reduced(T)[0]
+
+    def h(self, T):
+        """Molar enthalpies [J/kmol], shape ``(len(T), n_species)``."""
+        T = np.atleast_1d(np.asarray(T, dtype=float))
+        return ct.gas_constant * T[:, np.newaxis] * self.reduced(T)[1]
+
+    def s(self, T):
+        """Molar entropies at the reference pressure [J/kmol/K]."""
+        return ct.gas_constant * self.reduced(T)[2]
+
+    def g(self, T):
+        """Molar Gibbs functions at the reference pressure [J/kmol]."""
+        T = np.atleast_1d(np.asarray(T, dtype=float))
+        _, h, s = self.reduced(T)
+        return ct.gas_constant * T[:, np.newaxis] * (h - s)
+
+
+def _loop(thermo, T):
+    """Reference: scalar evaluation, as in `plot_thermo` of `07_thermo_debugging`."""
+    cp = np.array([[t.cp(tt) for t in thermo] for tt in T])
+    h = np.array([[t.h(tt) for t in thermo] for tt in T])
+    s = np.array([[t.s(tt) for t in thermo] for tt in T])
+    return cp, h, s
+
+
+if __name__ == '__main__':
+    ct.suppress_thermo_warnings()
+
+    # 02_thermo_kinetics_intro: cp of methane
+    gas = ct.Solution('gri30.yaml')
+    CH4 = gas.species('CH4')
+    TT = np.linspace(300, 2000, 200)
+    t0 = default_timer()
+    cp_ref = [CH4.thermo.cp(T) for T in TT]
+    t_ref = default_timer() - t0
+    t0 = default_timer()
+    cp = ThermoTable([CH4]).cp(TT)[:, 0]
+    t_table = default_timer() - t0
+    assert np.allclose(cp, cp_ref, rtol=1e-12)
+    print(f"CH4 cp at {len(TT)} temperatures: loop {1e3 * t_ref:.2f} ms, "
+          f"table {1e3 * t_table:.2f} ms (including setup)")
+
+    # whole mechanisms, cp, h and s
+    T = np.linspace(200, 4000, 500)
+    for mech in ['airNASA9.yaml', '../inputs/mech_debug/mech.yaml',
+                 '../inputs/n-hexane-NUIG-2015.yaml']:
+        species = ct.Species.list_from_file(mech)
+        thermo = [sp.thermo for sp in species]
+        # the loop is timed on a subset of the species for large mechanisms
+        n_loop = min(len(thermo), 100)
+        t0 = default_timer()
+        ref = _loop(thermo[:n_loop], T)
+        t_ref = (default_timer() - t0) * len(thermo) / n_loop
+
+        t0 = default_timer()
+        table = ThermoTable(species)
+        t_setup = default_timer() - t0
+        t0 = default_timer()
+        cp, h, s = table.reduced(T)
+        t_table = default_timer() - t0
+        cp, h, s = ct.gas_constant * cp, ct.gas_constant * T[:, None] * h, \
+            ct.gas_constant * s
+
+        for value, value_ref in zip((cp, h, s), ref):
+            assert np.allclose(value[:, :n_loop], value_ref, rtol=1e-10,
+                               atol=1e-10 * np.abs(value_ref).max())
+        print(f"{mech}: {len(species)} species x {len(T)} temperatures")
+        print(f"  scalar loop: {1e3 * t_ref:9.1f} ms"
+              + (" (extrapolated)" if n_loop < len(thermo) else ""))
+        print(f"  table:       {1e3 * t_table:9.1f} ms (+ {1e3 * t_setup:.1f} ms setup)")
@@ -0,0 +1,393 @@
+"""
+Compressed on-disk storage of reactor trajectories.
+
+`preconditioned_integration` appends the state of the n-hexane reactor to a
+`SolutionArray` after every step, which keeps all 1268 mass fractions of every
+step in memory. `TrajectoryWriter` instead collects states in a buffer of
+``chunk_size`` rows, and appends each full buffer to a file as one compressed
+chunk per field:
+
+    with TrajectoryWriter('ignition.traj', reactor.thermo, extra=['time'],
+                          float32_species=True, dT=0.1, dY=1e-5) as writer:
+        while sim.time < end_time:
+            sim.step()
+            writer.append(reactor.thermo, time=sim.time)
+
+Options reduce the size further: ``species`` stores only selected mass
+fractions, ``float32_species`` stores them in single precision, and ``dT`` and
+``dY`` skip states until the temperature or a mass fraction has changed by at
+least that amount since the last stored state. The last appended state is
+always stored.
+
+Before compression, the bytes of each chunk are shuffled so that the bytes at
+the same position in each number, such as the exponents, are stored together,
+as in the shuffle filter of HDF5. The chunks are written to a single data file,
+``ignition.traj``, and their positions to an index file, ``ignition.jsonl``,
+which has a header line with the species and data types, and one line per
+chunk. Chunks can be read as soon as their line is written, while the
+trajectory is still being written: `TrajectoryReader.refresh` adds the chunks
+that were completed since the reader was opened.
+`TrajectoryReader` memory-maps the data file and only decompresses the chunks
+that overlap a requested range of rows; slicing it returns a `SolutionArray`:
+
+    trajectory = TrajectoryReader('ignition.traj')
+    trajectory.time              # all times
+    states = trajectory[-100:]   # SolutionArray of the last 100 states
+    trajectory.read('T', 0, 10)  # single field
+
+With ``level=0``, chunks are stored uncompressed, and fields are read as views
+of the memory map without copying. A `SolutionArray` can only be created if
+all species were stored.
+
+Usage (from the `ncm-2025/performance` directory):
+
+    python trajectory_store.py
+"""
+from functools import lru_cache
+import json
+import mmap
+import operator
+from pathlib import Path
+import zlib
+
+import cantera as ct
+import numpy as np
+
+
+def _index_file(filename):
+    return Path(filename).with_suffix('.jsonl')
+
+
+class TrajectoryWriter:
+    """Write states of a phase to a chunked, compressed file.
+
+    :param filename:
+        Data file; the index is written to the same path with suffix ``.jsonl``.
+    :param phase:
+        `Solution` whose states are written.
+    :param extra:
+        Names of additional scalar fields, such as ``'time'``, which are
+        passed as keyword arguments to `append`.
+    :param species:
+        Names of the species whose mass fractions are stored; by default, all.
+    :param float32_species:
+        Store mass fractions in single precision.
+    :param dT:
+        Skip states until the temperature has changed by at least ``dT`` [K]
+        since the last stored state, or ...
+    :param dY:
+        ... until a stored mass fraction has changed by at least ``dY``.
+    :param chunk_size:
+        Number of states per chunk.
+    :param level:
+        `zlib` compression level; 0 to store chunks uncompressed.
+    :param shuffle:
+        Group the bytes of compressed chunks by their position within each
+        value before compressing, which compresses floating point numbers
+        better.
+    """
+    def __init__(self, filename, phase, extra=(), species=None, float32_species=False,
+                 dT=None, dY=None, chunk_size=100, level=6, shuffle=True):
+        self.filename = Path(filename)
+        self.species = list(species) if species is not None else phase.species_names
+        self._indices = [phase.species_index(name) for name in self.species]
+        self.dT = dT
+        self.dY = dY
+        self.chunk_size = chunk_size
+        self.level = level
+        self.shuffle = shuffle and level > 0
+        self.dtypes = {'T': 'float64', 'P': 'float64',
+                       'Y': 'float32' if float32_species else 'float64'}
+        self.dtypes.update((name, 'float64') for name in extra)
+        self._buffers = {
+            name: np.empty((chunk_size, len(self.species)) if name == 'Y' else chunk_size,
+                           dtype=dtype)
+            for name, dtype in self.dtypes.items()}
+        self._n_buffered = 0
+        self._last = None  #: last stored T and Y
+        self._pending = None  #: last appended state, if it was skipped
+        self.n_appended = 0
+        self.n_rows = 0
+        self._header = {
+            'source': str(Path(phase.source).resolve()) if Path(phase.source).is_file()
+                      else phase.source,
+            'name': phase.name,
+            'species': self.species,
+            'all_species': len(self.species) == phase.n_species,
+            'dtypes': self.dtypes,
+            'level': level,
+            'shuffle': self.shuffle}
+        self._stream = open(self.filename, 'wb')
+        self._index = open(_index_file(self.filename), 'w')
+        self._write_index(self._header)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def append(self, phase, **extra):
+        """Append the current state of ``phase``, unless it is skipped.
+
+        :param extra:
+            Values of the ``extra`` fields.
+        """
+        self.n_appended += 1
+        T = phase.T
+        Y = phase.Y[self._indices]
+        state = (T, phase.P, Y, extra)
+        if self._last is not None and (self.dT is not None or self.dY is not None):
+            T_last, Y_last = self._last
+            changed = ((self.dT is not None and abs(T - T_last) >= self.dT)
+                       or (self.dY is not None and np.abs(Y - Y_last).max() >= self.dY))
+            if not changed:
+                self._pending = state
+                return
+        self._store(state)
+
+    def _store(self, state):
+        T, P, Y, extra = state
+        i = self._n_buffered
+        self._buffers['T'][i] = T
+        self._buffers['P'][i] = P
+        self._buffers['Y'][i] = Y
+        for name, value in extra.items():
+            self._buffers[name][i] = value
+        self._last = (T, Y)
+        self._pending = None
+        self._n_buffered += 1
+        self.n_rows += 1
+        if self._n_buffered == self.chunk_size:
+            self.flush()
+
+    def flush(self):
+        """Write the buffered states as a new chunk."""
+        n = self._n_buffered
+        if not n:
+            return
+        fields = {}
+        for name, buffer in self._buffers.items():
+            data = buffer[:n]
+            if self.shuffle:
+                data = data.view(np.uint8).reshape(-1, data.itemsize).T
+            data = data.tobytes()
+            if self.level:
+                data = zlib.compress(data, self.level)
+            fields[name] = [self._stream.tell(), len(data)]
+            self._stream.write(data)
+        self._stream.flush()
+        self._n_buffered = 0
+        self._write_index({'rows': n, 'fields': fields})
+
+    def _write_index(self, entry):
+        self._index.write(json.dumps(entry) + "\n")
+        self._index.flush()
+
+    def close(self):
+        """Store the last appended state, and write the remaining buffer."""
+        if self._stream.closed:
+            return
+        if self._pending is not None:
+            self._store(self._pending)
+        self.flush()
+        self._stream.close()
+        self._index.close()
+
+    @property
+    def nbytes(self):
+        """Size of the data file [bytes]."""
+        return self.filename.stat().st_size
+
+
+class TrajectoryReader:
+    """Read a trajectory written by `TrajectoryWriter`.
+
+    :param filename:
+        Data file of the trajectory.
+    :param phase:
+        `Solution` for the `SolutionArray` objects returned by slicing; by
+        default, it is created from the input file of the written phase.
+    :param cache_size:
+        Number of decompressed chunks that are kept in memory.
+    """
+    def __init__(self, filename, phase=None, cache_size=4):
+        self.filename = Path(filename)
+        self._phase = phase
+        with open(_index_file(filename)) as index:
+            self._header = json.loads(index.readline())
+        self.species = self._header['species']
+        self.fields = list(self._header['dtypes'])
+        self._dtypes = {name: np.dtype(d) for name, d in self._header['dtypes'].items()}
+        self._chunks = []
+        self._starts = np.zeros(1, dtype=int)
+        self._map = b''
+        self._chunk = lru_cache(cache_size)(self._read_chunk)
+        self.refresh()
+
+    def refresh(self):
+        """Add the chunks that were written since the index was last read.
+
+        Only complete lines of the index are read, and the data file is mapped
+        again if there are new chunks. Chunks that were already read do not
+        change, and arrays returned before remain valid.
+
+        :return:
+            Number of new rows.
+        """
+        # the last element is empty, or a line that is still being written
+        lines = _index_file(self.filename).read_text().split("\n")[1:-1]
+        n_rows = len(self)
+        if len(lines) == len(self._chunks):
+            return 0
+        self._chunks.extend(json.loads(line) for line in lines[len(self._chunks):])
+        self._starts = np.cumsum([0] + [c['rows'] for c in self._chunks])
+        # the previous map is closed when it is no longer used
+        with open(self.filename, 'rb') as stream:
+            self._map = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        return len(self) - n_rows
+
+    def __len__(self):
+        return int(self._starts[-1])
+
+    def __repr__(self):
+        return (f"<TrajectoryReader {self.filename.name}: {len(self)} states in "
+                f"{len(self._chunks)} chunks, fields {', '.join(self.fields)}>")
+
+    @property
+    def phase(self):
+        if self._phase is None:
+            self._phase = ct.Solution(self._header['source'], self._header['name'],
+                                      transport_model=None)
+        return self._phase
+
+    def _read_chunk(self, i, name):
+        offset, nbytes = self._chunks[i]['fields'][name]
+        dtype = self._dtypes[name]
+        if self._header['level']:
+            data = np.frombuffer(zlib.decompress(self._map[offset:offset + nbytes]),
+                                 np.uint8)
+            if self._header['shuffle']:
+                data = data.reshape(dtype.itemsize, -1).T.copy()
+            data = data.view(dtype).ravel()
+        else:
+            data = np.frombuffer(self._map, dtype, nbytes // dtype.itemsize, offset)
+        return data.reshape(-1, len(self.species)) if name == 'Y' else data
+
+    def read(self, name, start=None, stop=None):
+        """Values of field ``name`` for rows ``start`` to ``stop``."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        first = max(np.searchsorted(self._starts, start, side='right') - 1, 0)
+        last = np.searchsorted(self._starts, stop, side='left')
+        parts = []
+        for i in range(first, min(last, len(self._chunks))):
+            data = self._chunk(i, name)
+            lo = max(start - self._starts[i], 0)
+            hi = min(stop, self._starts[i + 1]) - self._starts[i]
+            parts.append(data[lo:hi])
+        if len(parts) == 1:
+            return parts[0]
+        shape = (0, len(self.species)) if name == 'Y' else (0,)
+        return np.concatenate(parts) if parts else np.empty(shape, self._dtypes[name])
+
+    def __getattr__(self, name):
+        if name.startswith('_') or name not in self._header['dtypes']:
+            raise AttributeError(name)
+        return self.read(name)
+
+    def __getitem__(self, index):
+        """`SolutionArray` of a row or a slice of rows, with the extra fields."""
+        if isinstance(index, slice):
+            rows = range(*index.indices(len(self)))
+        else:
+            row = operator.index(index)
+            if not -len(self) <= row < len(self):
+                raise IndexError(f"Row {row} is out of range for {len(self)} rows")
+            row %= len(self)
+            rows = range(row, row + 1)
+        if not self._header['all_species']:
+            raise ValueError("SolutionArray requires the mass fractions of all species")
+        # read the contiguous block of rows and select from it, which also
+        # handles negative steps
+        start = min(rows[0], rows[-1]) if rows else 0
+        stop = max(rows[0], rows[-1]) + 1 if rows else 0
+        select = np.asarray(rows, dtype=int) - start
+
+        def read(name):
+            return self.read(name, start, stop)[select]
+
+        extra = {name: read(name) for name in self.fields if name not in ('T', 'P', 'Y')}
+        states = ct.SolutionArray(self.phase, len(rows), extra=extra)
+        if rows:
+            states.TPY = read('T'), read('P'), read('Y')
+        return states
+
+    def close(self):
+        """Release the memory map."""
+        self._chunk.cache_clear()
+        if isinstance(self._map, mmap.mmap):
+            try:
+                self._map.close()
+            except BufferError:
+                # uncompressed arrays returned by `read` still use the map, which
+                # is then closed when they are deleted
+                pass
+
+
+if __name__ == '__main__':
+    import tempfile
+    from timeit import default_timer
+
+    ct.suppress_thermo_warnings()
+
+    # ignition of `preconditioned_integration`, with the preconditioner
+    def simulation():
+        gas = ct.Solution('../inputs/n-hexane-NUIG-2015.yaml', transport_model=None)
+        gas.TP = 1000, ct.one_atm
+        gas.set_equivalence_ratio(1, 'NC6H14', 'N2:3.76, O2:1.0')
+        reactor = ct.IdealGasConstPressureMoleReactor(gas)
+        reactor.volume = 0.1
+        sim = ct.ReactorNet([reactor])
+        sim.derivative_settings = {"skip-third-bodies": True, "skip-falloff": True}
+        sim.preconditioner = ct.AdaptivePreconditioner()
+        sim.initialize()
+        return gas, reactor, sim
+
+    end_time = 0.1
+    gas, reactor, sim = simulation()
+    t0 = default_timer()
+    states = ct.SolutionArray(reactor.thermo, extra=['time'])
+    while sim.time < end_time:
+        states.append(reactor.thermo.state, time=sim.time)
+        sim.step()
+    print(f"SolutionArray: {len(states)} states in {default_timer() - t0:.2f} s, "
+          f"{len(states) * (gas.n_species + 3) * 8 / 1e6:.1f} MB of T, P, Y and time")
+    T_final = reactor.T
+
+    options = {
+        'float64, not shuffled': {'shuffle': False},
+        'float64': {},
+        'float32': {'float32_species': True},
+        'float32, dT=1 K, dY=1e-4': {'float32_species': True, 'dT': 1.0, 'dY': 1e-4},
+        'uncompressed': {'level': 0},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        for i, (label, kwargs) in enumerate(options.items()):
+            gas, reactor, sim = simulation()
+            filename = f"{tmp}/ignition-{i}.traj"
+            t0 = default_timer()
+            with TrajectoryWriter(filename, reactor.thermo, extra=['time'],
+                                  **kwargs) as writer:
+                writer.append(reactor.thermo, time=sim.time)
+                while sim.time < end_time:
+                    sim.step()
+                    writer.append(reactor.thermo, time=sim.time)
+            elapsed = default_timer() - t0
+            trajectory = TrajectoryReader(filename, gas)
+            t1 = default_timer()
+            last = trajectory[-1]
+            print(f"{label:27s}: {writer.n_rows:5d} of {writer.n_appended} states in "
+                  f"{elapsed:.2f} s, {writer.nbytes / 1e6:6.2f} MB on disk; last state "
+                  f"read in {1e3 * (default_timer() - t1):.1f} ms "
+                  f"(T={last.T[0]:.2f}, reference {T_final:.2f})")
+            trajectory.close()